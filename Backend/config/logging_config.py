@@ -0,0 +1,25 @@
+import atexit
+import logging
+import os
+import queue
+from logging.handlers import QueueHandler, QueueListener
+
+def setup_logging() -> QueueListener:
+    """
+    Route all logging through a queue so request coroutines never block on stdout.
+    A background QueueListener thread does the actual writing.
+    Level comes from LOG_LEVEL (default INFO; DEBUG shows raw model output).
+    """
+    log_queue = queue.Queue(-1)
+    
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    
+    root = logging.getLogger()
+    root.setLevel(os.environ.get("LOG_LEVEL", "INFO"))
+    root.handlers = [QueueHandler(log_queue)]
+    
+    listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)  # Flush queued records on shutdown
+    return listener
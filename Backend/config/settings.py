@@ -20,6 +20,16 @@ class Settings(BaseSettings):
     USE_LOCAL_STORAGE: bool = True
     LOCAL_UPLOAD_DIR: str = "uploads"
     
+    # Persistent cache for completed extraction / fact-check / cover-art results
+    RESULT_CACHE_DIR: str = "cache/results"
+    RESULT_CACHE_MAX_MB: int = 512  # Oldest entries are swept once the directory grows past this
+    
+    # Send the fixed closing message when an interview completes instead of generating one
+    USE_TEMPLATE_CLOSING: bool = True
+    
+    # Request budget for interview Gemini calls (per process), kept under the project quota
+    GEMINI_QPS: float = 20.0
+    
     class Config:
         env_file = ".env"
         extra = "ignore"
@@ -1,5 +1,9 @@
 import os
 from config.settings import settings
+from config.logging_config import setup_logging
+
+# Service modules log via `logging` (queue-backed, INFO by default; LOG_LEVEL=DEBUG for raw model output)
+setup_logging()
 
 # Enforce the use of the configured service account file BEFORE importing routers that use it
 if settings.FIREBASE_SERVICE_ACCOUNT_PATH:
@@ -45,6 +49,11 @@ os.makedirs(settings.LOCAL_UPLOAD_DIR, exist_ok=True)
 # Mount /uploads endpoint
 app.mount(f"/{settings.LOCAL_UPLOAD_DIR}", StaticFiles(directory=settings.LOCAL_UPLOAD_DIR), name="uploads")
 
+@app.on_event("startup")
+async def warmup_gemini():
+    from services.gemini_service import warmup_gemini_client
+    await warmup_gemini_client()
+
 @app.get("/health")
 async def health_check():
     from datetime import datetime
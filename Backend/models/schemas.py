@@ -2,8 +2,8 @@
 # from typing import List, Dict, Optional
 
 # New Chat Code
-from pydantic import BaseModel, EmailStr
-from typing import Optional, List, Dict, Any
+from pydantic import BaseModel, EmailStr, ConfigDict
+from typing import Optional, List, Dict, Any, Literal
 from datetime import datetime
 
 # class WeightageUpdate(BaseModel):
@@ -177,6 +177,29 @@ class InvestmentDecision(BaseModel):
     generated_at: Optional[str] = None
     generated_by: Optional[str] = None
 
+class SuccessMetric(BaseModel):
+    metric: str
+    target: str
+
+class InvestmentDecisionDraft(BaseModel):
+    """Gemini structured output: an investment decision before deal metadata is stamped on"""
+    recommendation: Literal['PROCEED', 'CONDITIONAL', 'PASS']
+    funding_amount_recommended: str
+    funding_amount_requested: str
+    rationale: str
+    disbursement_schedule: List[FundingTranche]
+    milestone_roadmap: List[MilestoneCategory]
+    next_round_criteria: List[str]
+    red_flags: List[str]
+    success_metrics: List[SuccessMetric]  # Free-form map in InvestmentDecision; response schemas need fixed keys
+
+class BulkDecisionItem(InvestmentDecisionDraft):
+    deal_id: str
+
+class BulkInvestmentDecisions(BaseModel):
+    """Gemini structured output: one decision per deal in a bulk prompt"""
+    decisions: List[BulkDecisionItem]
+
 class FactCheck(BaseModel):
     claim: str
     verdict: str  # Verified, Exaggerated, False, Unverifiable
@@ -189,6 +212,34 @@ class FactCheckResponse(BaseModel):
     claims: List[FactCheck]
     checked_at: str
 
+class ClaimsExtraction(BaseModel):
+    """Gemini structured output: claims pulled from a pitch deck before verification"""
+    company_name: str
+    claims: List[str]
+
+# Interview Turn Models
+class AnswerRelevance(BaseModel):
+    """Whether a founder's answer actually addresses the question asked"""
+    is_relevant: bool
+    reason: str
+    is_joke: bool
+    is_offtopic: bool
+
+class ExtractedAnswer(BaseModel):
+    """Concrete information pulled from a founder's answer"""
+    has_answer: bool
+    value: Optional[str] = None
+    confidence: Literal['high', 'medium', 'low']
+
+class AnswerAnalysis(BaseModel):
+    """Gemini structured output: relevance check and extraction for one founder answer"""
+    relevance: AnswerRelevance
+    extracted: ExtractedAnswer
+
+class InterviewTurn(AnswerAnalysis):
+    """Gemini structured output: relevance check, extraction and reply for one interview turn"""
+    reply: str
+
 # CMA Report Data Models
 class CMARow(BaseModel):
     """A single row in a CMA table (e.g., 'Revenue from Operations')"""
@@ -207,6 +258,40 @@ class CMAData(BaseModel):
     balance_sheet: CMATable
     cash_flow: CMATable
 
+class CMAYear(BaseModel):
+    """Gemini structured output: credit metrics for one fiscal year column of a CMA report"""
+    year: str  # e.g. FY23
+    type: Literal["Audited", "Provisional", "Projected"]
+    
+    # Credit ratios
+    dscr: Optional[float] = None
+    iscr: Optional[float] = None
+    current_ratio: Optional[float] = None
+    debt_equity_ratio: Optional[float] = None
+    tol_tnw: Optional[float] = None
+    
+    # Operating performance
+    gross_turnover: Optional[float] = None
+    ebitda: Optional[float] = None
+    interest_expense: Optional[float] = None
+    pat: Optional[float] = None
+    cash_profit: Optional[float] = None
+    depreciation: Optional[float] = None
+    
+    # Financial position
+    tangible_net_worth: Optional[float] = None
+    total_debt: Optional[float] = None
+    net_working_capital: Optional[float] = None
+    unsecured_loans: Optional[float] = None
+    cash_and_bank_balance: Optional[float] = None
+    
+    # Raw components
+    current_assets: Optional[float] = None
+    current_liabilities: Optional[float] = None
+    fixed_assets: Optional[float] = None
+    long_term_debt: Optional[float] = None
+    short_term_debt: Optional[float] = None
+
 # Credit Analysis Models (4-Gate Digital Underwriting Framework)
 class GateCheck(BaseModel):
     """Individual check within a gate"""
@@ -243,4 +328,37 @@ class CreditAnalysis(BaseModel):
     cgtmse_eligible: bool  # Government guarantee eligibility
     
     # Summary table entries
-    summary_table: List[Dict[str, str]]  # [{parameter, result, status}]
\ No newline at end of file
+    summary_table: List[Dict[str, str]]  # [{parameter, result, status}]
+
+# Gemini response envelopes: validated straight from the raw JSON text (pydantic's jiter parser).
+# Sections stay loosely typed dicts so the memo shape can evolve without breaking parsing.
+class MemoAnalysis(BaseModel):
+    """Top-level 4-gate analysis response from analyze_with_gemini"""
+    model_config = ConfigDict(extra="allow")
+    
+    company_overview: Dict[str, Any]
+    market_analysis: Dict[str, Any]
+    credit_analysis: Dict[str, Any]
+    financials: Dict[str, Any]
+    claims_analysis: List[Dict[str, Any]]
+    conclusion: Dict[str, Any]
+
+class RecalculatedConclusion(BaseModel):
+    model_config = ConfigDict(extra="allow")
+    
+    overall_attractiveness: str
+
+class RiskFactorScores(BaseModel):
+    """Per-factor risk scores (0-100, higher = riskier), independent of weightage"""
+    team: float
+    market: float
+    traction: float
+    claims: float
+    financials: float
+
+class RiskFactorScoring(BaseModel):
+    """LLM output for recalculation: factor scores plus weight-independent conclusion text"""
+    model_config = ConfigDict(extra="allow")
+    
+    factor_scores: RiskFactorScores
+    conclusion: RecalculatedConclusion
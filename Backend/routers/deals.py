@@ -19,6 +19,7 @@ from services import (
     verify_claims_with_google,
     augment_cma_with_web_search
 )
+from services.gemini_service import deal_context_cache
 from services.credit_service import CreditService, parse_cma_to_model
 from models.credit_schemas import UserProfile, TrustTier
 from services.excel_extraction import extract_text_from_excel, extract_sheets_from_excel
@@ -715,6 +716,7 @@ async def delete_deal(
             print(f"Error deleting files: {str(e)}")
         
         deal_ref.delete()
+        await deal_context_cache.invalidate(deal_id)
         
         return {
             "message": "Deal deleted successfully",
@@ -1041,11 +1043,11 @@ async def run_fact_check(
             
             # Run verification with PDF bytes
             from services.gemini_service import verify_claims_with_google
-            result = await verify_claims_with_google(pdf_bytes=pdf_bytes)
+            result = await verify_claims_with_google(pdf_bytes=pdf_bytes, deal_id=deal_id)
         else:
             # Run verification with extracted text
             from services.gemini_service import verify_claims_with_google
-            result = await verify_claims_with_google(extracted_text=extracted_text)
+            result = await verify_claims_with_google(extracted_text=extracted_text, deal_id=deal_id)
         
         # Save result to Firestore
         fact_check_data = {
@@ -1,4 +1,6 @@
+import json
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from datetime import datetime, timedelta
 from typing import Optional
 import secrets
@@ -6,11 +8,18 @@ from google.cloud import firestore
 from config.settings import settings
 from models.schemas import InterviewRequest, ChatMessage
 from services import send_interview_email, chat_with_ai
+from services.gemini_service import stream_chat_with_ai
 
 router = APIRouter(prefix="/api", tags=["interview"])
 
 db = firestore.Client(project=settings.GCP_PROJECT_ID)
 
+def _memo_with_version(deal_id: str, deal_data: dict) -> tuple:
+    """The deal's memo plus a version key that changes whenever the memo is regenerated"""
+    memo_data = deal_data.get('memo', {})
+    memo_version = f"{deal_id}:{memo_data.get('last_updated') or memo_data.get('generated_at', '')}"
+    return memo_data.get('draft_v1', {}), memo_version
+
 @router.post("/send_interview_link/{deal_id}")
 async def send_interview_link(
     deal_id: str,
@@ -117,7 +126,7 @@ async def chat_with_founder(
         deal_doc = deal_ref.get()
         deal_data = deal_doc.to_dict()
         
-        memo = deal_data.get('memo', {}).get('draft_v1', {})
+        memo, memo_version = _memo_with_version(interview_data['deal_id'], deal_data)
         chat_history = interview_data.get('chat_history', [])
         
         ai_response = await chat_with_ai(
@@ -125,7 +134,9 @@ async def chat_with_founder(
             deal_data['metadata'].get('company_name'),
             deal_data['metadata'].get('sector'),
             chat_history,
-            message.text
+            message.text,
+            session_id=token,
+            memo_version=memo_version
         )
         
         chat_history.append({
@@ -152,6 +163,66 @@ async def chat_with_founder(
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/interview/{token}/chat/stream")
+async def stream_chat_with_founder(
+    token: str,
+    message: ChatMessage
+):
+    """
+    Founder interview chat, streaming the AI reply as Server-Sent Events.
+    The turn is saved to chat_history once the full reply has been streamed.
+    """
+    interview_ref = db.collection('interviews').document(token)
+    interview_doc = interview_ref.get()
+    
+    if not interview_doc.exists:
+        raise HTTPException(status_code=404, detail="Interview session not found")
+    
+    interview_data = interview_doc.to_dict()
+    
+    deal_doc = db.collection('deals').document(interview_data['deal_id']).get()
+    
+    if not deal_doc.exists:
+        raise HTTPException(status_code=404, detail="Deal not found")
+    
+    deal_data = deal_doc.to_dict()
+    
+    memo, memo_version = _memo_with_version(interview_data['deal_id'], deal_data)
+    chat_history = interview_data.get('chat_history', [])
+    
+    async def event_stream():
+        chunks = []
+        try:
+            async for chunk in stream_chat_with_ai(
+                memo,
+                deal_data['metadata'].get('company_name'),
+                deal_data['metadata'].get('sector'),
+                chat_history,
+                message.text,
+                session_id=token,
+                memo_version=memo_version
+            ):
+                chunks.append(chunk)
+                yield f"data: {json.dumps({'text': chunk})}\n\n"
+            
+            chat_history.append({
+                "role": "founder",
+                "message": message.text,
+                "timestamp": datetime.utcnow().isoformat() + "Z"
+            })
+            chat_history.append({
+                "role": "ai",
+                "message": "".join(chunks),
+                "timestamp": datetime.utcnow().isoformat() + "Z"
+            })
+            interview_ref.update({"chat_history": chat_history})
+            
+            yield "event: done\ndata: {}\n\n"
+        except Exception as e:
+            yield f"event: error\ndata: {json.dumps({'detail': str(e)})}\n\n"
+    
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
 @router.post("/interview/{token}/complete")
 async def complete_interview(token: str):
     """Mark interview as complete"""
@@ -1,11 +1,16 @@
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from models.schemas import InitiateInterviewRequest, ChatMessage, ChatResponse
 from services.interview_service import create_interview, validate_interview_token, complete_interview
-from services.interview_ai import chat_with_founder
+from services.interview_ai import chat_with_founder, stream_chat_with_founder
 from services.email_service import send_interview_email
 from google.cloud import firestore
 from config.settings import settings
 from datetime import datetime
+import json
+import logging
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/interviews", tags=["interviews"])
 db = firestore.Client(project=settings.GCP_PROJECT_ID)
@@ -191,6 +196,103 @@ async def validate_interview(token: str):
         print(f"Error in validate_interview: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+def save_chat_turn(interview: dict, user_message: str, response: dict) -> ChatResponse:
+    """Persist one interview turn (messages + tracking fields) and build the frontend response"""
+    deal_id = interview['deal_id']
+    
+    deal_ref = db.collection('deals').document(deal_id)
+    
+    # Create new messages
+    new_messages = [
+        {
+            "role": "user",
+            "message": user_message,
+            "timestamp": datetime.utcnow().isoformat() + "Z"
+        },
+        {
+            "role": "assistant",
+            "message": response['message'],
+            "timestamp": datetime.utcnow().isoformat() + "Z"
+        }
+    ]
+    
+    # Get all tracking fields from response
+    gathered_info = response.get('gathered_info', {})
+    cannot_answer = response.get('cannot_answer_fields', [])
+    asked_questions = response.get('asked_questions', [])
+    ask_count = response.get('ask_count', {})
+    progress = response.get('progress', {})
+    is_complete = response.get('is_complete', False)
+    
+    # Build updates with dot notation for nested interview field
+    updates = {
+        'interview.chat_history': firestore.ArrayUnion(new_messages),
+        'interview.gathered_info': gathered_info,
+        'interview.asked_questions': asked_questions,
+        'interview.ask_count': ask_count,
+        'interview.progress': progress,
+        'interview.is_complete': is_complete,
+        'interview.running_summary': response.get('running_summary', ''),
+        'interview.summarized_upto': response.get('summarized_upto', 0),
+        'interview.last_asked_field': response.get('last_asked_field'),
+        'interview.updated_at': datetime.utcnow().isoformat() + "Z"
+    }
+    
+    # Handle cannot_answer fields
+    cannot_answer_set = set(cannot_answer)
+    if cannot_answer:
+        # Already the full list: the turn's InterviewState starts from the stored cannot_answer_fields
+        logger.debug("📊 Cannot answer: %s", cannot_answer)
+        
+        updates['interview.cannot_answer_fields'] = cannot_answer
+        
+        # Update missing_fields: remove both answered AND cannot_answer
+        current_missing = interview.get('missing_fields', [])
+        
+        new_missing = [
+            f for f in current_missing 
+            if f not in gathered_info and f not in cannot_answer_set
+        ]
+        
+        updates['interview.missing_fields'] = new_missing
+        
+        logger.debug("📋 Missing fields: %d -> %d", len(current_missing), len(new_missing))
+    
+    # Apply updates to Firestore
+    deal_ref.update(updates)
+    
+    logger.debug(
+        "✅ Firestore updated: gathered=%d cannot_answer=%d progress=%s/%s complete=%s",
+        len(gathered_info), len(cannot_answer), progress.get('attempted', 0), progress.get('total', 0), is_complete
+    )
+    
+    # If complete, finalize and regenerate memo
+    if is_complete:
+        logger.info("🎉 Interview complete for deal %s, triggering memo regeneration", deal_id)
+        
+        complete_interview(deal_id, gathered_info)
+    
+    # Prepare response for frontend
+    gathered_fields = list(gathered_info.keys())
+    
+    # Still missing = not gathered AND not cannot_answer
+    still_missing = [
+        issue['field'] for issue in interview.get('issues', [])
+        if issue['field'] not in gathered_info and issue['field'] not in cannot_answer_set
+    ]
+    
+    logger.debug(
+        "📤 Sending response: gathered=%d still_missing=%d complete=%s message=%.80s",
+        len(gathered_fields), len(still_missing), is_complete, response['message']
+    )
+    
+    return ChatResponse(
+        message=response['message'],
+        is_complete=is_complete,
+        gathered_fields=gathered_fields,
+        missing_fields=still_missing
+    )
+
 # @router.post("/chat")
 # async def chat(message: ChatMessage) -> ChatResponse:
 #     """Handle chat message from founder"""
@@ -332,12 +434,7 @@ async def chat(message: ChatMessage) -> ChatResponse:
         interview = validate_interview_token(message.interview_token)
         deal_id = interview['deal_id']
         
-        print(f"\n{'='*60}")
-        print(f"💬 NEW CHAT MESSAGE")
-        print(f"{'='*60}")
-        print(f"Deal ID: {deal_id}")
-        print(f"Company: {interview.get('company_name')}")
-        print(f"Message: {message.message[:100]}...")
+        logger.debug("💬 Chat message for deal %s (%s): %.100s", deal_id, interview.get('company_name'), message.message)
         
         # Get AI response with new reliable system
         response = await chat_with_founder(
@@ -346,120 +443,46 @@ async def chat(message: ChatMessage) -> ChatResponse:
             chat_history=interview.get('chat_history', [])
         )
         
-        deal_ref = db.collection('deals').document(deal_id)
-        
-        # Create new messages
-        new_messages = [
-            {
-                "role": "user",
-                "message": message.message,
-                "timestamp": datetime.utcnow().isoformat() + "Z"
-            },
-            {
-                "role": "assistant",
-                "message": response['message'],
-                "timestamp": datetime.utcnow().isoformat() + "Z"
-            }
-        ]
-        
-        # Get all tracking fields from response
-        gathered_info = response.get('gathered_info', {})
-        cannot_answer = response.get('cannot_answer_fields', [])
-        asked_questions = response.get('asked_questions', [])
-        ask_count = response.get('ask_count', {})
-        progress = response.get('progress', {})
-        is_complete = response.get('is_complete', False)
-        
-        # Build updates with dot notation for nested interview field
-        updates = {
-            'interview.chat_history': firestore.ArrayUnion(new_messages),
-            'interview.gathered_info': gathered_info,
-            'interview.asked_questions': asked_questions,
-            'interview.ask_count': ask_count,
-            'interview.progress': progress,
-            'interview.is_complete': is_complete,
-            'interview.updated_at': datetime.utcnow().isoformat() + "Z"
-        }
-        
-        # Handle cannot_answer fields
-        if cannot_answer:
-            # Merge with existing cannot_answer
-            existing_cannot_answer = interview.get('cannot_answer_fields', [])
-            all_cannot_answer = list(set(existing_cannot_answer + cannot_answer))
-            
-            print(f"\n📊 Cannot answer tracking:")
-            print(f"   - Existing: {existing_cannot_answer}")
-            print(f"   - New from this turn: {cannot_answer}")
-            print(f"   - Total: {all_cannot_answer}")
-            
-            updates['interview.cannot_answer_fields'] = all_cannot_answer
-            
-            # Update missing_fields: remove both answered AND cannot_answer
-            current_missing = interview.get('missing_fields', [])
-            gathered_fields = list(gathered_info.keys())
-            
-            new_missing = [
-                f for f in current_missing 
-                if f not in gathered_fields and f not in all_cannot_answer
-            ]
-            
-            updates['interview.missing_fields'] = new_missing
-            
-            print(f"\n📋 Missing fields update:")
-            print(f"   - Was: {len(current_missing)} fields")
-            print(f"   - Now: {len(new_missing)} fields")
-        
-        # Apply updates to Firestore
-        deal_ref.update(updates)
-        
-        print(f"\n✅ Firestore updated")
-        print(f"   - Chat history: +2 messages")
-        print(f"   - Gathered: {len(gathered_info)} fields")
-        print(f"   - Cannot answer: {len(cannot_answer)} fields")
-        print(f"   - Progress: {progress.get('attempted', 0)}/{progress.get('total', 0)}")
-        print(f"   - Complete: {is_complete}")
-        
-        # If complete, finalize and regenerate memo
-        if is_complete:
-            print(f"\n🎉 Interview complete for deal {deal_id}!")
-            print(f"🔄 Triggering memo regeneration...")
-            
-            complete_interview(deal_id, gathered_info)
-        
-        # Prepare response for frontend
-        gathered_fields = list(gathered_info.keys())
-        
-        # Still missing = not gathered AND not cannot_answer
-        all_fields = [issue['field'] for issue in interview.get('issues', [])]
-        still_missing = [
-            f for f in all_fields 
-            if f not in gathered_fields and f not in cannot_answer
-        ]
-        
-        print(f"\n📤 Sending response:")
-        print(f"   - Message: {response['message'][:80]}...")
-        print(f"   - Gathered: {len(gathered_fields)} fields")
-        print(f"   - Still missing: {len(still_missing)} fields")
-        print(f"   - Complete: {is_complete}")
-        print(f"{'='*60}\n")
-        
-        return ChatResponse(
-            message=response['message'],
-            is_complete=is_complete,
-            gathered_fields=gathered_fields,
-            missing_fields=still_missing
-        )
+        return save_chat_turn(interview, message.message, response)
     
     except ValueError as e:
-        print(f"❌ Validation error: {str(e)}")
+        logger.warning("❌ Validation error: %s", e)
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        print(f"❌ Error in chat: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("❌ Error in chat: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/chat/stream")
+async def chat_stream(message: ChatMessage):
+    """
+    Handle chat message from founder, streaming the reply as Server-Sent Events.
+    The turn is saved once the full reply has been generated; the final "done" event
+    carries the same payload as /chat.
+    """
+    try:
+        interview = validate_interview_token(message.interview_token)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    async def event_stream():
+        try:
+            async for event in stream_chat_with_founder(
+                interview_data=interview,
+                user_message=message.message,
+                chat_history=interview.get('chat_history', [])
+            ):
+                if event['type'] == 'delta':
+                    yield f"data: {json.dumps({'text': event['text']})}\n\n"
+                else:
+                    chat_response = save_chat_turn(interview, message.message, event['result'])
+                    yield f"event: done\ndata: {chat_response.model_dump_json()}\n\n"
+        except Exception as e:
+            logger.exception("❌ Error in chat stream: %s", e)
+            yield f"event: error\ndata: {json.dumps({'detail': str(e)})}\n\n"
+    
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
 @router.get("/status/{deal_id}")
 async def get_interview_status(deal_id: str):
     """Get interview status"""
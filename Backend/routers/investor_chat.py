@@ -1,9 +1,11 @@
+import json
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
 from google.cloud import firestore
 from config.settings import settings
-from services.gemini_service import generate_investor_chat_response
+from services.gemini_service import generate_investor_chat_response, stream_investor_chat_response
 
 router = APIRouter(
     prefix="/api/investor_chat",
@@ -22,42 +24,53 @@ class ChatRequest(BaseModel):
     message: str
     history: List[ChatMessage]
 
+def _load_chat_context(deal_id: str) -> Tuple[str, Dict[str, Any], str]:
+    """Fetch the deck text, memo and memo version key for a deal"""
+    # Fetch deal data from Firestore
+    doc_ref = db.collection('deals').document(deal_id)
+    doc = doc_ref.get()
+    
+    if not doc.exists:
+        raise HTTPException(status_code=404, detail="Deal not found")
+        
+    deal_data = doc.to_dict()
+    
+    # Extract context
+    extracted_text_data = deal_data.get('extracted_text', {})
+    memo_data = deal_data.get('memo', {})
+    memo = memo_data.get('draft_v1', {})
+    # Memo version key: changes whenever the memo is regenerated
+    memo_id = f"{deal_id}:{memo_data.get('last_updated') or memo_data.get('generated_at', '')}"
+    
+    # Extract the actual text string from the nested structure
+    if isinstance(extracted_text_data, dict) and 'pitch_deck' in extracted_text_data:
+        extracted_text = extracted_text_data['pitch_deck'].get('text', '')
+    elif isinstance(extracted_text_data, str):
+        extracted_text = extracted_text_data
+    else:
+        extracted_text = ''
+    
+    if not extracted_text:
+        extracted_text = "Pitch deck text not available."
+    
+    return extracted_text, memo, memo_id
+
 @router.post("")
 async def chat_with_investor_bot(request: ChatRequest):
     """
     Chat with the AI Investor Analyst about a specific deal.
     """
     try:
-        # Fetch deal data from Firestore
-        doc_ref = db.collection('deals').document(request.deal_id)
-        doc = doc_ref.get()
-        
-        if not doc.exists:
-            raise HTTPException(status_code=404, detail="Deal not found")
-            
-        deal_data = doc.to_dict()
-        
-        # Extract context
-        extracted_text_data = deal_data.get('extracted_text', {})
-        memo = deal_data.get('memo', {}).get('draft_v1', {})
-        
-        # Extract the actual text string from the nested structure
-        if isinstance(extracted_text_data, dict) and 'pitch_deck' in extracted_text_data:
-            extracted_text = extracted_text_data['pitch_deck'].get('text', '')
-        elif isinstance(extracted_text_data, str):
-            extracted_text = extracted_text_data
-        else:
-            extracted_text = ''
-        
-        if not extracted_text:
-            extracted_text = "Pitch deck text not available."
+        extracted_text, memo, memo_id = _load_chat_context(request.deal_id)
             
         # Generate response
         response_text = await generate_investor_chat_response(
             extracted_text=extracted_text,
             memo_context=memo,
             chat_history=[msg.dict() for msg in request.history],
-            user_message=request.message
+            user_message=request.message,
+            memo_id=memo_id,
+            deal_id=request.deal_id
         )
         
         return {"message": response_text}
@@ -65,3 +78,29 @@ async def chat_with_investor_bot(request: ChatRequest):
     except Exception as e:
         print(f"Error in investor chat endpoint: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/stream")
+async def stream_chat_with_investor_bot(request: ChatRequest):
+    """
+    Chat with the AI Investor Analyst, streaming the reply as Server-Sent Events.
+    Each event carries a JSON-encoded text chunk; a final 'done' event closes the stream.
+    """
+    extracted_text, memo, memo_id = _load_chat_context(request.deal_id)
+    
+    async def event_stream():
+        try:
+            async for chunk in stream_investor_chat_response(
+                extracted_text=extracted_text,
+                memo_context=memo,
+                chat_history=[msg.dict() for msg in request.history],
+                user_message=request.message,
+                memo_id=memo_id,
+                deal_id=request.deal_id
+            ):
+                yield f"data: {json.dumps({'text': chunk})}\n\n"
+            yield "event: done\ndata: {}\n\n"
+        except Exception as e:
+            print(f"Error in investor chat stream: {str(e)}")
+            yield f"event: error\ndata: {json.dumps({'detail': str(e)})}\n\n"
+    
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
@@ -1,11 +1,11 @@
 from .document_ai import extract_text_from_pdf, extract_metadata_from_text
-from .gemini_service import analyze_with_gemini, chat_with_ai, recalculate_risk_and_conclusion, extract_cma_data, verify_claims_with_google, augment_cma_with_web_search
+from .gemini_service import analyze_with_gemini, chat_with_ai, recalculate_risk_and_conclusion, extract_cma_data, verify_claims_with_google, augment_cma_with_web_search, extract_cma_data_batch, verify_claims_with_google_batch, augment_cma_with_web_search_batch
 from .storage_service import upload_to_gcs, generate_deal_id
 from .email_service import send_interview_email
 from .word_service import create_word_document
 from .interview_service import create_interview, validate_interview_token, complete_interview
 from .interview_ai import chat_with_founder
-from .investment_decision_service import generate_investment_decision
+from .investment_decision_service import generate_investment_decision, generate_investment_decisions_bulk
 
 __all__ = [
     'extract_text_from_pdf',
@@ -22,7 +22,11 @@ __all__ = [
     'complete_interview',
     'chat_with_founder',
     'generate_investment_decision',
+    'generate_investment_decisions_bulk',
     'extract_cma_data',
     'verify_claims_with_google',
-    'augment_cma_with_web_search'
+    'augment_cma_with_web_search',
+    'extract_cma_data_batch',
+    'verify_claims_with_google_batch',
+    'augment_cma_with_web_search_batch'
 ]
@@ -0,0 +1,90 @@
+"""
+Deal-scoped Gemini context caches.
+
+One explicit CachedContent per (deal, model, purpose) holding the deal's pitch deck (PDF or
+text) and optionally its memo, so fact checking and investor chat reference the deck by
+cache name instead of re-sending (and re-prefilling) it on every call.
+"""
+import asyncio
+import logging
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+from google.genai.types import Content, CreateCachedContentConfig, Part, Tool
+
+logger = logging.getLogger(__name__)
+
+DEAL_CACHE_TTL_SECONDS = 86400
+DEAL_CACHE_RETRY_SECONDS = 600  # Back off after a failed create (e.g. content under the model's cache minimum)
+
+
+class DealContextCache:
+    """
+    Lazily created per-deal context caches, memoized in-process.
+    Caches are bound to one model, and system instructions / tools must live in the cache,
+    so each (deal_id, model, purpose) gets its own entry. A changed fingerprint (new deck
+    or memo) replaces the server-side cache.
+    """
+
+    def __init__(self, client, ttl_seconds: int = DEAL_CACHE_TTL_SECONDS):
+        self._client = client
+        self._ttl_seconds = ttl_seconds
+        # (deal_id, model, purpose) -> (cache name or None, fingerprint, valid_until)
+        self._entries: Dict[tuple, tuple] = {}
+        self._locks: Dict[tuple, asyncio.Lock] = defaultdict(asyncio.Lock)
+
+    async def get_or_create(
+        self,
+        deal_id: str,
+        model: str,
+        purpose: str,
+        parts: List[Part],
+        fingerprint: str,
+        system_instruction: Optional[str] = None,
+        tools: Optional[List[Tool]] = None
+    ) -> Optional[str]:
+        """Return the cached-content name for this deal's context, or None if no cache is available"""
+        key = (deal_id, model, purpose)
+        async with self._locks[key]:
+            now = time.monotonic()
+            entry = self._entries.get(key)
+            if entry and entry[1] == fingerprint and now < entry[2]:
+                return entry[0]
+            if entry and entry[0] and entry[1] != fingerprint:
+                await self._delete(entry[0])
+
+            try:
+                cache = await self._client.aio.caches.create(
+                    model=model,
+                    config=CreateCachedContentConfig(
+                        display_name=f"deal-{deal_id}-{purpose}",
+                        contents=[Content(role="user", parts=parts)],
+                        system_instruction=system_instruction,
+                        tools=tools,
+                        ttl=f"{self._ttl_seconds}s"
+                    )
+                )
+            except Exception as e:
+                logger.warning("⚠️ Could not create %s cache for deal %s on %s: %s", purpose, deal_id, model, e)
+                self._entries[key] = (None, fingerprint, now + DEAL_CACHE_RETRY_SECONDS)
+                return None
+
+            # Refresh a minute before the server-side TTL runs out
+            self._entries[key] = (cache.name, fingerprint, now + self._ttl_seconds - 60)
+            logger.info("🗄️ Created %s cache for deal %s on %s: %s", purpose, deal_id, model, cache.name)
+            return cache.name
+
+    async def invalidate(self, deal_id: str):
+        """Drop (and delete server-side) every cache held for a deal"""
+        for key in [k for k in self._entries if k[0] == deal_id]:
+            name = self._entries.pop(key)[0]
+            self._locks.pop(key, None)
+            if name:
+                await self._delete(name)
+
+    async def _delete(self, name: str):
+        try:
+            await self._client.aio.caches.delete(name=name)
+        except Exception as e:
+            logger.warning("⚠️ Could not delete context cache %s: %s", name, e)
@@ -5,6 +5,10 @@ from fastapi import HTTPException
 from config.settings import settings
 from .storage_service import upload_to_gcs
 import json
+import re
+
+# Markdown code fence around a model's JSON reply (closing fence required, so unfenced text passes through)
+_FENCE_RE = re.compile(r'^\s*```(?:json)?\s*\n?(.*?)\n?```\s*$', re.DOTALL)
 
 async def extract_text_from_pdf(file_content: bytes, deal_id: str) -> Dict[str, Any]:
     """
@@ -714,13 +718,9 @@ Extract the data into this exact JSON structure. All monetary values should be n
         print(f"🤖 Gemini response received ({len(response_text)} chars)")
         
         # Clean up response - remove markdown code blocks if present
-        if response_text.startswith("```json"):
-            response_text = response_text[7:]
-        if response_text.startswith("```"):
-            response_text = response_text[3:]
-        if response_text.endswith("```"):
-            response_text = response_text[:-3]
-        response_text = response_text.strip()
+        fenced = _FENCE_RE.match(response_text)
+        if fenced:
+            response_text = fenced.group(1).strip()
         
         # Parse JSON response
         cma_data = json.loads(response_text)
@@ -797,10 +797,9 @@ async def extract_metadata_from_text(text: str) -> Dict[str, Any]:
         
         response_text = response.text.strip()
         
-        if response_text.startswith("```json"):
-            response_text = response_text[7:-3]
-        elif response_text.startswith("```"):
-            response_text = response_text[3:-3]
+        fenced = _FENCE_RE.match(response_text)
+        if fenced:
+            response_text = fenced.group(1)
         
         metadata = json.loads(response_text)
         return metadata
@@ -1,30 +1,474 @@
 import json
-import base64
+import asyncio
+import functools
+import hashlib
+import inspect
+import io
+import logging
+import math
+import time
 import re
-from typing import Dict, Any, Optional, Union, List
+import httpx
+import orjson
+from collections import OrderedDict, defaultdict, deque
+from string import Template
+from typing import Dict, Any, Optional, Union, List, AsyncIterator, Callable, Awaitable
 from fastapi import HTTPException
 from google import genai
-from google.genai.types import GenerateContentConfig, Tool, GoogleSearch, Part
+from google.genai import errors as genai_errors
+from google.genai.types import GenerateContentConfig, CreateCachedContentConfig, HttpOptions, Tool, GoogleSearch, Part
 from config.settings import settings
-
-# Initialize Google Gen AI client with API Key
+from pydantic import TypeAdapter, ValidationError
+from models.schemas import CMAYear, ClaimsExtraction, FactCheck, MemoAnalysis, RecalculatedConclusion, RiskFactorScoring
+from services.deal_cache import DealContextCache
+from utils import result_cache
+from utils.inflight import coalesce_inflight
+from utils.json_stream import ArrayItemScanner, TruncatedStreamError
+
+# Initialize Google Gen AI client with API Key.
+# One shared HTTP/2 connection pool per client (sync + async) so TLS sessions are reused across calls.
+_HTTP_POOL_ARGS = {
+    "http2": True,
+    "limits": httpx.Limits(max_connections=100, max_keepalive_connections=50, keepalive_expiry=300)
+}
 client = genai.Client(
-    api_key=settings.GEMINI_API_KEY
+    api_key=settings.GEMINI_API_KEY,
+    http_options=HttpOptions(
+        timeout=120_000,  # milliseconds
+        client_args=_HTTP_POOL_ARGS,
+        async_client_args=_HTTP_POOL_ARGS
+    )
 )
 
+logger = logging.getLogger(__name__)
+
+# Per-deal context caches (pitch deck + memo) shared by fact checking and investor chat
+deal_context_cache = DealContextCache(client)
+
+def _to_json(obj: Any) -> str:
+    """Serialize obj compactly for embedding in a prompt (indentation only costs input tokens)"""
+    return orjson.dumps(obj, default=str).decode()
+
+class _RawToken(str):
+    """Literal JSON punctuation queued by _dump_capped (as opposed to a value still to encode)"""
+
+def _dump_capped(obj: Any, cap: int) -> str:
+    """
+    Compact JSON of obj truncated to cap chars - same text as _to_json(obj)[:cap], but the walk
+    stops once cap is reached, so large trailing sections (e.g. competitor_details) are never serialized.
+    """
+    out: List[str] = []
+    size = 0
+    stack: List[Any] = [obj]
+    while stack and size < cap:
+        item = stack.pop()
+        if isinstance(item, _RawToken):
+            piece = item
+        elif isinstance(item, dict):
+            entries = list(item.items())
+            stack.append(_RawToken("}"))
+            for i in range(len(entries) - 1, -1, -1):
+                key, value = entries[i]
+                stack.append(value)
+                stack.append(_RawToken(orjson.dumps(str(key)).decode() + ":"))
+                if i:
+                    stack.append(_RawToken(","))
+            piece = "{"
+        elif isinstance(item, (list, tuple)):
+            stack.append(_RawToken("]"))
+            for i in range(len(item) - 1, -1, -1):
+                stack.append(item[i])
+                if i:
+                    stack.append(_RawToken(","))
+            piece = "["
+        else:
+            piece = orjson.dumps(item, default=str).decode()
+        out.append(piece)
+        size += len(piece)
+    return "".join(out)[:cap]
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_SECTION_SPLIT_RE = re.compile(r"\n\s*\n")
+_NUMBER_RE = re.compile(r"\d[\d,.]*%?")
+_PROPER_NOUN_RE = re.compile(r"\b[A-Z][a-zA-Z]+\b")
+
+@functools.lru_cache(maxsize=256)
+def _pack_context(text: str, max_chars: int) -> str:
+    """
+    Fit deck text into a char budget (~4 chars/token) keeping the highest-signal sections.
+    Sections (blank-line separated) are whitespace-collapsed and scored by density of
+    figures and named entities; the best ones are packed greedily and emitted in deck order,
+    so the financials/team pages at the end of a deck aren't cut off by a naive [:N] slice.
+    """
+    sections = [_WHITESPACE_RE.sub(" ", sec).strip() for sec in _SECTION_SPLIT_RE.split(text)]
+    sections = [sec for sec in sections if sec]
+    if sum(len(sec) + 2 for sec in sections) <= max_chars:
+        return "\n\n".join(sections)
+    
+    def score(sec: str) -> float:
+        return (2 * len(_NUMBER_RE.findall(sec)) + len(_PROPER_NOUN_RE.findall(sec))) / (len(sec) + 50)
+    
+    ranked = sorted(range(len(sections)), key=lambda i: score(sections[i]), reverse=True)
+    kept, used = set(), 0
+    for i in ranked:
+        size = len(sections[i]) + 2
+        if used + size <= max_chars:
+            kept.add(i)
+            used += size
+    if not kept:
+        return sections[ranked[0]][:max_chars]
+    return "\n\n".join(sections[i] for i in sorted(kept))
+
+# Validators for the large analysis responses (parse + validate in one pass)
+_ANALYSIS_ADAPTER = TypeAdapter(MemoAnalysis)
+_RECALC_ADAPTER = TypeAdapter(RiskFactorScoring)
+_CONCLUSION_ADAPTER = TypeAdapter(RecalculatedConclusion)
+_FENCE_RE = re.compile(r"^```(?:json)?\s*|\s*```$", re.S)
+
 # Model priority list (will try in order if one fails)
 MODELS_PRO = ["gemini-3-pro-preview", "gemini-2.5-pro"]  # Try 3-pro first, fallback to 2.5-pro
 MODELS_FLASH = ["gemini-2.5-flash", "gemini-2.0-flash"]
 
+# Shared request configs: built and validated once at import, never mutated per call
+_SEARCH_TOOL = Tool(google_search=GoogleSearch())
+_ANALYSIS_PARAMS = dict(temperature=0.2, top_p=0.8, top_k=40, max_output_tokens=16384)
+_ANALYSIS_CONFIG = GenerateContentConfig(tools=[_SEARCH_TOOL], **_ANALYSIS_PARAMS)
+_RECALC_CONFIG = GenerateContentConfig(
+    temperature=0.1,
+    max_output_tokens=4096,
+    response_mime_type="application/json",
+)
+_CHAT_SUMMARY_CONFIG = GenerateContentConfig(temperature=0.1, max_output_tokens=1024)
+# Static-instruction calls: the instructions go in system_instruction (or an explicit context
+# cache, see _get_prompt_cache) so contents only ever carry the per-request input
+_INVESTOR_CHAT_PARAMS = dict(temperature=0.3, max_output_tokens=5000)
+_CLAIM_EXTRACTION_PARAMS = dict(
+    temperature=0.1,
+    response_mime_type="application/json",
+    response_schema=ClaimsExtraction
+)
+_CLAIM_VERIFICATION_CONFIG = GenerateContentConfig(tools=[_SEARCH_TOOL], temperature=0.1)
+# Gemini 3 accepts a response schema alongside Google Search; 2.x rejects JSON mode with tools
+_CLAIM_VERIFICATION_SCHEMA_CONFIG = GenerateContentConfig(
+    tools=[_SEARCH_TOOL],
+    temperature=0.1,
+    response_mime_type="application/json",
+    response_schema=FactCheck
+)
+# Schema-constrained output: guaranteed JSON array of CMAYear, no fence stripping needed
+_CMA_EXTRACTION_PARAMS = dict(
+    temperature=0.1,
+    response_mime_type="application/json",
+    response_schema=list[CMAYear],
+    max_output_tokens=32768
+)
+_WEB_RESEARCH_PARAMS = dict(
+    temperature=0.4, # Slightly higher for creative inference
+    top_p=0.95,
+    top_k=40,
+    max_output_tokens=8192,  # Grounded answers spend part of the budget on search context
+    tools=[_SEARCH_TOOL]
+)
+# Same split as claim verification: JSON mode alongside Google Search only on Gemini 3
+_WEB_RESEARCH_CONFIG = GenerateContentConfig(**_WEB_RESEARCH_PARAMS)
+_WEB_RESEARCH_JSON_CONFIG = GenerateContentConfig(response_mime_type="application/json", **_WEB_RESEARCH_PARAMS)
+
+def _content_digest(data: bytes) -> str:
+    """Content key shared by the Files API handle cache and deal context-cache fingerprints"""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+# Files API uploads expire after 48h; evict a little earlier so we never hand out a dead URI
+_FILE_URI_TTL_SECONDS = 47 * 3600
+_file_uri_cache: Dict[str, tuple] = {}  # digest(pdf) -> (file_uri, uploaded_at)
+_upload_locks: Dict[str, list] = {}  # digest(pdf) -> [lock, callers holding or waiting on it]
+
+async def _ensure_uploaded(pdf_bytes: bytes) -> str:
+    """
+    Upload a PDF to the Gemini Files API once and return its URI (cached by content hash).
+    Concurrent callers for the same PDF (analysis, fact check, CMA) wait on one upload.
+    """
+    digest = _content_digest(pdf_bytes)
+    # Locks live only while someone holds or waits on them, independent of the URI cache
+    entry = _upload_locks.setdefault(digest, [asyncio.Lock(), 0])
+    entry[1] += 1
+    try:
+        async with entry[0]:
+            now = time.monotonic()
+            cached = _file_uri_cache.get(digest)
+            if cached and now - cached[1] < _FILE_URI_TTL_SECONDS:
+                return cached[0]
+            
+            # Drop expired handles while we're here
+            for key in [k for k, (_, ts) in _file_uri_cache.items() if now - ts >= _FILE_URI_TTL_SECONDS]:
+                del _file_uri_cache[key]
+            
+            logger.info("📤 Uploading PDF to Gemini Files API (%s bytes)", len(pdf_bytes))
+            uploaded = await client.aio.files.upload(
+                file=io.BytesIO(pdf_bytes),
+                config={'mime_type': 'application/pdf'}
+            )
+            _file_uri_cache[digest] = (uploaded.uri, now)
+            return uploaded.uri
+    finally:
+        entry[1] -= 1
+        if not entry[1]:
+            del _upload_locks[digest]
+
+async def _pdf_part(pdf_bytes: bytes) -> Part:
+    """PDF content part backed by a Files API handle, falling back to inline bytes if upload fails"""
+    try:
+        uri = await _ensure_uploaded(pdf_bytes)
+        return Part.from_uri(file_uri=uri, mime_type="application/pdf")
+    except Exception as e:
+        logger.warning("⚠️ Files API upload failed, sending PDF inline: %s", e)
+        return Part.from_bytes(data=pdf_bytes, mime_type="application/pdf")
+
+async def warmup_gemini_client():
+    """Open the pooled connection (TLS + HTTP/2 handshake) at startup so the first request doesn't pay for it"""
+    try:
+        await client.aio.models.get(model=MODELS_FLASH[0])
+        logger.info("🔥 Gemini client connection warmed up")
+    except Exception as e:
+        logger.warning("⚠️ Gemini client warmup failed: %s", e)
+
+# Explicit context caches for static instruction blocks. Caches are bound to a model, and tools
+# must live in the cache alongside the instructions. Created lazily, refreshed a minute before
+# the server-side TTL runs out; a failed create backs off instead of retrying on every call.
+_PROMPT_CACHE_TTL_SECONDS = 3600
+_PROMPT_CACHE_RETRY_SECONDS = 600
+_PROMPT_CACHE_MIN_CHARS = 4096  # ~1024 tokens: below the models' minimum cacheable size, create would just fail
+_prompt_caches: Dict[tuple, tuple] = {}  # (name, model) -> (cached-content config or None, valid_until)
+
+async def _get_prompt_cache(
+    name: str,
+    model_name: str,
+    system_instruction: str,
+    tools: Optional[List[Tool]] = None,
+    params: Optional[Dict[str, Any]] = None
+) -> Optional[GenerateContentConfig]:
+    """
+    Return a request config referencing the cached system_instruction for this model, or None
+    when no cache is available (caller then sends the instructions inline as system_instruction).
+    """
+    if len(system_instruction) < _PROMPT_CACHE_MIN_CHARS:
+        return None
+    now = time.monotonic()
+    cached = _prompt_caches.get((name, model_name))
+    if cached and now < cached[1]:
+        return cached[0]
+    try:
+        cache = await client.aio.caches.create(
+            model=model_name,
+            config=CreateCachedContentConfig(
+                display_name=name,
+                system_instruction=system_instruction,
+                tools=tools,
+                ttl=f"{_PROMPT_CACHE_TTL_SECONDS}s"
+            )
+        )
+        config = GenerateContentConfig(cached_content=cache.name, **(params or {}))
+        _prompt_caches[(name, model_name)] = (config, now + _PROMPT_CACHE_TTL_SECONDS - 60)
+        logger.info("🗄️ Created %s cache for %s: %s", name, model_name, cache.name)
+        return config
+    except Exception as e:
+        logger.warning("⚠️ Could not create %s cache for %s: %s", name, model_name, e)
+        _prompt_caches[(name, model_name)] = (None, now + _PROMPT_CACHE_RETRY_SECONDS)
+        return None
+
+def _instruction_request(
+    name: str,
+    system_instruction: str,
+    contents,
+    inline_config: GenerateContentConfig,
+    tools: Optional[List[Tool]] = None,
+    params: Optional[Dict[str, Any]] = None
+) -> Callable[[str], Awaitable[tuple]]:
+    """config_factory for *_with_fallback: cached instructions when available, inline system_instruction otherwise"""
+    async def factory(model_name: str) -> tuple:
+        cached_config = await _get_prompt_cache(name, model_name, system_instruction, tools, params)
+        return contents, cached_config or inline_config
+    return factory
+
+# Content-addressed cache for near-deterministic extraction calls (same deck/CMA -> same result)
+_PDF_RESULT_CACHE_SIZE = 128
+_pdf_result_cache: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (orjson bytes, stored_at)
+
+def pdf_result_cache(
+    ttl: int,
+    should_cache: Optional[Callable[[Any], bool]] = None,
+    key_args: tuple = ()
+):
+    """
+    Cache an async extraction function's result keyed on a BLAKE2b hash of its document input
+    (pdf_bytes, or raw_text/extracted_text when no PDF is given), plus any key_args that also
+    shape the result. Results are stored as orjson bytes so every hit hands back a fresh copy
+    the caller can mutate: in an in-process LRU, backed by the on-disk result_cache.
+    Callers can pass force_refresh=True to skip both tiers and recompute.
+    """
+    def decorator(fn):
+        signature = inspect.signature(fn)
+
+        @functools.wraps(fn)
+        async def wrapper(*args, force_refresh: bool = False, **kwargs):
+            bound_args = signature.bind(*args, **kwargs)
+            bound_args.apply_defaults()
+            bound = bound_args.arguments
+            payload = bound.get('pdf_bytes') or bound.get('raw_text') or bound.get('extracted_text')
+            if not payload:
+                return await fn(*args, **kwargs)
+            if isinstance(payload, str):
+                payload = payload.encode()
+
+            digest = hashlib.blake2b(payload, digest_size=16)
+            for name in key_args:
+                digest.update(orjson.dumps(bound.get(name), default=str, option=orjson.OPT_SORT_KEYS))
+            key = f"{fn.__name__}:{digest.hexdigest()}"
+            
+            def remember(data: bytes):
+                _pdf_result_cache[key] = (data, time.monotonic())
+                _pdf_result_cache.move_to_end(key)
+                if len(_pdf_result_cache) > _PDF_RESULT_CACHE_SIZE:
+                    _pdf_result_cache.popitem(last=False)
+            
+            if not force_refresh:
+                cached = _pdf_result_cache.get(key)
+                if cached and time.monotonic() - cached[1] < ttl:
+                    _pdf_result_cache.move_to_end(key)
+                    logger.info("♻️ Cache hit for %s", fn.__name__)
+                    return orjson.loads(cached[0])
+
+            # Disk tier: corrupt entries, the size cap and should_cache are all handled there
+            return await result_cache.get_or_compute(
+                fn.__name__, digest.hexdigest(), lambda: fn(*args, **kwargs), ttl,
+                force_refresh=force_refresh, should_cache=should_cache, on_cached=remember
+            )
+        return wrapper
+    return decorator
+
+# Errors worth retrying on the next model in the list
+_RETRIABLE_RE = re.compile(r"503|overloaded|unavailable|empty response", re.I)
+
+def _is_fallback_error(e: Exception) -> bool:
+    """5xx / rate-limited (429) / empty output: worth retrying on the next model"""
+    if isinstance(e, genai_errors.ServerError):
+        return True
+    if isinstance(e, genai_errors.APIError) and e.code == 429:
+        return True  # Quotas are per model, so the next one may still have headroom
+    return _RETRIABLE_RE.search(str(e)) is not None
+
+# Hedged fallback: on the slow (pro) path, start the next model if the current one runs past
+# its own p95 latency instead of waiting for it to fail; the first success wins
+_HEDGE_MIN_DELAY_SECONDS = 3.0
+_HEDGE_MIN_SAMPLES = 10
+_model_latencies: Dict[str, deque] = defaultdict(lambda: deque(maxlen=50))
+
+def _hedge_delay(model_name: str) -> float:
+    """Seconds to give model_name before hedging: its rolling p95, once enough samples exist"""
+    samples = sorted(_model_latencies[model_name])
+    if len(samples) < _HEDGE_MIN_SAMPLES:
+        return float("inf")  # No baseline yet: plain sequential fallback
+    return max(_HEDGE_MIN_DELAY_SECONDS, samples[int(len(samples) * 0.95) - 1])
+
+async def _generate_once(model_name: str, contents, config: GenerateContentConfig) -> Any:
+    logger.info("🤖 Trying model: %s", model_name)
+    start = time.monotonic()
+    response = await client.aio.models.generate_content(
+        model=model_name,
+        contents=contents,
+        config=config
+    )
+    
+    # Additional check: If response.text is None (e.g. Safety Filters), treat as failure
+    if not response.text:
+        logger.warning("⚠️ Model %s returned empty text (Use Fallback)", model_name)
+        if hasattr(response, 'candidates') and response.candidates:
+             logger.debug("Details: %s", response.candidates[0].finish_reason)
+        raise ValueError("Empty response from model")
+    
+    _model_latencies[model_name].append(time.monotonic() - start)
+    logger.info("✅ Success with model: %s", model_name)
+    return response
+
 async def generate_with_fallback(
     contents,
     config: GenerateContentConfig,
     models: List[str] = None,
-    use_flash: bool = False
+    use_flash: bool = False,
+    config_factory: Optional[Callable[[str], Awaitable[tuple]]] = None
 ) -> Any:
     """
     Generate content with automatic model fallback.
     If the primary model returns 503/overloaded, tries the next model in the list.
+    On the pro path, a model that runs past its p95 latency is hedged with the next one.
+    config_factory: optional async (model_name) -> (contents, config), as in stream_with_fallback.
+    """
+    if models is None:
+        models = MODELS_FLASH if use_flash else MODELS_PRO
+    
+    remaining = list(models)
+    pending: Dict[asyncio.Task, str] = {}
+    last_error = None
+    fatal_error = None  # Non-retriable failure: launch nothing new, but let a running hedge finish
+    
+    async def attempt(model_name: str) -> Any:
+        model_contents, model_config = (await config_factory(model_name)) if config_factory else (contents, config)
+        return await _generate_once(model_name, model_contents, model_config)
+    
+    def launch():
+        model_name = remaining.pop(0)
+        pending[asyncio.create_task(attempt(model_name))] = model_name
+        return model_name
+    
+    latest = launch()
+    try:
+        while pending:
+            # Flash is cheap enough that sequential fallback is fine; only hedge the pro path
+            timeout = _hedge_delay(latest) if remaining and not use_flash and fatal_error is None else float("inf")
+            done, _ = await asyncio.wait(
+                pending,
+                timeout=None if timeout == float("inf") else timeout,
+                return_when=asyncio.FIRST_COMPLETED
+            )
+            if not done:
+                logger.info("⏱️ %s is past its p95 latency, hedging with %s", latest, remaining[0])
+                latest = launch()
+                continue
+            
+            for task in done:
+                model_name = pending.pop(task)
+                if task.exception() is None:
+                    return task.result()
+                
+                e = task.exception()
+                logger.warning("⚠️ Model %s failed: %s", model_name, str(e)[:100])
+                last_error = e
+                # Continue to next model if 503/overloaded OR if empty response
+                if not _is_fallback_error(e):
+                    # For other errors, don't try fallback; an in-flight hedge may still succeed
+                    fatal_error = fatal_error or e
+                elif remaining and not pending and fatal_error is None:
+                    latest = launch()
+    finally:
+        # Cancel the losers
+        for task in pending:
+            task.cancel()
+    
+    # All models failed (a non-retriable error is the more useful one to surface)
+    raise fatal_error or last_error
+
+async def stream_with_fallback(
+    contents,
+    config: GenerateContentConfig,
+    models: List[str] = None,
+    use_flash: bool = False,
+    config_factory: Optional[Callable[[str], Awaitable[tuple]]] = None
+) -> AsyncIterator[str]:
+    """
+    Streaming counterpart of generate_with_fallback: yields text chunks as they are generated.
+    Model fallback happens only before the first token is emitted - an error or an empty
+    first chunk moves on to the next model; once text has been yielded we are committed.
+    config_factory: optional async (model_name) -> (contents, config) for model-specific
+    requests (e.g. context caches, which are bound to one model).
     """
     if models is None:
         models = MODELS_FLASH if use_flash else MODELS_PRO
@@ -32,73 +476,50 @@ async def generate_with_fallback(
     last_error = None
     for model_name in models:
         try:
-            print(f"🤖 Trying model: {model_name}")
-            response = client.models.generate_content(
+            logger.info("🤖 Trying model (streaming): %s", model_name)
+            model_contents, model_config = (await config_factory(model_name)) if config_factory else (contents, config)
+            stream = await client.aio.models.generate_content_stream(
                 model=model_name,
-                contents=contents,
-                config=config
+                contents=model_contents,
+                config=model_config
             )
-            print(f"✅ Success with model: {model_name}")
-            
-            # Additional check: If response.text is None (e.g. Safety Filters), treat as failure
-            if not response.text:
-                print(f"⚠️ Model {model_name} returned empty text (Use Fallback)")
-                if hasattr(response, 'candidates') and response.candidates:
-                     print(f"Details: {response.candidates[0].finish_reason}")
+            # Wait for the first non-empty chunk before committing to this model
+            first_text = None
+            async for chunk in stream:
+                if chunk.text:
+                    first_text = chunk.text
+                    break
+            if first_text is None:
+                logger.warning("⚠️ Model %s returned empty text (Use Fallback)", model_name)
                 raise ValueError("Empty response from model")
-
-            return response
         except Exception as e:
             error_msg = str(e)
-            print(f"⚠️ Model {model_name} failed: {error_msg[:100]}")
+            logger.warning("⚠️ Model %s failed: %s", model_name, error_msg[:100])
             last_error = e
-            # Continue to next model if 503/overloaded OR if empty response
-            if "503" in error_msg or "overloaded" in error_msg.lower() or "UNAVAILABLE" in error_msg or "Empty response" in error_msg:
+            if _is_fallback_error(e):
                 continue
-            else:
-                # For other errors, don't try fallback
-                raise e
+            raise e
+        
+        logger.info("✅ Streaming from model: %s", model_name)
+        yield first_text
+        async for chunk in stream:
+            if chunk.text:
+                yield chunk.text
+        return
     
     # All models failed
     raise last_error
 
-async def analyze_with_gemini(
-    pdf_bytes: Optional[bytes] = None,
-    extracted_text: Optional[str] = None,
-    cma_text: Optional[str] = None,
-    weightage: Dict[str, int] = None,
-    processing_mode: str = "fast"
-) -> Dict[str, Any]:
-    """
-    Analyze pitch deck content using Gemini with Google Search grounding.
-    Can accept either PDF bytes (preferred) or extracted text.
-    processing_mode: 'fast' uses gemini-2.5-flash, 'research' uses gemini-3-pro-preview
-    """
-    if weightage is None:
-        weightage = {
-            'team_strength': 20,
-            'market_opportunity': 20,
-            'traction': 20,
-            'claim_credibility': 20,
-            'financial_health': 20
-        }
-    try:
-        # Build CMA section if available
-        cma_section = ""
-        if cma_text:
-            cma_section = f"""
-
-CMA REPORT DATA (Credit Monitoring Arrangement - Financial Statements):
-{cma_text[:40000]}
-"""
-
-        # 4-Gate Digital Underwriting Framework Prompt
-        prompt = f"""
+# 4-Gate Digital Underwriting Framework prompt. Static apart from the CMA section,
+# so it is kept as plain strings (no f-string brace escaping) and joined per call.
+_PROMPT_HEAD = """
 You are an expert Bank Credit Officer working for a modern Indian NBFC/Bank. Your job is to analyze loan applications from startups and MSMEs using the "4-Gate Credit Algorithm" framework.
 
 Analyze the attached Pitch Deck and the following CMA Report data to determine whether this business should be sanctioned the requested loan.
 
-{cma_section}
+"""
+
+_PROMPT_TAIL = """
 
 === THE 4-GATE CREDIT ALGORITHM ===
 
@@ -190,43 +611,43 @@ Goal: Synthesize a decision.
 
 Return your analysis in the following JSON structure:
 
-{{
-    "company_overview": {{
+{
+    "company_overview": {
         "name": "Company name from pitch deck",
         "sector": "Industry/Sector",
         "founders": [
-            {{
+            {
                 "name": "Founder name",
                 "education": "Educational background with institution names",
                 "professional_background": "Detailed work experience with companies and roles",
                 "previous_ventures": "Prior entrepreneurial experience with outcomes"
-            }}
+            }
         ],
         "technologies_used": "Detailed description of core technologies, frameworks, and technical stack",
         "key_problems_solved": ["Problem 1", "Problem 2", "Problem 3"],
         "loan_amount_requested": "Amount requested in the pitch deck (e.g., ₹50 Lakhs)",
         "purpose_of_loan": "What the loan will be used for"
-    }},
-    "market_analysis": {{
-        "industry_size_and_growth": {{
-            "total_addressable_market": {{
+    },
+    "market_analysis": {
+        "industry_size_and_growth": {
+            "total_addressable_market": {
                 "name": "TAM description",
                 "value": "market size with units (use Google Search for current data)",
                 "cagr": "growth rate from recent reports",
                 "source": "cite source with year"
-            }},
-            "serviceable_obtainable_market": {{
+            },
+            "serviceable_obtainable_market": {
                 "name": "SOM description",
                 "value": "realistic market size for this company",
                 "projection": "future projections for next 3-5 years",
                 "cagr": "projected growth rate",
                 "source": "cite source with year"
-            }},
+            },
             "commentary": "detailed market insights and trends"
-        }},
+        },
         "sub_segment_opportunities": ["opportunity 1", "opportunity 2", "opportunity 3"],
         "competitor_details": [
-            {{
+            {
                 "name": "competitor name (search for real competitors)",
                 "headquarters": "HQ location",
                 "founding_year": "year founded",
@@ -243,131 +664,131 @@ Return your analysis in the following JSON structure:
                 "current_mrr": "MRR if publicly known",
                 "arr_growth_rate": "growth rate if available",
                 "churn_rate": "customer churn rate if available"
-            }}
+            }
         ],
         "reports": [
-            {{
+            {
                 "title": "relevant industry report title (search Google)",
                 "source_name": "report publisher name",
                 "source_url": "URL to report",
                 "summary": "2-3 sentence summary of key findings"
-            }}
+            }
         ]
-    }},
-    "credit_analysis": {{
+    },
+    "credit_analysis": {
         "gates": [
-            {{
+            {
                 "gate_number": 1,
                 "gate_name": "Policy & Market Knock-Out",
                 "status": "Pass/Fail/Review",
                 "checks": [
-                    {{
+                    {
                         "name": "Negative List Check",
                         "status": "Pass/Fail",
                         "result": "Industry/Sector name",
                         "details": "Explanation",
                         "flags": []
-                    }},
-                    {{
+                    },
+                    {
                         "name": "Sector Viability",
                         "status": "Pass/Fail/Review",
                         "result": "Green/Amber/Red (Sector Type)",
                         "details": "Explanation",
                         "flags": []
-                    }},
-                    {{
+                    },
+                    {
                         "name": "Market Sizing Reality",
                         "status": "Pass/Fail",
                         "result": "Projected market share %",
                         "details": "Assessment of projections",
                         "flags": []
-                    }}
+                    }
                 ]
-            }},
-            {{
+            },
+            {
                 "gate_number": 2,
                 "gate_name": "Data Integrity Audit",
                 "status": "Pass/Fail/Review",
                 "checks": [
-                    {{
+                    {
                         "name": "Accounting Equation",
                         "status": "Pass/Fail",
                         "result": "Balance check result",
                         "details": "Verification details",
                         "flags": []
-                    }},
-                    {{
+                    },
+                    {
                         "name": "Hockey Stick Check",
                         "status": "Pass/Fail",
                         "result": "Revenue vs Capex growth comparison",
                         "details": "Analysis",
                         "flags": []
-                    }},
-                    {{
+                    },
+                    {
                         "name": "Unit Economics Audit",
                         "status": "Pass/Fail",
                         "result": "Margin projection analysis",
                         "details": "EBITDA margin trends",
                         "flags": []
-                    }}
+                    }
                 ]
-            }},
-            {{
+            },
+            {
                 "gate_number": 3,
                 "gate_name": "Financial Assessment",
                 "status": "Pass/Fail/Review",
                 "checks": [
-                    {{
+                    {
                         "name": "MPBF Calculation",
                         "status": "Pass/Fail",
                         "result": "Calculated limit (e.g., ₹40 Lakhs)",
                         "details": "Turnover method calculation",
                         "flags": []
-                    }},
-                    {{
+                    },
+                    {
                         "name": "DSCR",
                         "status": "Pass/Fail",
                         "result": "DSCR value (e.g., 1.45)",
                         "details": "Repayment capacity analysis",
                         "flags": []
-                    }},
-                    {{
+                    },
+                    {
                         "name": "Current Ratio",
                         "status": "Pass/Fail",
                         "result": "Ratio value",
                         "details": "Liquidity assessment",
                         "flags": []
-                    }},
-                    {{
+                    },
+                    {
                         "name": "TOL/TNW Ratio",
                         "status": "Pass/Fail",
                         "result": "Leverage ratio",
                         "details": "Debt capacity assessment",
                         "flags": []
-                    }}
+                    }
                 ]
-            }},
-            {{
+            },
+            {
                 "gate_number": 4,
                 "gate_name": "Final Verdict & Specifics",
                 "status": "Pass/Fail/Review",
                 "checks": [
-                    {{
+                    {
                         "name": "Runway Test",
                         "status": "Pass/Fail",
                         "result": "X months runway",
                         "details": "Cash burn analysis",
                         "flags": []
-                    }},
-                    {{
+                    },
+                    {
                         "name": "CGTMSE Eligibility",
                         "status": "Pass/Fail",
                         "result": "Eligible/Not Eligible",
                         "details": "Government guarantee assessment",
                         "flags": []
-                    }}
+                    }
                 ]
-            }}
+            }
         ],
         
         "loan_amount_requested": "₹X Lakhs",
@@ -384,67 +805,22 @@ Return your analysis in the following JSON structure:
         "cgtmse_eligible": true/false,
         
         "summary_table": [
-            {{"parameter": "Industry Risk", "result": "SaaS / Technology (Sunrise)", "status": "🟢 Low"}},
-            {{"parameter": "Data Integrity", "result": "Growth aligns with Capex", "status": "🟢 Verified"}},
-            {{"parameter": "MPBF Limit", "result": "₹40 Lakhs (vs Request ₹50L)", "status": "🟡 Restricted"}},
-            {{"parameter": "DSCR", "result": "1.45 (Acceptable)", "status": "🟢 Pass"}},
-            {{"parameter": "Collateral", "result": "None (CGTMSE Cover)", "status": "🟢 Secured"}}
+            {"parameter": "Industry Risk", "result": "SaaS / Technology (Sunrise)", "status": "🟢 Low"},
+            {"parameter": "Data Integrity", "result": "Growth aligns with Capex", "status": "🟢 Verified"},
+            {"parameter": "MPBF Limit", "result": "₹40 Lakhs (vs Request ₹50L)", "status": "🟡 Restricted"},
+            {"parameter": "DSCR", "result": "1.45 (Acceptable)", "status": "🟢 Pass"},
+            {"parameter": "Collateral", "result": "None (CGTMSE Cover)", "status": "🟢 Secured"}
         ],
         
         "final_verdict": "Detailed recommendation statement (e.g., 'Sanction up to some Lakhs under CGTMSE scheme. Subject to Promoter Margin of 5% being deposited upfront.')"
-    }},
+    },
     
-    "market_analysis": {{
-        "industry_size_and_growth": {{
-            "total_addressable_market": {{
-                "name": "TAM description",
-                "value": "Market size with units (use Google Search for current data)",
-                "cagr": "Growth rate from recent reports",
-                "source": "Cite source with year"
-            }},
-            "serviceable_obtainable_market": {{
-                "name": "SOM description",
-                "value": "Realistic market size for this company",
-                "projection": "Future projections for next 3-5 years",
-                "cagr": "Projected growth rate",
-                "source": "Cite source with year"
-            }},
-            "commentary": "Detailed market insights and trends"
-        }},
-        "sub_segment_opportunities": ["Opportunity 1", "Opportunity 2", "Opportunity 3"],
-        "competitor_details": [
-            {{
-                "name": "Competitor name (search for real competitors)",
-                "headquarters": "HQ location",
-                "founding_year": "Year founded",
-                "total_funding_raised": "Total funding amount",
-                "funding_rounds": "Number of rounds and details",
-                "investors": "List of key investors",
-                "business_model": "How they make money",
-                "revenue_streams": "Primary revenue sources",
-                "target_market": "Their target customers",
-                "gross_margin": "Gross margin % if available",
-                "net_margin": "Net margin % if available",
-                "current_arr": "ARR if publicly known",
-                "current_mrr": "MRR if publicly known"
-            }}
-        ],
-        "reports": [
-            {{
-                "title": "Relevant industry report title (search Google)",
-                "source_name": "Report publisher name",
-                "source_url": "URL to report",
-                "summary": "2-3 sentence summary of key findings"
-            }}
-        ]
-    }},
-    
-    "financials": {{
-        "arr_mrr": {{
+    "financials": {
+        "arr_mrr": {
             "current_booked_arr": "Annual Recurring Revenue",
             "current_mrr": "Monthly Recurring Revenue"
-        }},
-        "burn_and_runway": {{
+        },
+        "burn_and_runway": {
             "implied_net_burn": "Monthly burn rate",
             "stated_runway": "Current runway without loan",
             "funding_ask": "Loan amount requested",
@@ -452,22 +828,30 @@ Return your analysis in the following JSON structure:
             "cm1": "Contribution Margin 1",
             "cm2": "Contribution Margin 2",
             "cm3": "Contribution Margin 3"
-        }},
+        },
         "funding_history": "Previous funding/loans",
         "valuation_rationale": "Current valuation basis",
         "projections": [
-            {{"year": "FY25", "revenue": "Projected revenue"}}
+            {"year": "FY25", "revenue": "Projected revenue"}
         ]
-    }},
+    },
+    
+    "claims_analysis": [
+        {
+            "claim": "Specific claim made in the pitch deck",
+            "evidence": "Supporting evidence from the deck, CMA data or search (or \"Not available\")",
+            "credibility": "High/Medium/Low"
+        }
+    ],
     
-    "conclusion": {{
+    "conclusion": {
         "overall_recommendation": "SANCTION/REJECT/CONDITIONAL - Clear verdict",
         "product_summary": "One sentence product summary",
         "financial_analysis": "Brief financial pros & cons",
         "credit_thesis": "Why sanction or reject - the core argument from a lender's perspective",
         "key_risks": "Summary of main credit risks identified"
-    }}
-}}
+    }
+}
 
 CRITICAL INSTRUCTIONS:
 1. Use Google Search to find real market data and competitor information
@@ -488,6 +872,50 @@ CRITICAL INSTRUCTIONS:
 16. Include all 5 risk categories with detailed mitigation strategies
 17. Return ONLY valid JSON, no additional text or markdown
 """
+
+# Context cache for the static 4-gate instructions: the prompt is identical across every
+# analysis, so it is prefilled once per model on the server and referenced by name.
+# Caches are bound to a model, and tools must live in the cache alongside the instructions.
+_ANALYSIS_SYSTEM_PROMPT = (
+    _PROMPT_HEAD
+    + "The CMA Report data (if any) and the Pitch Deck are provided in the user message.\n"
+    + _PROMPT_TAIL
+)
+
+@pdf_result_cache(ttl=86400, key_args=('cma_text', 'weightage', 'processing_mode'))
+@coalesce_inflight
+async def analyze_with_gemini(
+    pdf_bytes: Optional[bytes] = None,
+    extracted_text: Optional[str] = None,
+    cma_text: Optional[str] = None,
+    weightage: Dict[str, int] = None,
+    processing_mode: str = "fast"
+) -> Dict[str, Any]:
+    """
+    Analyze pitch deck content using Gemini with Google Search grounding.
+    Can accept either PDF bytes (preferred) or extracted text.
+    processing_mode: 'fast' uses gemini-2.5-flash, 'research' uses gemini-3-pro-preview
+    """
+    if weightage is None:
+        weightage = {
+            'team_strength': 20,
+            'market_opportunity': 20,
+            'traction': 20,
+            'claim_credibility': 20,
+            'financial_health': 20
+        }
+    try:
+        # Build CMA section if available
+        cma_section = ""
+        if cma_text:
+            cma_section = f"""
+
+CMA REPORT DATA (Credit Monitoring Arrangement - Financial Statements):
+{cma_text[:40000]}
+"""
+
+        # 4-Gate Digital Underwriting Framework Prompt (static head/tail built once at import)
+        prompt = "".join([_PROMPT_HEAD, cma_section, _PROMPT_TAIL])
         
         # Select model based on processing mode
         model_name = "gemini-2.5-flash" if processing_mode == "fast" else "gemini-3-pro-preview"
@@ -495,231 +923,401 @@ CRITICAL INSTRUCTIONS:
         # Build content parts based on input type
         if pdf_bytes:
             # Send PDF directly to Gemini (multimodal)
-            print(f"📄 Sending PDF directly to Gemini ({len(pdf_bytes)} bytes)")
+            logger.info("📄 Sending PDF directly to Gemini (%s bytes)", len(pdf_bytes))
             contents = [
-                Part.from_bytes(data=pdf_bytes, mime_type="application/pdf"),
+                await _pdf_part(pdf_bytes),
                 prompt
             ]
         elif extracted_text:
             # Fallback to text-based analysis
-            print(f"📝 Using extracted text for analysis ({len(extracted_text)} chars)")
+            logger.info("📝 Using extracted text for analysis (%s chars)", len(extracted_text))
             contents = f"{prompt}\n\nPitch Deck Content:\n{extracted_text[:50000]}"
         else:
             raise HTTPException(status_code=400, detail="Either pdf_bytes or extracted_text must be provided")
         
-        # Use fallback helper for automatic model switching on 503 errors
-        use_flash = (processing_mode == "fast")
-        response = await generate_with_fallback(
-            contents=contents,
-            config=GenerateContentConfig(
-                tools=[Tool(google_search=GoogleSearch())],
-                temperature=0.2,
-                top_p=0.8,
-                top_k=40,
-                max_output_tokens=16384
-            ),
-            use_flash=use_flash
-        )
-        
-        # Parse JSON response
-        response_text = response.text.strip()
-        
-        # Remove markdown formatting if present
-        if response_text.startswith("```json"):
-            response_text = response_text[7:-3].strip()
-        elif response_text.startswith("```"):
-            response_text = response_text[3:-3].strip()
-        
-        # If response doesn't start with {, try to find JSON in the response
-        if not response_text.startswith("{"):
-            # Look for JSON block in markdown code block
-            import re
-            json_match = re.search(r'```json\s*([\s\S]*?)\s*```', response_text)
-            if json_match:
-                response_text = json_match.group(1).strip()
-            else:
-                # Try to find the outermost { } block
-                json_match = re.search(r'(\{[\s\S]*\})', response_text)
-                if json_match:
-                    response_text = json_match.group(1)
-                else:
-                    print(f"Could not find JSON in response: {response_text[:500]}")
-                    raise ValueError("No JSON found in response")
+        # Variable parts only (deck + CMA section) when the static instructions are served from cache
+        if pdf_bytes:
+            cached_contents = [contents[0], cma_section or "Analyze the attached Pitch Deck."]
+        else:
+            cached_contents = f"{cma_section}\n\nPitch Deck Content:\n{extracted_text[:50000]}"
         
-        # Parse JSON
-        analysis = json.loads(response_text)
+        async def analysis_request(model: str) -> tuple:
+            cached_config = await _get_prompt_cache(
+                "four-gate-analysis-prompt", model, _ANALYSIS_SYSTEM_PROMPT,
+                tools=[_SEARCH_TOOL], params=_ANALYSIS_PARAMS
+            )
+            if cached_config:
+                return cached_contents, cached_config
+            return contents, _ANALYSIS_CONFIG
         
-        # Validate required fields (risk fields optional for fast mode)
-        required_fields = [
-            'company_overview', 'market_analysis',
-            'financials', 'claims_analysis', 'conclusion'
+        # Stream with automatic model switching on 503 errors (fallback happens before the first token)
+        use_flash = (processing_mode == "fast")
+        chunks = [
+            chunk async for chunk in stream_with_fallback(
+                contents=contents,
+                config=None,
+                use_flash=use_flash,
+                config_factory=analysis_request
+            )
         ]
         
-        if processing_mode == "research":
-            required_fields.extend(['risk_metrics', 'risks_and_mitigation'])
-        
-        for field in required_fields:
-            if field not in analysis:
-                print(f"Warning: Missing required field: {field}")
-                analysis[field] = {}
+        # Parse + validate JSON directly; fence/prose stripping only runs if that fails
+        response_text = "".join(chunks).strip()
+        try:
+            parsed = _ANALYSIS_ADAPTER.validate_json(response_text)
+        except ValidationError:
+            json_str = _extract_json_object(_FENCE_RE.sub("", response_text))
+            if json_str is None:
+                logger.warning("Could not find JSON in response: %s", response_text[:500])
+                raise ValueError("No JSON found in response")
+            parsed = _ANALYSIS_ADAPTER.validate_json(json_str)
+        # MemoAnalysis requires every section the prompt asks for, so a partial response fails validation here
+        analysis = parsed.model_dump()
         
         # Add weightage metadata to the analysis
         analysis['_weightage_used'] = weightage
         
         return analysis
     
-    except json.JSONDecodeError as e:
-        print(f"Error parsing JSON from Gemini: {str(e)}")
-        print(f"Response text: {response_text[:500]}")
+    except (json.JSONDecodeError, ValidationError) as e:
+        logger.error("Error parsing JSON from Gemini: %s", e)
+        logger.debug("Response text: %s", response_text[:500])
         raise HTTPException(
             status_code=500, 
-            detail=f"Failed to parse analysis response. Invalid JSON format."
+            detail=f"Failed to parse analysis response. Invalid or incomplete JSON."
         )
     except Exception as e:
-        print(f"Error in Gemini analysis: {str(e)}")
+        logger.error("Error in Gemini analysis: %s", e)
         raise HTTPException(
             status_code=500, 
             detail=f"Failed to analyze content: {str(e)}"
         )
 
-async def recalculate_risk_and_conclusion(
-    existing_memo: Dict[str, Any], 
-    extracted_text: str,
-    weightage: Dict[str, int]
-) -> Dict[str, Any]:
-    """
-    Recalculate ONLY risk_metrics and conclusion based on new weightage
-    Uses both extracted text and existing memo for full context
-    Keeps all other sections unchanged
-    """
-    try:
-        # Extract key information from existing memo for context
-        company_name = existing_memo.get('company_overview', {}).get('name', 'Unknown')
-        sector = existing_memo.get('company_overview', {}).get('sector', 'Unknown')
-        
-        prompt = f"""
-You are a VC analyst recalculating risk assessment with NEW weightage.
+# Prompt templates are compiled once at import; string.Template keeps the JSON schema free of brace escaping
+_RECALC_PROMPT_TMPL = Template("""
+You are a VC analyst scoring the risk factors of a startup.
 
 ORIGINAL PITCH DECK CONTENT (for reference):
-{extracted_text[:15000]}
+$extracted_text
 
 EXISTING ANALYSIS:
-Company: {company_name} | Sector: {sector}
+Company: $company_name | Sector: $sector
 
 Team:
-{json.dumps(existing_memo.get('company_overview', {}), indent=2)[:1000]}
+$team_json
 
 Market:
-{json.dumps(existing_memo.get('market_analysis', {}), indent=2)[:2000]}
+$market_json
 
 Financials:
-{json.dumps(existing_memo.get('financials', {}), indent=2)[:1000]}
+$financials_json
 
 Claims:
-{json.dumps(existing_memo.get('claims_analysis', []), indent=2)[:1000]}
-
-NEW WEIGHTAGE (total=100%):
-- Team Strength: {weightage.get('team_strength', 20)}%
-- Market Opportunity: {weightage.get('market_opportunity', 20)}%
-- Traction: {weightage.get('traction', 20)}%
-- Claim Credibility: {weightage.get('claim_credibility', 20)}%
-- Financial Health: {weightage.get('financial_health', 20)}%
-
-TASK: Recalculate risk_metrics and conclusion using NEW weightage.
-
-CALCULATION METHOD:
-1. Review ORIGINAL pitch deck + EXISTING analysis
-2. Score each factor 0-100 (higher = riskier):
-   - Team: founder experience, completeness
-   - Market: TAM size, growth, competition
-   - Traction: ARR/MRR, growth rate, customers
-   - Claims: evidence vs claims ratio
-   - Financials: burn rate, runway, margins
-3. Apply formula: Composite = (Team×{weightage.get('team_strength')}/100) + (Market×{weightage.get('market_opportunity')}/100) + (Traction×{weightage.get('traction')}/100) + (Claims×{weightage.get('claim_credibility')}/100) + (Financials×{weightage.get('financial_health')}/100)
+$claims_json
+
+TASK: Review ORIGINAL pitch deck + EXISTING analysis and score each factor 0-100 (higher = riskier):
+   - team: founder experience, completeness
+   - market: TAM size, growth, competition
+   - traction: ARR/MRR, growth rate, customers
+   - claims: evidence vs claims ratio
+   - financials: burn rate, runway, margins
 
 Return ONLY this JSON (complete all fields):
 
-{{
-    "risk_metrics": {{
-        "composite_risk_score": 0,
-        "score_interpretation": "Low (0-40), Medium (41-70), High (71-100)",
-        "narrative_justification": "Explain calculation: Team risk X × {weightage.get('team_strength')}%, Market risk Y × {weightage.get('market_opportunity')}%, etc. Show how new weights changed the score."
-    }},
-    "conclusion": {{
+{
+    "factor_scores": {
+        "team": 0,
+        "market": 0,
+        "traction": 0,
+        "claims": 0,
+        "financials": 0
+    },
+    "conclusion": {
         "overall_attractiveness": "Start with INVEST/PASS/CONDITIONAL.",
         "product_summary": "One sentence summary of the product.",
         "financial_analysis": "Brief summary of financial pros & cons.",
         "investment_thesis": "Why invest? (or why not?). The core argument.",
-        "risk_summary": "Reference the composite risk score and the main risk factor."
-    }}
-}}
+        "risk_summary": "Name the main risk factor and why."
+    }
+}
 
 CRITICAL: Return ONLY valid complete JSON. No markdown.
-"""
-        
-        response = client.models.generate_content(
-            # model='gemini-3-pro-preview',
-            model='gemini-3-pro-preview',
-            contents=prompt,
-            config=GenerateContentConfig(
-                temperature=0.1,
-                max_output_tokens=4096,
-                response_mime_type="application/json",
-            )
-        )
-        
-        # Parse JSON response
-        response_text = response.text.strip()
-        
-        # Remove markdown formatting if present
-        if response_text.startswith("```json"):
-            response_text = response_text[7:-3].strip()
-        elif response_text.startswith("```"):
-            response_text = response_text[3:-3].strip()
-        
-        # Parse JSON
-        recalculated = json.loads(response_text)
-        
-        # Validate required fields
-        if 'risk_metrics' not in recalculated:
-            raise ValueError("Missing risk_metrics in response")
-        if 'conclusion' not in recalculated:
-            raise ValueError("Missing conclusion in response")
-        
-        # Validate nested fields
-        if 'composite_risk_score' not in recalculated['risk_metrics']:
-            raise ValueError("Missing composite_risk_score")
-        if 'overall_attractiveness' not in recalculated['conclusion']:
-            raise ValueError("Missing overall_attractiveness")
-        
-        return recalculated
+""")
+
+# Rewrites the conclusion when the investor's weightage moves the composite into another risk band
+_CONCLUSION_PROMPT_TMPL = Template("""
+You are a VC analyst. The investor re-weighted the risk factors of $company_name ($sector):
+$breakdown = $composite/100, a $interpretation risk.
+
+The conclusion below was written before re-weighting:
+$conclusion_json
+
+Rewrite it so it is consistent with a $interpretation composite risk: revise the INVEST/PASS/CONDITIONAL
+verdict and the risk summary where needed, and keep the product and financial facts unchanged.
+
+Return ONLY this JSON (complete all fields):
+{
+    "overall_attractiveness": "Start with INVEST/PASS/CONDITIONAL.",
+    "product_summary": "One sentence summary of the product.",
+    "financial_analysis": "Brief summary of financial pros & cons.",
+    "investment_thesis": "Why invest? (or why not?). The core argument.",
+    "risk_summary": "Name the main risk factor and why."
+}
+""")
+
+# Weightage key -> (factor score key, label). Order matches the weightage sliders in the UI
+_RISK_FACTORS = (
+    ('team_strength', 'team', 'Team'),
+    ('market_opportunity', 'market', 'Market'),
+    ('traction', 'traction', 'Traction'),
+    ('claim_credibility', 'claims', 'Claims'),
+    ('financial_health', 'financials', 'Financials'),
+)
+
+# Factor scores don't depend on weightage, so re-weighting the same memo is pure arithmetic
+_RISK_SCORE_CACHE_SIZE = 4096
+_risk_score_cache: "OrderedDict[str, dict]" = OrderedDict()  # memo hash -> RiskFactorScoring dump
+_band_conclusion_cache: "OrderedDict[str, dict]" = OrderedDict()  # memo hash:band -> rewritten conclusion
+
+def _memo_score_key(existing_memo: Dict[str, Any], extracted_text: str) -> str:
+    digest = hashlib.blake2b(extracted_text.encode(), digest_size=16)
+    for section in ('company_overview', 'market_analysis', 'financials', 'claims_analysis'):
+        digest.update(orjson.dumps(existing_memo.get(section), option=orjson.OPT_SORT_KEYS, default=str))
+    return digest.hexdigest()
+
+async def _score_risk_factors(existing_memo: Dict[str, Any], extracted_text: str, key: str) -> Dict[str, Any]:
+    """Per-factor scores + conclusion for a memo, scored once by flash and then served from the LRU"""
+    cached = _risk_score_cache.get(key)
+    if cached is not None:
+        _risk_score_cache.move_to_end(key)
+        logger.info("✅ Reusing cached risk factor scores")
+        return cached
     
-    except json.JSONDecodeError as e:
-        print(f"Error parsing JSON from Gemini: {str(e)}")
-        print(f"Full response text:\n{response_text}")
-        
+    company_overview = existing_memo.get('company_overview', {})
+    prompt = _RECALC_PROMPT_TMPL.substitute(
+        extracted_text=extracted_text[:15000],
+        company_name=company_overview.get('name', 'Unknown'),
+        sector=company_overview.get('sector', 'Unknown'),
+        team_json=_dump_capped(company_overview, 1000),
+        market_json=_dump_capped(existing_memo.get('market_analysis', {}), 2000),
+        financials_json=_dump_capped(existing_memo.get('financials', {}), 1000),
+        claims_json=_dump_capped(existing_memo.get('claims_analysis', []), 1000)
+    )
+    
+    response = await client.aio.models.generate_content(
+        model=MODELS_FLASH[0],
+        contents=prompt,
+        config=_RECALC_CONFIG
+    )
+    
+    # JSON mime mode: no markdown fences to strip
+    scoring = _RECALC_ADAPTER.validate_json(response.text.strip()).model_dump()
+    
+    _risk_score_cache[key] = scoring
+    if len(_risk_score_cache) > _RISK_SCORE_CACHE_SIZE:
+        _risk_score_cache.popitem(last=False)
+    return scoring
+
+def _interpret_risk_score(score: float) -> str:
+    if score <= 40:
+        return "Low"
+    if score <= 70:
+        return "Medium"
+    return "High"
+
+async def _conclusion_for_band(
+    existing_memo: Dict[str, Any],
+    key: str,
+    conclusion: Dict[str, Any],
+    breakdown: List[str],
+    composite: int,
+    interpretation: str
+) -> Dict[str, Any]:
+    """Conclusion rewritten for a risk band the scored conclusion wasn't written for (once per memo and band)"""
+    band_key = f"{key}:{interpretation}"
+    cached = _band_conclusion_cache.get(band_key)
+    if cached is not None:
+        _band_conclusion_cache.move_to_end(band_key)
+        return cached
+    
+    company_overview = existing_memo.get('company_overview', {})
+    prompt = _CONCLUSION_PROMPT_TMPL.substitute(
+        company_name=company_overview.get('name', 'Unknown'),
+        sector=company_overview.get('sector', 'Unknown'),
+        breakdown=' + '.join(breakdown),
+        composite=composite,
+        interpretation=interpretation,
+        conclusion_json=_to_json(conclusion)
+    )
+    response = await client.aio.models.generate_content(
+        model=MODELS_FLASH[0],
+        contents=prompt,
+        config=_RECALC_CONFIG
+    )
+    rewritten = _CONCLUSION_ADAPTER.validate_json(response.text.strip()).model_dump()
+    
+    _band_conclusion_cache[band_key] = rewritten
+    if len(_band_conclusion_cache) > _RISK_SCORE_CACHE_SIZE:
+        _band_conclusion_cache.popitem(last=False)
+    return rewritten
+
+async def recalculate_risk_and_conclusion(
+    existing_memo: Dict[str, Any], 
+    extracted_text: str,
+    weightage: Dict[str, int]
+) -> Dict[str, Any]:
+    """
+    Recalculate ONLY risk_metrics and conclusion based on new weightage
+    Factor scores come from the LLM (once per memo); the weighted composite is computed here
+    The conclusion is rewritten when the weightage moves the composite out of its equal-weight band
+    Keeps all other sections unchanged
+    """
+    key = _memo_score_key(existing_memo, extracted_text)
+    try:
+        scoring = await _score_risk_factors(existing_memo, extracted_text, key)
+    except (json.JSONDecodeError, ValidationError) as e:
+        logger.error("Error parsing JSON from Gemini: %s", e)
         raise HTTPException(
             status_code=500, 
             detail=f"Failed to parse recalculation response. Response was truncated or invalid."
         )
     except Exception as e:
-        print(f"Error recalculating risk and conclusion: {str(e)}")
+        logger.error("Error recalculating risk and conclusion: %s", e)
         raise HTTPException(
             status_code=500, 
             detail=f"Failed to recalculate: {str(e)}"
         )
+    
+    factor_scores = scoring['factor_scores']
+    composite = 0.0
+    breakdown = []
+    for weight_key, score_key, label in _RISK_FACTORS:
+        weight = weightage.get(weight_key, 20)
+        score = factor_scores[score_key]
+        composite += score * weight / 100
+        breakdown.append(f"{label} risk {score:g} × {weight}%")
+    composite = round(composite)
+    interpretation = _interpret_risk_score(composite)
+    
+    conclusion = scoring['conclusion']
+    # The scored conclusion was written without weights; equal weights are its implied baseline
+    baseline = _interpret_risk_score(round(sum(factor_scores.values()) / len(factor_scores)))
+    if interpretation != baseline:
+        try:
+            conclusion = await _conclusion_for_band(
+                existing_memo, key, conclusion, breakdown, composite, interpretation
+            )
+        except Exception as e:
+            logger.warning("⚠️ Could not rewrite conclusion for %s risk band, keeping original: %s", interpretation, e)
+    
+    # Copy so the cached conclusion isn't mutated per weightage
+    conclusion = dict(conclusion)
+    main_risk = max(_RISK_FACTORS, key=lambda f: factor_scores[f[1]] * weightage.get(f[0], 20))[2]
+    conclusion['risk_summary'] = (
+        f"Composite risk score {composite}/100 ({interpretation}); largest weighted contributor: {main_risk}. "
+        f"{conclusion.get('risk_summary', '')}"
+    ).strip()
+    
+    return {
+        "risk_metrics": {
+            "composite_risk_score": composite,
+            "score_interpretation": interpretation,
+            "narrative_justification": f"{' + '.join(breakdown)} = {composite}.",
+            "factor_scores": factor_scores
+        },
+        "conclusion": conclusion
+    }
+
+# Founder chat "memento": older turns are folded into a rolling summary so the prompt stays bounded
+FOUNDER_CHAT_RECENT_TURNS = 2      # Turns always sent verbatim
+FOUNDER_CHAT_SUMMARY_EVERY = 4     # Re-summarize once this many unsummarized turns pile up
+
+class FounderChatSession:
+    """Per-interview rolling summary of the founder chat"""
+    
+    def __init__(self):
+        self.chat_summary: Optional[str] = None
+        self.summarized_turns = 0  # Number of leading chat_history entries covered by chat_summary
+        self.memo_json: Optional[str] = None  # Memo is serialized once per memo version, not once per turn
+        self.memo_key: Optional[str] = None   # Version (or content digest) of the memo behind memo_json
+        self.prompt_cache: Optional[tuple] = None  # (cached-content config or None, valid_until)
+        self.lock = asyncio.Lock()
+
+_FOUNDER_CHAT_SESSION_CACHE_SIZE = 256
+_founder_chat_sessions: "OrderedDict[str, FounderChatSession]" = OrderedDict()
+# Strong references to in-flight summary refreshes; the event loop only keeps weak ones
+_founder_chat_tasks: set = set()
+
+def get_founder_chat_session(session_id: str) -> FounderChatSession:
+    """Get or create the rolling-summary session for an interview (LRU-bounded)"""
+    session = _founder_chat_sessions.get(session_id)
+    if session is None:
+        session = _founder_chat_sessions[session_id] = FounderChatSession()
+    _founder_chat_sessions.move_to_end(session_id)
+    if len(_founder_chat_sessions) > _FOUNDER_CHAT_SESSION_CACHE_SIZE:
+        _founder_chat_sessions.popitem(last=False)
+    return session
+
+def _schedule_founder_chat_summary(session: FounderChatSession, chat_history: list, upto: int):
+    """Refresh the session summary in the background, keeping the task referenced until it finishes"""
+    task = asyncio.create_task(_refresh_founder_chat_summary(session, list(chat_history), upto))
+    _founder_chat_tasks.add(task)
+    task.add_done_callback(_founder_chat_tasks.discard)
+
+async def _refresh_founder_chat_summary(session: FounderChatSession, chat_history: list, upto: int):
+    """Fold chat_history[summarized_turns:upto] into the session summary (at most one in flight per session)"""
+    if session.lock.locked():
+        return
+    async with session.lock:
+        new_turns = chat_history[session.summarized_turns:upto]
+        if not new_turns:
+            return
+        prompt = f"""
+        Summarize this founder interview so far in under 300 words. Keep every concrete fact the founder gave
+        (numbers, names, dates) and note which topics are still unanswered.
+        
+        Previous summary:
+        {session.chat_summary or "None"}
+        
+        New turns:
+        {_to_json(new_turns)}
+        """
+        try:
+            response = await client.aio.models.generate_content(
+                model='gemini-2.5-flash',
+                contents=prompt,
+                config=_CHAT_SUMMARY_CONFIG
+            )
+            if response.text:
+                session.chat_summary = response.text.strip()
+                session.summarized_turns = upto
+        except Exception as e:
+            logger.warning("⚠️ Failed to refresh founder chat summary: %s", e)
 
-async def chat_with_ai(memo: Dict[str, Any], company_name: str, sector: str, chat_history: list, user_message: str) -> str:
-    """Handle AI chat for founder interview"""
-    try:
-        context = f"""
+def _build_founder_chat_context(chat_history: list, session: Optional[FounderChatSession]) -> str:
+    """Chat context for the founder prompt: rolling summary + unsummarized recent turns"""
+    if session is None or session.chat_summary is None:
+        return _to_json(chat_history[-10:])
+    
+    # Schedule a background re-summarization once enough turns have accumulated
+    upto = len(chat_history) - FOUNDER_CHAT_RECENT_TURNS
+    if upto - session.summarized_turns >= FOUNDER_CHAT_SUMMARY_EVERY:
+        _schedule_founder_chat_summary(session, chat_history, upto)
+    
+    return f"{session.chat_summary}\n\nRecent:\n{_to_json(chat_history[session.summarized_turns:])}"
+
+FOUNDER_CHAT_MODEL = 'gemini-3-pro-preview'
+FOUNDER_CHAT_CACHE_TTL_SECONDS = 3600
+
+# Static per-session part of the founder prompt (role + memo); cached server-side once per interview
+_FOUNDER_CHAT_SYSTEM_TMPL = Template("""
         You are an AI investment analyst conducting an interview with a startup founder.
         
-        Company: {company_name}
-        Sector: {sector}
+        Company: $company_name
+        Sector: $sector
         
         Current Investment Memo Summary:
-        {json.dumps(memo, indent=2)[:5000]}
+        $memo_json
         
         Your goal is to gather missing or unclear information to complete the investment analysis.
         Focus on:
@@ -732,61 +1330,148 @@ async def chat_with_ai(memo: Dict[str, Any], company_name: str, sector: str, cha
         7. Competitive advantages
         
         Be professional, concise, and focused. Ask one question at a time.
-        
+        """)
+
+# Per-turn part: only the chat memento and the founder's latest message
+_FOUNDER_CHAT_TURN_TMPL = Template("""
         Chat History:
-        {json.dumps(chat_history[-10:], indent=2)}
+        $chat_context
         
-        Founder's latest message: {user_message}
+        Founder's latest message: $user_message
         
         Respond naturally and ask relevant follow-up questions.
-        """
-        
-        response = client.models.generate_content(
-            # model='gemini-3-pro-preview',
-            model='gemini-3-pro-preview',
-            contents=context
+        """)
+
+async def _get_founder_chat_cache(session: FounderChatSession, system_prompt: str) -> Optional[GenerateContentConfig]:
+    """Return the config referencing this interview's cached memo context, creating it on first use"""
+    now = time.monotonic()
+    if session.prompt_cache and now < session.prompt_cache[1]:
+        return session.prompt_cache[0]
+    try:
+        cache = await client.aio.caches.create(
+            model=FOUNDER_CHAT_MODEL,
+            config=CreateCachedContentConfig(
+                display_name="founder-chat-memo",
+                system_instruction=system_prompt,
+                ttl=f"{FOUNDER_CHAT_CACHE_TTL_SECONDS}s"
+            )
         )
-        
-        return response.text
-    
+        # Refresh a minute before the server-side TTL runs out
+        config = GenerateContentConfig(cached_content=cache.name)
+        session.prompt_cache = (config, now + FOUNDER_CHAT_CACHE_TTL_SECONDS - 60)
+        logger.info("🗄️ Created founder chat cache: %s", cache.name)
+        return config
     except Exception as e:
-        print(f"Error in AI chat: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Failed to generate AI response: {str(e)}")
-
-async def generate_investor_chat_response(
-    extracted_text: str,
-    memo_context: Dict[str, Any],
+        # Typically a memo below the model's minimum cacheable size; send it inline for this session
+        logger.warning("⚠️ Could not create founder chat cache: %s", e)
+        session.prompt_cache = (None, now + FOUNDER_CHAT_CACHE_TTL_SECONDS)
+        return None
+
+async def _build_founder_chat_request(
+    memo: Dict[str, Any],
+    company_name: str,
+    sector: str,
     chat_history: list,
-    user_message: str
-) -> str:
+    user_message: str,
+    session_id: Optional[str],
+    memo_version: Optional[str] = None
+) -> tuple:
     """
-    Generate a response for the investor chatbot using Gemini 2.5 Pro.
-    Uses the pitch deck text and generated memo as context.
-    Enabled with Google Search for external validation.
+    Build (contents, config) for a founder interview turn.
+    With a session, the memo context lives in a per-session cached content and only the
+    chat memento + latest message are sent; otherwise the full prompt is sent inline.
+    The cached memo is rebuilt whenever memo_version (or, without one, the memo digest) changes.
     """
+    session = get_founder_chat_session(session_id) if session_id else None
+    if session is not None and session.chat_summary is None and len(chat_history) > 4:
+        # First summary is built in the background; this turn still uses the raw tail
+        _schedule_founder_chat_summary(session, chat_history, len(chat_history) - FOUNDER_CHAT_RECENT_TURNS)
+    
+    if session is not None and memo_version is not None and session.memo_key == memo_version:
+        memo_json = session.memo_json
+    else:
+        memo_json = _to_json(memo)
+        if session is not None:
+            memo_key = memo_version or _content_digest(memo_json.encode())
+            if session.memo_key != memo_key:
+                # Memo was regenerated mid-interview: drop the cached context built from the old one
+                session.memo_key, session.memo_json, session.prompt_cache = memo_key, memo_json, None
+    
+    system_prompt = _FOUNDER_CHAT_SYSTEM_TMPL.substitute(
+        company_name=company_name,
+        sector=sector,
+        memo_json=memo_json[:5000]
+    )
+    turn_prompt = _FOUNDER_CHAT_TURN_TMPL.substitute(
+        chat_context=_build_founder_chat_context(chat_history, session),
+        user_message=user_message
+    )
+    
+    if session is not None:
+        config = await _get_founder_chat_cache(session, system_prompt)
+        if config is not None:
+            return turn_prompt, config
+    return system_prompt + turn_prompt, None
+
+async def stream_chat_with_ai(
+    memo: Dict[str, Any],
+    company_name: str,
+    sector: str,
+    chat_history: list,
+    user_message: str,
+    session_id: Optional[str] = None,
+    memo_version: Optional[str] = None
+) -> AsyncIterator[str]:
+    """
+    Stream the founder interview reply chunk by chunk.
+    session_id: interview identifier; when provided, the memo context is cached once per
+    session and older turns are summarized into a rolling "memento" instead of sending
+    the last 10 turns verbatim.
+    memo_version: memo version key (deal_id:last_updated); a new version rebuilds the cached memo.
+    """
+    contents, config = await _build_founder_chat_request(
+        memo, company_name, sector, chat_history, user_message, session_id, memo_version
+    )
+    
+    stream = await client.aio.models.generate_content_stream(
+        model=FOUNDER_CHAT_MODEL,
+        contents=contents,
+        config=config
+    )
+    async for chunk in stream:
+        if chunk.text:
+            yield chunk.text
+
+async def chat_with_ai(
+    memo: Dict[str, Any],
+    company_name: str,
+    sector: str,
+    chat_history: list,
+    user_message: str,
+    session_id: Optional[str] = None,
+    memo_version: Optional[str] = None
+) -> str:
+    """Handle AI chat for founder interview (non-streaming wrapper around stream_chat_with_ai)"""
     try:
-        # Format chat history for context
-        formatted_history = "\n".join([
-            f"{msg['role'].capitalize()}: {msg['content']}" 
-            for msg in chat_history[-5:] # Keep last 5 turns for context window efficiency
-        ])
-        
-        prompt = f"""
+        chunks = [
+            chunk async for chunk in stream_chat_with_ai(
+                memo, company_name, sector, chat_history, user_message,
+                session_id=session_id, memo_version=memo_version
+            )
+        ]
+        return "".join(chunks)
+    
+    except Exception as e:
+        logger.error("Error in AI chat: %s", e)
+        raise HTTPException(status_code=500, detail=f"Failed to generate AI response: {str(e)}")
+
+# Serialized investor-chat context (memo + deck excerpt), keyed by memo_id.
+# Keeping these parts byte-identical across turns lets Gemini's implicit prefix cache hit.
+_INVESTOR_CHAT_SESSION_CACHE_SIZE = 256
+
+INVESTOR_CHAT_INSTRUCTIONS = """
         You are an expert Venture Capital Analyst Assistant. Your job is to answer questions about a specific startup based on its pitch deck and the investment memo we have generated.
         
-        CONTEXT:
-        
-        1. INVESTMENT MEMO SUMMARY:
-        {json.dumps(memo_context, indent=2)[:5000]}
-        
-        2. RAW PITCH DECK CONTENT (Excerpt):
-        {extracted_text[:10000]}
-        
-        3. CHAT HISTORY:
-        {formatted_history}
-        
-        USER QUESTION: {user_message}
-        
         INSTRUCTIONS:
         - Answer the user's question directly and professionally.
         - Base your answer PRIMARILY on the provided Pitch Deck Content and Investment Memo.
@@ -794,154 +1479,584 @@ async def generate_investor_chat_response(
         - If the information is not in the deck or memo, and cannot be found via search, admit that you don't have that information.
         - Be concise but thorough.
         - Do not hallucinate facts about the startup.
-        """
         
-        response = client.models.generate_content(
-            model='gemini-2.5-flash',
-            contents=prompt,
-            config=GenerateContentConfig(
-                tools=[Tool(google_search=GoogleSearch())],
-                temperature=0.3,
-                max_output_tokens=5000
-            )
+        CONTEXT:
+        """
+
+_INVESTOR_CHAT_MODEL = 'gemini-2.5-flash'
+_INVESTOR_CHAT_CONFIG = GenerateContentConfig(
+    system_instruction=INVESTOR_CHAT_INSTRUCTIONS,
+    tools=[_SEARCH_TOOL],
+    **_INVESTOR_CHAT_PARAMS
+)
+
+# History window: up to MAX turns, with the window start moving in STEP-turn jumps so the
+# history prefix stays byte-identical for STEP turns at a time
+_INVESTOR_CHAT_HISTORY_MAX_TURNS = 10
+_INVESTOR_CHAT_HISTORY_STEP = 5
+
+def _prune_memo(value: Any) -> Any:
+    """Drop null/empty fields and turn lists of same-keyed dicts into a column header + value rows"""
+    if isinstance(value, dict):
+        pruned = {k: _prune_memo(v) for k, v in value.items()}
+        return {k: v for k, v in pruned.items() if v not in (None, "", [], {})}
+    if isinstance(value, list):
+        items = [_prune_memo(v) for v in value]
+        items = [v for v in items if v not in (None, "", [], {})]
+        if len(items) > 1 and all(isinstance(v, dict) for v in items):
+            cols = list(items[0])
+            if all(list(v) == cols for v in items[1:]):
+                return {"_cols": cols, "_rows": [list(v.values()) for v in items]}
+        return items
+    return value
+
+def _compact_memo(memo: Dict[str, Any]) -> str:
+    """Token-lean memo serialization for prompts (compact separators, no empties, columnar arrays)"""
+    return _to_json(_prune_memo(memo))
+
+class InvestorChatSession:
+    """
+    Static investor-chat context for one memo version.
+    Deck and memo are truncated into a fixed prefix (persona -> deck -> memo); the session
+    (and the deal's context cache) is reused across turns while that prefix's hash is unchanged.
+    """
+    
+    def __init__(self, memo_json_blob: str, deck_blob: str):
+        self.memo_json_blob = memo_json_blob
+        self.deck_blob = deck_blob
+        self.source_key: Optional[str] = None  # Digest of the raw inputs, set by get_investor_chat_session
+        self.content_hash = hashlib.blake2b(
+            f"{deck_blob}\x00{memo_json_blob}".encode(), digest_size=16
+        ).hexdigest()
+        self.context_parts = [
+            Part.from_text(text=f"1. RAW PITCH DECK CONTENT (Excerpt):\n{self.deck_blob}"),
+            Part.from_text(text=(
+                "2. INVESTMENT MEMO SUMMARY (lists of records are encoded as "
+                f'{{"_cols": [...], "_rows": [[...], ...]}}):\n{self.memo_json_blob}'
+            ))
+        ]
+    
+    @classmethod
+    def from_memo(cls, memo_context: Union[Dict[str, Any], str], extracted_text: str) -> "InvestorChatSession":
+        # Callers that already hold the serialized memo can pass it straight through
+        memo_json = memo_context if isinstance(memo_context, str) else _compact_memo(memo_context)
+        return cls(
+            memo_json_blob=memo_json[:5000],
+            deck_blob=_pack_context(extracted_text, 10000)
         )
-        
-        return response.text
+
+_investor_chat_sessions: "OrderedDict[str, InvestorChatSession]" = OrderedDict()
+
+def get_investor_chat_session(
+    memo_id: Optional[str],
+    memo_context: Union[Dict[str, Any], str],
+    extracted_text: str
+) -> InvestorChatSession:
+    """
+    Get (or create) the chat session for a memo version; without memo_id a throwaway session is built.
+    memo_id already versions a memo dict, so a cached session is reused without re-serializing
+    anything while a digest of the raw deck text (and of a pre-serialized memo) still matches.
+    """
+    if not memo_id:
+        return InvestorChatSession.from_memo(memo_context, extracted_text)
+    
+    digest = hashlib.blake2b(extracted_text.encode(), digest_size=16)
+    if isinstance(memo_context, str):
+        digest.update(memo_context.encode())
+    source_key = digest.hexdigest()
+    
+    existing = _investor_chat_sessions.get(memo_id)
+    if existing is not None and existing.source_key == source_key:
+        _investor_chat_sessions.move_to_end(memo_id)
+        return existing
+    
+    session = InvestorChatSession.from_memo(memo_context, extracted_text)
+    session.source_key = source_key
+    _investor_chat_sessions[memo_id] = session
+    _investor_chat_sessions.move_to_end(memo_id)
+    if len(_investor_chat_sessions) > _INVESTOR_CHAT_SESSION_CACHE_SIZE:
+        _investor_chat_sessions.popitem(last=False)
+    return session
+
+def _investor_chat_history_window(chat_history: list) -> list:
+    """Recent history whose start only moves every _INVESTOR_CHAT_HISTORY_STEP turns"""
+    start = max(0, len(chat_history) - _INVESTOR_CHAT_HISTORY_MAX_TURNS)
+    start -= start % _INVESTOR_CHAT_HISTORY_STEP
+    return chat_history[start:]
+
+async def stream_investor_chat_response(
+    extracted_text: str,
+    memo_context: Union[Dict[str, Any], str],
+    chat_history: list,
+    user_message: str,
+    memo_id: Optional[str] = None,
+    deal_id: Optional[str] = None
+) -> AsyncIterator[str]:
+    """
+    Stream the investor chatbot reply chunk by chunk.
+    Uses the pitch deck text and generated memo as context, with Google Search for external validation.
+    memo_id: stable identifier for the memo version (e.g. deal_id + generation timestamp);
+    when provided, the InvestorChatSession (serialized static context) is reused across turns.
+    deal_id: when provided, persona + deck + memo are served from the deal's context cache.
+    """
+    session = get_investor_chat_session(memo_id, memo_context, extracted_text)
+    
+    # Format chat history for context
+    formatted_history = "\n".join([
+        f"{msg['role'].capitalize()}: {msg['content']}" 
+        for msg in _investor_chat_history_window(chat_history)
+    ])
+    
+    # Static prefix first (persona, deck, memo), dynamic parts last (history, question)
+    turn_parts = [
+        Part.from_text(text=f"3. CHAT HISTORY:\n{formatted_history}"),
+        Part.from_text(text=f"USER QUESTION: {user_message}")
+    ]
+    
+    # Per-deal explicit cache of persona + deck + memo; falls back to the inline prefix
+    config = None
+    if deal_id:
+        cache_name = await deal_context_cache.get_or_create(
+            deal_id, _INVESTOR_CHAT_MODEL, "investor-chat",
+            parts=session.context_parts,
+            fingerprint=session.content_hash,
+            system_instruction=INVESTOR_CHAT_INSTRUCTIONS,
+            tools=[_SEARCH_TOOL]
+        )
+        if cache_name:
+            config = GenerateContentConfig(cached_content=cache_name, **_INVESTOR_CHAT_PARAMS)
+    contents = turn_parts if config else [*session.context_parts, *turn_parts]
+    
+    stream = await client.aio.models.generate_content_stream(
+        model=_INVESTOR_CHAT_MODEL,
+        contents=contents,
+        config=config or _INVESTOR_CHAT_CONFIG
+    )
+    async for chunk in stream:
+        if chunk.text:
+            yield chunk.text
+
+async def generate_investor_chat_response(
+    extracted_text: str,
+    memo_context: Union[Dict[str, Any], str],
+    chat_history: list,
+    user_message: str,
+    memo_id: Optional[str] = None,
+    deal_id: Optional[str] = None
+) -> str:
+    """
+    Generate a response for the investor chatbot using Gemini 2.5 Flash.
+    Non-streaming wrapper around stream_investor_chat_response.
+    """
+    try:
+        chunks = [
+            chunk async for chunk in stream_investor_chat_response(
+                extracted_text, memo_context, chat_history, user_message, memo_id=memo_id, deal_id=deal_id
+            )
+        ]
+        return "".join(chunks)
         
     except Exception as e:
-        print(f"Error in investor chat generation: {str(e)}")
+        logger.error("Error in investor chat generation: %s", e)
         raise HTTPException(
             status_code=500, 
             detail=f"Failed to generate chat response: {str(e)}"
         )
 
-async def verify_claims_with_google(extracted_text: Optional[str] = None, pdf_bytes: Optional[bytes] = None) -> Dict[str, Any]:
+# Max concurrent per-claim verification calls (respects Gemini rate limits)
+CLAIM_VERIFICATION_CONCURRENCY = 5
+# Fewer claims than this from the flash extraction pass triggers a pro re-extraction
+MIN_EXTRACTED_CLAIMS = 3
+
+def _extract_json_object(text: str) -> Optional[str]:
     """
-    Extract key claims from the pitch deck and verify them using Google Search.
-    Can use extracted text OR PDF bytes (multimodal).
-    Returns a list of verified claims with verdicts.
+    Return the first balanced {...} object in text, or None.
+    Single linear pass tracking depth and string/escape state (no regex backtracking).
     """
+    start = text.find('{')
+    if start == -1:
+        return None
+    
+    depth = 0
+    in_string = False
+    escape = False
+    for i in range(start, len(text)):
+        char = text[i]
+        if in_string:
+            if escape:
+                escape = False
+            elif char == '\\':
+                escape = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char == '{':
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if depth == 0:
+                return text[start:i + 1]
+    return None
+
+def _parse_json_object(response_text: str) -> Dict[str, Any]:
+    """Parse a JSON object from a model response, tolerating surrounding prose/markdown"""
+    # Fast path: the model usually returns clean JSON
     try:
-        # Construct the instructions
-        instructions = """
-        You are a world-class investigative fact-checker with access to Google Search. Your job is to verify startup claims with the rigor of a top-tier investigative journalist.
-        
-        STEP 1: EXTRACT CLAIMS
-        Identify 5-8 specific, verifiable claims from the pitch deck. Prioritize:
-        - Quantifiable metrics (revenue, users, growth rates, market size)
-        - Named entities (partnerships, customers, awards, investors, team credentials)
-        - Time-bound achievements (milestones, launches, certifications)
-        
-        STEP 2: DEEP VERIFICATION METHODOLOGY
-        For EACH claim, apply this exhaustive search process:
-        
-        A. QUERY FORMULATION (Try 3-5 variations):
-           - Direct: "exact claim text"
-           - Reverse: Search for the entity mentioned (e.g., if claim is "Won X Award", search "X Award 2023 winners")
-           - Contextual: Add related keywords (company name + claim + year/location)
-           - Negative: Search for contradictions or corrections
-        
-        B. SOURCE HIERARCHY (Check in this order):
-           1. Primary sources: Official websites, press releases, verified social media of entities mentioned
-           2. Secondary sources: News articles, industry publications, databases (Crunchbase, PitchBook)
-           3. Tertiary sources: LinkedIn posts, blog mentions, community forums
-           4. Social proof: Instagram/Twitter announcements, conference speaker lists, portfolio pages
-        
-        C. VERIFICATION RULES:
-           - If claim mentions Company A worked with Company B, check BOTH companies' websites/social media
-           - For awards/programs, find the official site and look for winner lists, even if buried in PDFs or subpages
-           - For financial claims, cross-reference multiple sources (funding databases, news, filings if public)
-           - For team credentials, verify via LinkedIn, university alumni pages, or past employer websites
-           - If something seems off, search for corrections, retractions, or alternative perspectives
+        return orjson.loads(response_text.encode())
+    except orjson.JSONDecodeError:
+        pass
+    
+    json_str = _extract_json_object(response_text)
+    if json_str is None:
+        logger.warning("⚠️ No JSON found in response. Raw text: %s", response_text)
+        raise ValueError("Could not find valid JSON object in response")
+    return orjson.loads(json_str.encode())
+
+async def _extract_claims_only(
+    contents: List[Any],
+    deal_id: Optional[str] = None,
+    fingerprint: Optional[str] = None,
+    models: List[str] = None
+) -> Dict[str, Any]:
+    """
+    Phase 1 of fact checking: pull 5-8 verifiable claims out of the pitch deck.
+    Cheap flash call, no search tool; contents carry only the deck.
+    With a deal_id the deck (and instructions) come from the deal's context cache instead.
+    """
+    instruction_request = _instruction_request(
+        "fact-check-instructions", _VERIFY_CLAIMS_INSTRUCTIONS, contents,
+        _CLAIM_EXTRACTION_CONFIG, params=_CLAIM_EXTRACTION_PARAMS
+    )
+    
+    async def claims_request(model: str) -> tuple:
+        if deal_id:
+            cache_name = await deal_context_cache.get_or_create(
+                deal_id, model, "fact-check",
+                parts=[c if isinstance(c, Part) else Part.from_text(text=c) for c in contents],
+                fingerprint=fingerprint,
+                system_instruction=_VERIFY_CLAIMS_INSTRUCTIONS
+            )
+            if cache_name:
+                config = GenerateContentConfig(cached_content=cache_name, **_CLAIM_EXTRACTION_PARAMS)
+                return "Extract the claims from the pitch deck above.", config
+        return await instruction_request(model)
+    
+    response = await generate_with_fallback(
+        contents=contents,
+        config=None,
+        models=models or MODELS_FLASH,
+        use_flash=True,
+        config_factory=claims_request
+    )
+    return orjson.loads(response.text.encode())
+
+async def _verify_one_claim(claim: str, company_name: str, semaphore: asyncio.Semaphore) -> Dict[str, Any]:
+    """Phase 2 of fact checking: verify a single claim with Google Search"""
+    prompt = f"""
+        You are an investigative fact-checker with access to Google Search.
+        Company: {company_name}
+        Claim from their pitch deck: "{claim}"
         
-        D. PERSISTENCE:
-           - NEVER mark as "Unverifiable" after just 1-2 searches
-           - If direct search fails, try lateral searches (e.g., search for the award itself, then manually look for the company)
-           - Check archived versions if current pages don't exist (mention this in explanation)
-           - Consider that evidence might be in images, PDFs, or video content (Google can find these)
+        Search 3-5 query variations (direct, the entity mentioned, company + claim + year, contradictions).
+        Check primary sources first (official sites, press releases), then news/databases (Crunchbase), then social proof.
+        Never mark "Unverifiable" after only 1-2 searches.
         
-        STEP 3: VERDICT ASSIGNMENT
-        Based on cumulative evidence:
-        - "Verified": Found concrete evidence from authoritative sources (cite the best one)
-        - "Likely True": Strong circumstantial evidence but no direct confirmation (explain why you believe it)
-        - "Exaggerated": Claim is technically true but misleading in context (explain the nuance)
-        - "False": Direct contradiction from credible sources
-        - "Unverifiable": Exhaustively searched with no evidence (LIST all places you checked)
+        Verdicts: "Verified" (concrete authoritative evidence), "Likely True" (strong circumstantial evidence),
+        "Exaggerated" (technically true but misleading), "False" (contradicted by credible sources),
+        "Unverifiable" (exhaustively searched, no evidence - list where you looked).
         
-        STEP 4: TRANSPARENCY
-        In the explanation field, document your research trail:
-        - What searches you ran
-        - What sources you checked
-        - Why you arrived at this verdict
-        - If "Unverifiable", explicitly state: "Searched X, Y, Z but found no evidence"
-
-        Return ONLY this JSON structure:
-        {
-            "claims": [
-                {
-                    "claim": "The exact claim from the pitch deck",
-                    "verdict": "Verified/Likely True/Exaggerated/False/Unverifiable",
-                    "explanation": "Detailed research trail: what you searched, what you found, why this verdict",
-                    "source_url": "Best authoritative source URL, or null if none found",
-                    "confidence": "High/Medium/Low"
-                }
-            ]
-        }
+        Return ONLY this JSON:
+        {{
+            "claim": "{claim}",
+            "verdict": "Verified/Likely True/Exaggerated/False/Unverifiable",
+            "explanation": "Research trail: what you searched, what you found, why this verdict",
+            "source_url": "Best authoritative source URL, or null if none found",
+            "confidence": "High/Medium/Low"
+        }}
         """
+    async def verification_request(model: str) -> tuple:
+        if model.startswith("gemini-3"):
+            return prompt, _CLAIM_VERIFICATION_SCHEMA_CONFIG
+        return prompt, _CLAIM_VERIFICATION_CONFIG
+    
+    async with semaphore:
+        response = await generate_with_fallback(
+            contents=prompt,
+            config=None,
+            models=MODELS_PRO,
+            config_factory=verification_request
+        )
+    verdict = _parse_json_object(response.text.strip())
+    verdict['claim'] = claim
+    return verdict
+
+# Phase 1 fact-check instructions: extraction only, verification happens per claim
+_VERIFY_CLAIMS_INSTRUCTIONS = """
+You are a world-class investigative fact-checker. Identify 5-8 specific, verifiable claims from the pitch deck. Prioritize:
+- Quantifiable metrics (revenue, users, growth rates, market size)
+- Named entities (partnerships, customers, awards, investors, team credentials)
+- Time-bound achievements (milestones, launches, certifications)
+
+Quote each claim as stated in the deck, with enough context (names, years) to search for it.
+
+Return ONLY this JSON structure:
+{
+    "company_name": "Company name from the pitch deck",
+    "claims": ["The exact claim from the pitch deck", "..."]
+}
+"""
+_CLAIM_EXTRACTION_CONFIG = GenerateContentConfig(
+    system_instruction=_VERIFY_CLAIMS_INSTRUCTIONS,
+    **_CLAIM_EXTRACTION_PARAMS
+)
+
+_VERIFICATION_FAILED_PREFIX = "Automated verification failed"
 
+def _is_cacheable_fact_check(result: Dict[str, Any]) -> bool:
+    """Don't pin an empty claims list or per-claim failure placeholders from a transient outage"""
+    claims = result.get('claims')
+    return bool(claims) and not any(
+        str(c.get('explanation', '')).startswith(_VERIFICATION_FAILED_PREFIX) for c in claims if isinstance(c, dict)
+    )
+
+@pdf_result_cache(ttl=7 * 86400, should_cache=_is_cacheable_fact_check)
+async def verify_claims_with_google(
+    extracted_text: Optional[str] = None,
+    pdf_bytes: Optional[bytes] = None,
+    deal_id: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Extract key claims from the pitch deck and verify them using Google Search.
+    Can use extracted text OR PDF bytes (multimodal).
+    deal_id: when provided, the deck is held in the deal's context cache.
+    Claims are extracted in one cheap call, then verified concurrently (one call per claim).
+    Returns a list of verified claims with verdicts.
+    """
+    try:
+        # Instructions travel as system_instruction; contents are the deck only
         contents = []
         if pdf_bytes:
             # Multimodal Input
-            contents.append(Part.from_bytes(data=pdf_bytes, mime_type="application/pdf"))
-            contents.append(instructions)
+            contents.append(await _pdf_part(pdf_bytes))
         elif extracted_text:
             # Text Only Input
-            contents.append(f"{instructions}\n\nPITCH DECK TEXT:\n{extracted_text[:30000]}")
+            contents.append(f"PITCH DECK TEXT:\n{_pack_context(extracted_text, 30000)}")
         else:
             raise ValueError("Either pdf_bytes or extracted_text must be provided")
         
-        response = await generate_with_fallback(
-            contents=contents,
-            config=GenerateContentConfig(
-                tools=[Tool(google_search=GoogleSearch())],
-                temperature=0.1
-            ),
-            models=MODELS_PRO,  # Uses [gemini-3-pro-preview, gemini-2.5-pro]
-            use_flash=False
+        fingerprint = _content_digest(pdf_bytes or extracted_text.encode())
+        extracted = await _extract_claims_only(contents, deal_id=deal_id, fingerprint=fingerprint)
+        claims = [c for c in extracted.get('claims', []) if isinstance(c, str) and c.strip()]
+        if len(claims) < MIN_EXTRACTED_CLAIMS:
+            # Flash came back thin: one retry on the pro tier before verifying
+            logger.warning("⚠️ Only %d claims extracted on flash, escalating to pro", len(claims))
+            extracted = await _extract_claims_only(contents, deal_id=deal_id, fingerprint=fingerprint, models=MODELS_PRO)
+            claims = [c for c in extracted.get('claims', []) if isinstance(c, str) and c.strip()]
+        company_name = extracted.get('company_name') or "the company"
+        logger.debug("Extracted %d claims for %s", len(claims), company_name)
+        
+        semaphore = asyncio.Semaphore(CLAIM_VERIFICATION_CONCURRENCY)
+        results = await asyncio.gather(
+            *[_verify_one_claim(claim, company_name, semaphore) for claim in claims],
+            return_exceptions=True
         )
         
-        response_text = response.text.strip()
-        print(f"DEBUG: Fact Check Raw Response: {response_text[:500]}...")  # Log first 500 chars
-
-        # Improved JSON extraction using Regex
-        # Matches outermost curly braces including nested ones
-        match = re.search(r'(\{.*\})', response_text, re.DOTALL)
-        
-        if match:
-            json_str = match.group(1)
-            return json.loads(json_str)
-        else:
-             print(f"⚠️ No JSON found in response. Raw text: {response_text}")
-             raise ValueError("Could not find valid JSON object in response")
+        verified_claims = []
+        for claim, result in zip(claims, results):
+            if isinstance(result, Exception):
+                # One failed verification shouldn't sink the whole fact check
+                logger.warning("⚠️ Verification failed for claim '%s': %s", claim[:80], result)
+                result = {
+                    "claim": claim,
+                    "verdict": "Unverifiable",
+                    "explanation": f"{_VERIFICATION_FAILED_PREFIX}: {str(result)}",
+                    "source_url": None,
+                    "confidence": "Low"
+                }
+            verified_claims.append(result)
         
-    except json.JSONDecodeError as e:
-        print(f"JSON Parse Error: {str(e)}")
-        # print(f"Bad JSON Content: {response_text}") # Removed to avoid huge log
-        raise HTTPException(status_code=500, detail=f"Failed to parse fact check response: {str(e)}")
+        return {"claims": verified_claims}
         
-    except json.JSONDecodeError as e:
-        print(f"JSON Parse Error: {str(e)}")
-        print(f"Bad JSON Content: {response_text}")
+    except json.JSONDecodeError as e:  # also covers orjson.JSONDecodeError (a subclass)
+        logger.error("JSON Parse Error: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to parse fact check response: {str(e)}")
     except Exception as e:
-        print(f"Error in fact check generation: {str(e)}")
+        logger.error("Error in fact check generation: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to verify claims: {str(e)}")
 
 
+_CMA_EXTRACTION_PROMPT = """
+Role: You are a Senior Credit Officer at a financial institution.
+
+Task: Extract critical financial ratios and credit metrics from the provided CMA document. Focus strictly on solvency, liquidity, and debt serviceability.
+
+Output Rules:
+Format: Return ONLY a valid JSON array.
+Structure: Create one object for each fiscal year (column).
+Nulls: If a ratio is not explicitly stated or calculable, return null.
+Units: Convert all absolute figures to full numbers. Keep ratios as decimals (e.g., 1.33).
+
+Schema Definition:
+
+1. Classification
+year: Fiscal Year (e.g. FY23)
+type: One of "Audited", "Provisional", "Projected"
+
+2. Credit Ratios (Priority - Extract if stated, else calculate)
+dscr: Debt Service Coverage Ratio. (EBITDA - Tax) / (Interest + Principal Repayment).
+iscr: Interest Service Coverage Ratio. (EBITDA / Interest Expense).
+current_ratio: Current Assets / Current Liabilities.
+debt_equity_ratio: Total Debt / Tangible Net Worth.
+tol_tnw: Total Outside Liabilities / Tangible Net Worth.
+
+3. Operating Performance (P&L)
+gross_turnover: Total Operating Income / Sales.
+ebitda: Operating Profit before interest, tax, dep, amort.
+interest_expense: Total finance charges and interest costs.
+pat: Profit After Tax.
+cash_profit: PAT + Depreciation.
+depreciation: Depreciation and Amortization.
+
+4. Financial Position (Balance Sheet)
+tangible_net_worth: Capital + Reserves - Intangible Assets.
+total_debt: Long Term Borrowings + Short Term Borrowings.
+net_working_capital: Current Assets - Current Liabilities.
+unsecured_loans: Loans from promoters/family (Quasi-equity).
+cash_and_bank_balance: Liquidity available on hand.
+
+5. Raw Components (REQUIRED for Data Model)
+current_assets: Total Current Assets.
+current_liabilities: Total Current Liabilities.
+fixed_assets: Net Fixed Assets / PPE.
+long_term_debt: Long Term Borrowings (excluding current maturity).
+short_term_debt: Short Term Borrowings / Working Capital Limits.
+
+Return ONLY the JSON array.
+"""
+_CMA_EXTRACTION_CONFIG = GenerateContentConfig(
+    system_instruction=_CMA_EXTRACTION_PROMPT,
+    **_CMA_EXTRACTION_PARAMS
+)
+
+def safe_float(val, default=0.0):
+    """Safely get numeric value (handles None/null)"""
+    if val is None:
+        return default
+    try:
+        return float(val)
+    except (ValueError, TypeError):
+        return default
+
+async def stream_cma_extraction(
+    raw_text: str = None,
+    pdf_bytes: bytes = None,
+    models: List[str] = None
+) -> AsyncIterator[str]:
+    """
+    Stream the raw CMA extraction JSON (array of CMAYear) chunk by chunk as the model decodes it.
+    Accepts either raw_text or pdf_bytes - if pdf_bytes provided, sends directly to Gemini.
+    models: model tier to use (defaults to flash; extract_cma_data escalates to pro)
+    """
+    # Build content based on input type
+    if pdf_bytes:
+        # Send PDF directly to Gemini (multimodal) - bypasses Document AI page limits
+        logger.info("📄 Sending CMA PDF directly to Gemini (%d bytes)", len(pdf_bytes))
+        contents = [await _pdf_part(pdf_bytes)]
+    elif raw_text:
+        # Use extracted text (from Excel or other sources)
+        logger.info("📝 Using extracted text for CMA analysis (%d chars)", len(raw_text))
+        logger.debug("📄 Raw text sample (first 1000 chars):\n%s\n... (truncated)", raw_text[:1000])
+        contents = f"## RAW TEXT:\n{raw_text}"
+    else:
+        raise HTTPException(status_code=400, detail="Either pdf_bytes or raw_text must be provided for CMA extraction")
+    
+    # Model switching on 503 errors happens before the first chunk is yielded
+    async for chunk in stream_with_fallback(
+        contents=contents,
+        config=None,
+        models=models or MODELS_FLASH,
+        config_factory=_instruction_request(
+            "cma-extraction-prompt", _CMA_EXTRACTION_PROMPT, contents,
+            _CMA_EXTRACTION_CONFIG, params=_CMA_EXTRACTION_PARAMS
+        )
+    ):
+        yield chunk
+
+async def stream_cma_years(
+    raw_text: str = None,
+    pdf_bytes: bytes = None,
+    models: List[str] = None,
+    mirror: Optional[io.StringIO] = None
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Yield each extracted CMA year object as soon as the model finishes decoding it, so callers
+    can start mapping/persisting early years while later ones are still being generated.
+    mirror: optional buffer receiving the raw streamed text (for logging a bad response).
+    """
+    scanner = ArrayItemScanner()
+    async for chunk in stream_cma_extraction(raw_text=raw_text, pdf_bytes=pdf_bytes, models=models):
+        if mirror is not None:
+            mirror.write(chunk)
+        for raw_item in scanner.feed(chunk):
+            yield orjson.loads(raw_item)
+    if not scanner.complete:
+        raise TruncatedStreamError("CMA stream ended before the JSON array was closed")
+
+def _is_valid_cma_extraction(extracted_list: Any) -> bool:
+    """Non-empty list of year objects, each with a year label, and at least one non-zero figure overall"""
+    if not isinstance(extracted_list, list) or not extracted_list:
+        return False
+    if not all(isinstance(item, dict) and item.get("year") for item in extracted_list):
+        return False
+    return any(
+        safe_float(value) != 0.0
+        for item in extracted_list
+        for key, value in item.items()
+        if key not in ("year", "type")
+    )
+
+def _map_cma_year(item: Dict[str, Any]) -> Dict[str, Any]:
+    """Map one extracted CMAYear to the YearData format, with safe_float for null handling"""
+    mapped_item = {
+        "year": item.get("year") or "Unknown",
+        "revenue": safe_float(item.get("gross_turnover")),
+        "pat": safe_float(item.get("pat")),
+        # Fallback for depreciation
+        "depreciation": safe_float(item.get("depreciation")) or (safe_float(item.get("cash_profit")) - safe_float(item.get("pat"))),
+        "interest_expense": safe_float(item.get("interest_expense")),
+        "current_assets": safe_float(item.get("current_assets")),
+        "current_liabilities": safe_float(item.get("current_liabilities")),
+        "long_term_debt": safe_float(item.get("long_term_debt")),
+        "short_term_debt": safe_float(item.get("short_term_debt")),
+        "tangible_net_worth": safe_float(item.get("tangible_net_worth")),
+        "fixed_assets": safe_float(item.get("fixed_assets")),
+        
+        # --- CRITICAL: Map Ratios so they appear in Frontend ---
+        "dscr": safe_float(item.get("dscr")),
+        "iscr": safe_float(item.get("iscr")),
+        "current_ratio": safe_float(item.get("current_ratio")),
+        "tol_tnw": safe_float(item.get("tol_tnw")),
+        "debt_equity_ratio": safe_float(item.get("debt_equity_ratio")),
+        
+        "tier": "audited" # Default
+    }
+    
+    # Determine Tier
+    raw_type = str(item.get("type", "")).lower()
+    if "provisional" in raw_type or "estimated" in raw_type:
+        mapped_item["tier"] = "provisional"
+    elif "projected" in raw_type:
+        mapped_item["tier"] = "projected"
+    return mapped_item
+
+# Don't pin the empty fallback returned on a parse failure
+@pdf_result_cache(ttl=7 * 86400, should_cache=lambda r: bool(r.get('audited_financials') or r.get('projected_financials')))
 async def extract_cma_data(raw_text: str = None, pdf_bytes: bytes = None) -> Dict[str, Any]:
     """
     Extract structured CMA data from raw text (from Excel dump) OR PDF bytes directly.
     Accepts either raw_text or pdf_bytes - if pdf_bytes provided, sends directly to Gemini.
+    Consumes stream_cma_years, so year objects are parsed while the rest is still decoding.
     Returns a dictionary matching the CMAData schema with 4 sections:
     - general_info: key-value pairs
     - operating_statement: table with years and rows
@@ -949,120 +2064,23 @@ async def extract_cma_data(raw_text: str = None, pdf_bytes: bytes = None) -> Dic
     - cash_flow: table with years and rows
     """
     try:
-        prompt = """
-                   Role: You are a Senior Credit Officer at a financial institution.
-
-                   Task: Extract critical financial ratios and credit metrics from the provided CMA document. Focus strictly on solvency, liquidity, and debt serviceability.
-
-                   Output Rules:
-                   Format: Return ONLY a valid JSON array.
-                   Structure: Create one object for each fiscal year (column).
-                   Nulls: If a ratio is not explicitly stated or calculable, return null.
-                   Units: Convert all absolute figures to full numbers. Keep ratios as decimals (e.g., 1.33).
-
-                   Schema Definition:
-
-                   1. Classification
-                   year: Fiscal Year (e.g. FY23)
-                   type: One of "Audited", "Provisional", "Projected"
-
-                   2. Credit Ratios (Priority - Extract if stated, else calculate)
-                   dscr: Debt Service Coverage Ratio. (EBITDA - Tax) / (Interest + Principal Repayment).
-                   iscr: Interest Service Coverage Ratio. (EBITDA / Interest Expense).
-                   current_ratio: Current Assets / Current Liabilities.
-                   debt_equity_ratio: Total Debt / Tangible Net Worth.
-                   tol_tnw: Total Outside Liabilities / Tangible Net Worth.
-
-                   3. Operating Performance (P&L)
-                   gross_turnover: Total Operating Income / Sales.
-                   ebitda: Operating Profit before interest, tax, dep, amort.
-                   interest_expense: Total finance charges and interest costs.
-                   pat: Profit After Tax.
-                   cash_profit: PAT + Depreciation.
-                   depreciation: Depreciation and Amortization.
-
-                   4. Financial Position (Balance Sheet)
-                   tangible_net_worth: Capital + Reserves - Intangible Assets.
-                   total_debt: Long Term Borrowings + Short Term Borrowings.
-                   net_working_capital: Current Assets - Current Liabilities.
-                   unsecured_loans: Loans from promoters/family (Quasi-equity).
-                   cash_and_bank_balance: Liquidity available on hand.
-                   
-                   5. Raw Components (REQUIRED for Data Model)
-                   current_assets: Total Current Assets.
-                   current_liabilities: Total Current Liabilities.
-                   fixed_assets: Net Fixed Assets / PPE.
-                   long_term_debt: Long Term Borrowings (excluding current maturity).
-                   short_term_debt: Short Term Borrowings / Working Capital Limits.
-
-                   Return ONLY the JSON array.
-                   """
-
-        # Build content based on input type
-        if pdf_bytes:
-            # Send PDF directly to Gemini (multimodal) - bypasses Document AI page limits
-            print(f"📄 Sending CMA PDF directly to Gemini ({len(pdf_bytes)} bytes)")
-            contents = [
-                Part.from_bytes(data=pdf_bytes, mime_type="application/pdf"),
-                prompt
-            ]
-        elif raw_text:
-            # Use extracted text (from Excel or other sources)
-            print(f"📝 Using extracted text for CMA analysis ({len(raw_text)} chars)")
-            print(f"📄 Raw text sample (first 1000 chars):\n{raw_text[:1000]}\n... (truncated)")
-            contents = f"{prompt}\n\n## RAW TEXT:\n{raw_text}"
-        else:
-            raise HTTPException(status_code=400, detail="Either pdf_bytes or raw_text must be provided for CMA extraction")
-
-        # Config differs for PDF vs text input - response_mime_type may not work with multimodal
-        if pdf_bytes:
-            config = GenerateContentConfig(
-                temperature=0.1,
-                max_output_tokens=32768
-            )
-        else:
-            config = GenerateContentConfig(
-                temperature=0.1,
-                response_mime_type="application/json",
-                max_output_tokens=32768
-            )
-
-        # Use fallback helper for automatic model switching on 503 errors
-        response = await generate_with_fallback(
-            contents=contents,
-            config=config,
-            use_flash=False  # Use pro models for CMA extraction
-        )
-        
-        # Check if response has content
-        if not response.text:
-            print(f"⚠️ Gemini returned empty response for CMA extraction")
-            raise HTTPException(status_code=500, detail="Gemini returned empty response for CMA extraction")
-        
-        response_text = response.text.strip()
-        
-        # Clean markdown if present
-        if response_text.startswith("```json"):
-            response_text = response_text[7:]
-        if response_text.startswith("```"):
-            response_text = response_text[3:]
-        if response_text.endswith("```"):
-            response_text = response_text[:-3]
-        response_text = response_text.strip()
-        
-        
-        print(f"🔍 Raw Gemini JSON text:\n{response_text[:1500]}...") # Log first 1500 chars 
-        extracted_list = json.loads(response_text)
-        print(f"✅ Parsed JSON list with {len(extracted_list) if isinstance(extracted_list, list) else 'NOT A LIST'} items")
-        
-        # Helper to safely get numeric value (handles None/null)
-        def safe_float(val, default=0.0):
-            if val is None:
-                return default
+        # Flash handles most CMA tables; escalate to pro only when its output fails validation
+        for tier, models in (("flash", MODELS_FLASH), ("pro", MODELS_PRO)):
+            mirror = io.StringIO()
             try:
-                return float(val)
-            except (ValueError, TypeError):
-                return default
+                extracted_list = [
+                    item async for item in stream_cma_years(raw_text=raw_text, pdf_bytes=pdf_bytes, models=models, mirror=mirror)
+                ]
+            except (json.JSONDecodeError, TruncatedStreamError) as e:
+                # Malformed or cut-off output counts as a failed validation, not a final answer
+                logger.error("❌ %s CMA extraction returned malformed JSON: %s", tier, e)
+                extracted_list = []
+            if _is_valid_cma_extraction(extracted_list):
+                break
+            logger.debug("🔍 Raw Gemini JSON text:\n%s...", mirror.getvalue()[:1500])
+            if tier == "flash":
+                logger.warning("⚠️ Flash CMA extraction failed validation, escalating to pro")
+        logger.info("✅ Parsed JSON list with %d items", len(extracted_list))
         
         # Post-Processing: Convert list to Structured Dict for CreditService
         cma_data = {
@@ -1072,61 +2090,28 @@ async def extract_cma_data(raw_text: str = None, pdf_bytes: bytes = None) -> Dic
             "projected_financials": []
         }
         
-        if isinstance(extracted_list, list):
-            for idx, item in enumerate(extracted_list):
-                print(f"📋 Raw item[{idx}]: {json.dumps(item, default=str)[:500]}")
-                
-                # Map keys to YearData format with safe_float for null handling
-                mapped_item = {
-                    "year": item.get("year") or "Unknown",
-                    "revenue": safe_float(item.get("gross_turnover")),
-                    "pat": safe_float(item.get("pat")),
-                    # Fallback for depreciation
-                    "depreciation": safe_float(item.get("depreciation")) or (safe_float(item.get("cash_profit")) - safe_float(item.get("pat"))),
-                    "interest_expense": safe_float(item.get("interest_expense")),
-                    "current_assets": safe_float(item.get("current_assets")),
-                    "current_liabilities": safe_float(item.get("current_liabilities")),
-                    "long_term_debt": safe_float(item.get("long_term_debt")),
-                    "short_term_debt": safe_float(item.get("short_term_debt")),
-                    "tangible_net_worth": safe_float(item.get("tangible_net_worth")),
-                    "fixed_assets": safe_float(item.get("fixed_assets")),
-                    
-                    # --- CRITICAL: Map Ratios so they appear in Frontend ---
-                    "dscr": safe_float(item.get("dscr")),
-                    "iscr": safe_float(item.get("iscr")),
-                    "current_ratio": safe_float(item.get("current_ratio")),
-                    "tol_tnw": safe_float(item.get("tol_tnw")),
-                    "debt_equity_ratio": safe_float(item.get("debt_equity_ratio")),
-                    
-                    "tier": "audited" # Default
-                }
-                
-                # Determine Tier
-                raw_type = str(item.get("type", "")).lower()
-                if "audited" in raw_type:
-                    mapped_item["tier"] = "audited"
-                    cma_data["audited_financials"].append(mapped_item)
-                elif "provisional" in raw_type or "estimated" in raw_type:
-                    mapped_item["tier"] = "provisional"
-                    cma_data["provisional_financials"] = mapped_item
-                elif "projected" in raw_type:
-                    mapped_item["tier"] = "projected"
-                    cma_data["projected_financials"].append(mapped_item)
-                else:
-                    # Fallback based on year string?
-                    cma_data["audited_financials"].append(mapped_item)
+        for idx, item in enumerate(extracted_list):
+            logger.debug("📋 Raw item[%d]: %s", idx, item)
+            mapped_item = _map_cma_year(item)
+            if mapped_item["tier"] == "provisional":
+                cma_data["provisional_financials"] = mapped_item
+            elif mapped_item["tier"] == "projected":
+                cma_data["projected_financials"].append(mapped_item)
+            else:
+                cma_data["audited_financials"].append(mapped_item)
         
-        print(f"✅ CMA data extracted successfully (v2 List Mode)")
-        print(f"   - Audited Years: {len(cma_data['audited_financials'])}")
-        print(f"   - Projected Years: {len(cma_data['projected_financials'])}")
+        logger.info(
+            "✅ CMA data extracted successfully (v2 List Mode) - Audited Years: %d, Projected Years: %d",
+            len(cma_data['audited_financials']), len(cma_data['projected_financials'])
+        )
         # Log a sample year to verify ratios are present
         if cma_data['audited_financials']:
-             print(f"   - Sample Audited Data: {cma_data['audited_financials'][0]}")
+             logger.debug("   - Sample Audited Data: %s", cma_data['audited_financials'][0])
         
         return cma_data
         
-    except json.JSONDecodeError as e:
-        print(f"❌ JSON parsing error in CMA extraction: {str(e)}")
+    except json.JSONDecodeError as e:  # also covers orjson.JSONDecodeError (a subclass)
+        logger.error("❌ JSON parsing error in CMA extraction: %s", e)
         return {
             "general_info": {},
             "audited_financials": [],
@@ -1134,12 +2119,189 @@ async def extract_cma_data(raw_text: str = None, pdf_bytes: bytes = None) -> Dic
             "provisional_financials": None
         }
     except Exception as e:
-        print(f"❌ Error extracting CMA data: {str(e)}")
+        logger.error("❌ Error extracting CMA data: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to extract CMA data: {str(e)}")
 
+_COMPANY_NAME_RE = re.compile(r"(?:Name of the Unit|Borrower Name|Name)\s*[:\-\s]\s*([^\n]+)", re.IGNORECASE)
+
+_WEB_RESEARCH_PREAMBLE = """
+You are an elite Investment Banker and Credit Analyst researching a company named "{company_name}" based on a CMA report and Web Research.
+
+**TARGET ENTITY**: {company_name}
+**KNOWN CONTEXT**: {known_context}
+
+Use Google Search. You MUST fill in all fields. If specific private data is not available, infer reasonable estimates based on the company's size, location, and industry sector.
+"""
+
+_OVERVIEW_PROMPT = """
+**MISSION - COMPANY OVERVIEW**:
+- Search for the company website, LinkedIn, and business directories (Zauba Corp, Indiamart).
+- Identify Promoters/Directors.
+- Determine exact Business Model (B2B/B2C, Manufacturing vs Trading).
+
+**JSON OUTPUT FORMAT**:
+{{
+    "company_overview": {{
+        "name": "{company_name}",
+        "sector": "Specific Sector",
+        "description": "Comprehensive description...",
+        "founders": [
+            {{ "name": "Name 1", "designation": "Director", "background": "Experience..." }},
+            {{ "name": "Name 2", "designation": "Director" }}
+        ],
+        "business_model": [
+           {{
+               "revenue_streams": "Primary Revenue Source",
+               "description": " Detailed explanation...",
+               "target_audience": "Target Customer Profile"
+           }}
+        ],
+        "establishment_year": "YYYY",
+        "location": "City, State",
+        "technologies_used": "Relevant tech/machinery...",
+        "key_problems_solved": ["Problem 1", "Problem 2"]
+    }},
+    "products_and_services": [
+        {{
+            "name": "Core Product/Service",
+            "description": "Details...",
+            "revenue_share": "High/Medium/Low"
+        }}
+    ]
+}}
+"""
+
+_MARKET_PROMPT = """
+**MISSION - MARKET ANALYSIS (CRITICAL)**:
+- Define the Industry Sector{sector_hint} (e.g., "Textile Manufacturing in Gujarat" or "Auto Components").
+- ESTIMATE the Total Addressable Market (TAM) for this sector in India. (e.g. "Indian Textile Market is $150B...").
+- ESTIMATE Growth Rate (CAGR).
+- Identify granular Sub-segment opportunities.
+
+**JSON OUTPUT FORMAT**:
+{{
+    "market_analysis": {{
+        "industry_size_and_growth": {{
+            "total_addressable_market": {{ "name": "Indian Market Sector", "value": "₹XX,XXX Cr", "cagr": "XX%", "source": "Industry Reports" }},
+            "serviceable_obtainable_market": {{ "name": "Regional/Target Market", "value": "₹X,XXX Cr", "cagr": "XX%", "projection": "Positive" }},
+            "commentary": "Detailed industry trends, growth drivers, and headwinds..."
+        }},
+        "sub_segment_opportunities": ["Opportunity 1", "Opportunity 2", "Opportunity 3"],
+        "reports": [
+            {{ "title": "Index Sector Report 2024", "source_name": "IBEF/Crisil", "summary": "Sector outlook...", "source_url": "https://example.com" }}
+        ]
+    }}
+}}
+"""
+
+_COMPETITORS_PROMPT = """
+**MISSION - COMPETITION**:
+- Identify 3-5 likely competitors in the same region or sector{sector_hint}.
+- List specific competitor names. If private, list larger public proxies or typical local competitors.
+- Estimate their revenue/scale if possible.
+
+**JSON OUTPUT FORMAT**:
+{{
+    "competitor_details": [
+        {{
+            "name": "Competitor 1",
+            "headquarters": "Location",
+            "revenue_streams": "Similar products",
+            "market_share": "Leading/Niche",
+            "strategic_focus": "Differentiation factor"
+        }},
+        {{
+            "name": "Competitor 2",
+            "headquarters": "Location"
+        }}
+    ],
+    "competition": {{
+         "competitive_advantage": "Key strengths vs peers",
+         "market_position": "Market Leader / Challenger / Niche Player"
+    }}
+}}
+"""
+
+async def _web_research_json(prompt: str, required_key: str) -> Dict[str, Any]:
+    """
+    Run one search-grounded research prompt on flash, escalating to pro on any flash
+    failure: an API error, output that doesn't parse, or output lacking required_key.
+    2.x models answer in plain text (parsed with _parse_json_object), Gemini 3 in JSON mode.
+    """
+    async def research_request(model: str) -> tuple:
+        if model.startswith("gemini-3"):
+            return prompt, _WEB_RESEARCH_JSON_CONFIG
+        return prompt, _WEB_RESEARCH_CONFIG
+
+    try:
+        response = await generate_with_fallback(
+            contents=prompt, config=None, use_flash=True, config_factory=research_request
+        )
+        result = _parse_json_object(response.text)
+        if not result.get(required_key):
+            raise ValueError(f"missing {required_key}")
+        return result
+    except Exception as e:
+        # Pro runs the same prompt on different models, so even a 4xx from flash is worth one retry
+        logger.warning("⚠️ Flash web research failed (%s), retrying with pro models", str(e)[:100])
+
+    response = await generate_with_fallback(
+        contents=prompt, config=None, models=MODELS_PRO, config_factory=research_request
+    )
+    return _parse_json_object(response.text)
+
+async def _fetch_overview(preamble: str, company_name: str) -> Dict[str, Any]:
+    return await _web_research_json(
+        preamble + _OVERVIEW_PROMPT.format(company_name=company_name),
+        "company_overview"
+    )
+
+async def _fetch_market(preamble: str, sector_hint: str) -> Dict[str, Any]:
+    return await _web_research_json(
+        preamble + _MARKET_PROMPT.format(sector_hint=sector_hint),
+        "market_analysis"
+    )
+
+async def _fetch_competitors(preamble: str, sector_hint: str) -> Dict[str, Any]:
+    return await _web_research_json(
+        preamble + _COMPETITORS_PROMPT.format(sector_hint=sector_hint),
+        "competitor_details"
+    )
+
+# Semantic cache of already-researched companies, so name variants
+# ("ABC Textiles Pvt Ltd" vs "ABC Textiles") reuse the expensive web research
+_COMPANY_EMBEDDING_MODEL = "text-embedding-004"
+_COMPANY_MATCH_THRESHOLD = 0.95
+_COMPANY_CACHE_TTL_SECONDS = 30 * 86400  # Sector/market data is stable over weeks
+_COMPANY_CACHE_SIZE = 512
+_company_research_cache: List[Dict[str, Any]] = []  # {"vector", "result", "stored_at"}
+
+async def _embed_company(text: str) -> List[float]:
+    response = await client.aio.models.embed_content(model=_COMPANY_EMBEDDING_MODEL, contents=text)
+    values = response.embeddings[0].values
+    norm = math.sqrt(sum(v * v for v in values)) or 1.0
+    return [v / norm for v in values]  # Unit vectors: cosine similarity is a plain dot product
+
+def _find_cached_company(vector: List[float]) -> Optional[Dict[str, Any]]:
+    """Best cached research result above the match threshold (expired entries are dropped)"""
+    now = time.monotonic()
+    _company_research_cache[:] = [e for e in _company_research_cache if now - e['stored_at'] < _COMPANY_CACHE_TTL_SECONDS]
+    best, best_score = None, _COMPANY_MATCH_THRESHOLD
+    for entry in _company_research_cache:
+        score = sum(a * b for a, b in zip(vector, entry['vector']))
+        if score >= best_score:
+            best, best_score = entry, score
+    return best
+
+def _store_cached_company(vector: List[float], result: Dict[str, Any]):
+    _company_research_cache.append({"vector": vector, "result": orjson.dumps(result), "stored_at": time.monotonic()})
+    if len(_company_research_cache) > _COMPANY_CACHE_SIZE:
+        _company_research_cache.pop(0)
+
 async def augment_cma_with_web_search(cma_text: str, cma_structured: Dict[str, Any]) -> Dict[str, Any]:
     """
     For CMA-only uploads, use Google Search to find company details and market info.
+    Overview, market and competitor research run as three concurrent prompts.
     Returns a partial Memo structure (Overview, Market, Products).
     """
     try:
@@ -1154,126 +2316,70 @@ async def augment_cma_with_web_search(cma_text: str, cma_structured: Dict[str, A
         # If name is unknown, we can't search effectively
         if company_name == "Unknown Company":
             # Try regex on raw text as fallback
-            match = re.search(r"(?:Name of the Unit|Borrower Name|Name)\s*[:\-\s]\s*([^\n]+)", cma_text, re.IGNORECASE)
+            # The borrower name lives in the CMA header, so only scan the first 4KB
+            match = _COMPANY_NAME_RE.search(cma_text[:4096])
             if match:
                 company_name = match.group(1).strip()
 
-        print(f"🔍 Performing Deep Web-Augmented Analysis for: {company_name}")
+        logger.info("🔍 Performing Deep Web-Augmented Analysis for: %s", company_name)
 
-        prompt = f"""
-        You are an elite Investment Banker and Credit Analyst. You are analyzing a company named "{company_name}" based on a CMA report and Web Research.
-
-        **TARGET ENTITY**: {company_name}
-        **KNOWN CONTEXT**: {json.dumps(general_info, indent=2)}
-
-        **MISSION**:
-        Perform a comprehensive web search to build an Investment Memo profile. 
-        You MUST fill in all fields. If specific private data is not available, you MUST:
-        1. Infer reasonable estimates based on the company's size, location, and industry sector.
-        2. Use Industry Intelligence to populate Market Analysis (TAM/SAM, Growth Rates).
-        3. Identify 3-5 likely competitors in the same region or sector.
-
-        **REQUIRED OUTPUT SECTIONS**:
-
-        1. **COMPANY OVERVIEW**: 
-           - Search for the company website, LinkedIn, and business directories (Zauba Corp, Indiamart).
-           - Identify Promoters/Directors.
-           - Determine exact Business Model (B2B/B2C, Manufacturing vs Trading).
-
-        2. **MARKET ANALYSIS (CRITICAL)**:
-           - Define the Industry Sector (e.g., "Textile Manufacturing in Gujarat" or "Auto Components").
-           - ESTIMATE the Total Addressable Market (TAM) for this sector in India. (e.g. "Indian Textile Market is $150B...").
-           - ESTIMATE Growth Rate (CAGR).
-           - Identify granular Sub-segment opportunities.
-
-        3. **COMPETITION**:
-           - List specific competitor names. 
-           - If private, list larger public proxies or typical local competitors.
-           - Estimate their revenue/scale if possible.
-
-        **JSON OUTPUT FORMAT**:
-        {{
-            "company_overview": {{
-                "name": "{company_name}",
-                "sector": "Specific Sector",
-                "description": "Comprehensive description...",
-                "founders": [
-                    {{ "name": "Name 1", "designation": "Director", "background": "Experience..." }},
-                    {{ "name": "Name 2", "designation": "Director" }}
-                ],
-                "business_model": [
-                   {{
-                       "revenue_streams": "Primary Revenue Source",
-                       "description": " Detailed explanation...",
-                       "target_audience": "Target Customer Profile"
-                   }}
-                ],
-                "establishment_year": "YYYY",
-                "location": "City, State",
-                "technologies_used": "Relevant tech/machinery...",
-                "key_problems_solved": ["Problem 1", "Problem 2"]
-            }},
-            "products_and_services": [
-                {{
-                    "name": "Core Product/Service",
-                    "description": "Details...",
-                    "revenue_share": "High/Medium/Low"
-                }}
-            ],
-            "market_analysis": {{
-                "industry_size_and_growth": {{
-                    "total_addressable_market": {{ "name": "Indian Market Sector", "value": "₹XX,XXX Cr", "cagr": "XX%", "source": "Industry Reports" }},
-                    "serviceable_obtainable_market": {{ "name": "Regional/Target Market", "value": "₹X,XXX Cr", "cagr": "XX%", "projection": "Positive" }},
-                    "commentary": "Detailed industry trends, growth drivers, and headwinds..."
-                }},
-                "sub_segment_opportunities": ["Opportunity 1", "Opportunity 2", "Opportunity 3"],
-                "competitor_details": [
-                    {{
-                        "name": "Competitor 1",
-                        "headquarters": "Location",
-                        "revenue_streams": "Similar products",
-                        "market_share": "Leading/Niche",
-                        "strategic_focus": "Differentiation factor"
-                    }},
-                    {{
-                        "name": "Competitor 2",
-                        "headquarters": "Location"
-                    }}
-                ],
-                "reports": [
-                    {{ "title": "Index Sector Report 2024", "source_name": "IBEF/Crisil", "summary": "Sector outlook...", "source_url": "https://example.com" }}
-                ]
-            }},
-            "competition": {{
-                 "competitive_advantage": "Key strengths vs peers",
-                 "market_position": "Market Leader / Challenger / Niche Player"
-            }}
-        }}
-        """
+        preamble = _WEB_RESEARCH_PREAMBLE.format(company_name=company_name, known_context=_to_json(general_info))
+        sector = general_info.get('sector') or general_info.get('Industry') or general_info.get('Activity')
+        sector_hint = f' (known: "{sector}")' if sector else ""
 
-        # Configure with Search Tool
-        tools = [Tool(google_search=GoogleSearch())]
-        config = GenerateContentConfig(
-            temperature=0.4, # Slightly higher for creative inference
-            top_p=0.95,
-            top_k=40,
-            max_output_tokens=8192, # Allow long responses
-            response_mime_type="application/json",
-            tools=tools
-        )
-
-        response = await generate_with_fallback(
-            contents=prompt,
-            config=config,
-            models=MODELS_PRO
+        # Known entity? Reuse overview/market research and only refresh competitors
+        company_vector = None
+        if company_name != "Unknown Company":
+            try:
+                company_vector = await _embed_company(f"{company_name} {general_info.get('location', '')}".strip())
+                cached = _find_cached_company(company_vector)
+            except Exception as e:
+                logger.warning("⚠️ Company embedding lookup failed: %s", e)
+                cached = None
+            if cached:
+                logger.info("♻️ Reusing cached web research for: %s", company_name)
+                result = orjson.loads(cached['result'])
+                try:
+                    competitors = await _fetch_competitors(preamble, sector_hint)
+                    result.setdefault('market_analysis', {})['competitor_details'] = competitors.get('competitor_details', [])
+                    result['competition'] = competitors.get('competition', {})
+                except Exception as e:
+                    logger.warning("⚠️ Competitor refresh failed, keeping cached data: %s", e)
+                result['cached'] = True
+                return result
+
+        overview, market, competitors = await asyncio.gather(
+            _fetch_overview(preamble, company_name),
+            _fetch_market(preamble, sector_hint),
+            _fetch_competitors(preamble, sector_hint),
+            return_exceptions=True
         )
-
-        return json.loads(response.text)
+        for section, result in (("overview", overview), ("market", market), ("competitors", competitors)):
+            if isinstance(result, BaseException):
+                logger.warning("⚠️ Web research for %s failed: %s", section, result)
+        if all(isinstance(r, BaseException) for r in (overview, market, competitors)):
+            raise overview
+
+        overview = {} if isinstance(overview, BaseException) else overview
+        market = {} if isinstance(market, BaseException) else market
+        competitors = {} if isinstance(competitors, BaseException) else competitors
+
+        # Merge into the single-prompt response shape
+        market_analysis = market.get('market_analysis') or {}
+        market_analysis['competitor_details'] = competitors.get('competitor_details', [])
+        result = {
+            "company_overview": overview.get('company_overview') or {"name": company_name, "sector": sector or "Unknown"},
+            "products_and_services": overview.get('products_and_services', []),
+            "market_analysis": market_analysis,
+            "competition": competitors.get('competition', {})
+        }
+        # Only cache complete research
+        if company_vector and overview and market:
+            _store_cached_company(company_vector, result)
+        return result
 
     except Exception as e:
-        print(f"Error in Deep Web-Augmented Analysis: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error in Deep Web-Augmented Analysis: %s", e)
         # Return skeleton with Company Name at least
         return {
             "company_overview": { 
@@ -1284,3 +2390,36 @@ async def augment_cma_with_web_search(cma_text: str, cma_structured: Dict[str, A
             "market_analysis": {},
             "products_and_services": []
         }
+
+async def _gather_bounded(coros: List[Any], max_parallel: int) -> List[Any]:
+    """Run coroutines concurrently, at most max_parallel at a time. Failures are returned, not raised."""
+    semaphore = asyncio.Semaphore(max_parallel)
+    
+    async def _bounded(coro):
+        async with semaphore:
+            return await coro
+    
+    return await asyncio.gather(*[_bounded(coro) for coro in coros], return_exceptions=True)
+
+async def extract_cma_data_batch(items: List[Dict[str, Any]], max_parallel: int = 8) -> List[Any]:
+    """
+    Run extract_cma_data over several documents concurrently.
+    items: list of kwargs dicts for extract_cma_data ({'raw_text': ...} or {'pdf_bytes': ...}).
+    Returns results in input order; a failed item is returned as its exception.
+    """
+    return await _gather_bounded([extract_cma_data(**item) for item in items], max_parallel)
+
+async def verify_claims_with_google_batch(items: List[Dict[str, Any]], max_parallel: int = 8) -> List[Any]:
+    """
+    Run verify_claims_with_google over several pitch decks concurrently.
+    items: list of kwargs dicts ({'extracted_text': ...} or {'pdf_bytes': ...}).
+    Returns results in input order; a failed item is returned as its exception.
+    """
+    return await _gather_bounded([verify_claims_with_google(**item) for item in items], max_parallel)
+
+async def augment_cma_with_web_search_batch(items: List[Dict[str, Any]], max_parallel: int = 8) -> List[Any]:
+    """
+    Run augment_cma_with_web_search over several CMA reports concurrently.
+    items: list of kwargs dicts ({'cma_text': ..., 'cma_structured': ...}).
+    """
+    return await _gather_bounded([augment_cma_with_web_search(**item) for item in items], max_parallel)
@@ -1,27 +1,76 @@
 import base64
+import colorsys
+import functools
+import hashlib
+import io
+import logging
+import time
+from collections import OrderedDict, defaultdict, deque
+from typing import Dict, List, Tuple
+import numpy as np
+from PIL import Image
 from google import genai
-from google.genai.types import GenerateContentConfig
-from config.settings import settings
 import asyncio
 
-# Initialize Google Gen AI client
-client = genai.Client(
-    api_key=settings.GEMINI_API_KEY
-)
+# Shared Gen AI client (pooled HTTP/2 connections) from gemini_service
+from services.gemini_service import client
+from utils import result_cache
 
-async def generate_deal_cover_art(deal_id: str, company_name: str, sector: str, description: str) -> str:
+logger = logging.getLogger(__name__)
+
+# Cover art is abstract and sector-themed, so it is generated per sector and shared across deals.
+# Bump COVER_ART_PALETTE_VERSION to invalidate cached variants after changing the prompt/style.
+COVER_ART_PALETTE_VERSION = 1
+COVER_ART_MAX_VARIANTS = 4
+_COVER_ART_CACHE_TTL_SECONDS = 30 * 86400
+# Each entry holds up to COVER_ART_MAX_VARIANTS multi-MB data URIs, so keep the LRU small;
+# the disk tier (result_cache) still serves sectors that fall out of it
+_COVER_ART_CACHE_SIZE = 16
+_cover_art_cache: "OrderedDict[str, tuple]" = OrderedDict()  # sha256(sector|palette) -> (data URIs, stored_at)
+
+# Circuit breaker: after this many Imagen failures inside the window, skip Imagen and go
+# straight to the local gradient until the window has passed
+IMAGEN_BREAKER_FAILURES = 3
+IMAGEN_BREAKER_WINDOW_SECONDS = 60
+_imagen_failures: deque = deque(maxlen=IMAGEN_BREAKER_FAILURES)  # monotonic timestamps
+
+def _imagen_breaker_open() -> bool:
+    return (
+        len(_imagen_failures) == IMAGEN_BREAKER_FAILURES
+        and time.monotonic() - _imagen_failures[0] < IMAGEN_BREAKER_WINDOW_SECONDS
+    )
+
+GRADIENT_WIDTH, GRADIENT_HEIGHT = 1920, 540
+
+@functools.lru_cache(maxsize=64)
+def _synth_gradient(seed: str) -> str:
     """
-    Generate a professional cover art image for a deal using Gemini Image Generation.
-    Returns the base64 encoded image string.
+    Deterministic two-colour diagonal gradient JPEG (as a data URI) for a sector, built with
+    vectorized numpy ops - a few ms locally instead of a remote Imagen call.
     """
-    print(f"[{deal_id}] 🎨 Generating cover art for {company_name} ({sector})...")
+    digest = hashlib.sha256(seed.encode()).digest()
+    hue = digest[0] / 255
+    start = np.array(colorsys.hsv_to_rgb(hue, 0.75, 0.35))
+    end = np.array(colorsys.hsv_to_rgb((hue + 0.15 + digest[1] / 2550) % 1.0, 0.65, 0.85))
+    
+    x = np.linspace(0.0, 1.0, GRADIENT_WIDTH, dtype=np.float32)[None, :]
+    y = np.linspace(0.0, 1.0, GRADIENT_HEIGHT, dtype=np.float32)[:, None]
+    t = np.clip(0.75 * x + 0.25 * y, 0.0, 1.0)[..., None]
+    pixels = ((1.0 - t) * start + t * end) * 255
     
-    prompt = f"""
+    buffer = io.BytesIO()
+    Image.fromarray(pixels.astype(np.uint8)).save(buffer, "JPEG", quality=80)
+    return f"data:image/jpeg;base64,{base64.b64encode(buffer.getvalue()).decode('utf-8')}"
+
+def _cover_art_key(sector: str) -> str:
+    bucket = (sector or "general").strip().lower()
+    return hashlib.sha256(f"{bucket}|{COVER_ART_PALETTE_VERSION}".encode()).hexdigest()
+
+def _cover_art_prompt(sector: str) -> str:
+    return f"""
     Create a professional, abstract, high-quality background image for a startup dashboard.
     
-    Startup Name: {company_name}
     Sector: {sector}
-    Description: {description}
     
     Style: Modern, sleek, digital art, abstract, suitable for a business dashboard header. 
     The image should be wide (landscape aspect ratio).
@@ -29,37 +78,91 @@ async def generate_deal_cover_art(deal_id: str, company_name: str, sector: str,
     Use colors that represent the sector (e.g., blue/green for fintech, green for agritech, dark/neon for cyber).
     Make it look premium and futuristic.
     """
-    
-    try:
-        # Generate image using Imagen 3 via Gemini API
-        # Note: The exact method call might vary depending on the library version.
-        # Using the standard generate_images method for Imagen.
-        
-        response = client.models.generate_images(
-            model='imagen-3.0-generate-001',
-            prompt=prompt,
-            config=genai.types.GenerateImagesConfig(
-                number_of_images=1,
-                aspect_ratio="16:9",
-                include_rai_reason=True,
-                output_mime_type="image/jpeg"
-            )
+
+async def _generate_sector_variants(sector: str, count: int) -> List[str]:
+    """One Imagen call for up to COVER_ART_MAX_VARIANTS images of a sector, as data URIs"""
+    response = await client.aio.models.generate_images(
+        model='imagen-3.0-generate-001',
+        prompt=_cover_art_prompt(sector),
+        config=genai.types.GenerateImagesConfig(
+            number_of_images=count,
+            aspect_ratio="16:9",
+            include_rai_reason=True,
+            output_mime_type="image/jpeg"
         )
-        
-        if response.generated_images:
-            image = response.generated_images[0]
-            # The image bytes are in image.image.image_bytes
-            image_bytes = image.image.image_bytes
-            base64_image = base64.b64encode(image_bytes).decode('utf-8')
-            print(f"[{deal_id}] ✅ Cover art generated successfully!")
-            return f"data:image/jpeg;base64,{base64_image}"
+    )
+    variants = []
+    for image in response.generated_images or []:
+        if image.image and image.image.image_bytes:
+            # base64 of a multi-MB JPEG is CPU-bound: keep it off the event loop
+            encoded = await asyncio.to_thread(base64.b64encode, image.image.image_bytes)
+            variants.append(f"data:image/jpeg;base64,{encoded.decode('utf-8')}")
+    return variants
+
+async def generate_cover_art_batch(requests: List[Tuple[str, str]]) -> List[str]:
+    """
+    Cover art for several deals at once. requests: (deal_id, sector) pairs.
+    Deals are grouped by sector; each uncached sector costs one Imagen call producing
+    min(COVER_ART_MAX_VARIANTS, group size) variants, which are fanned back out and cached.
+    Sectors Imagen can't serve (errors, or the circuit breaker is open) get a locally
+    generated gradient. Returns one data URI per request, in order.
+    """
+    groups: Dict[str, List[int]] = defaultdict(list)
+    for idx, (_, sector) in enumerate(requests):
+        groups[_cover_art_key(sector)].append(idx)
+    
+    now = time.time()
+    results: List[str] = [""] * len(requests)
+    
+    async def fill(key: str, indices: List[int]):
+        sector = requests[indices[0]][1]
+        cached = _cover_art_cache.get(key)
+        if cached and now - cached[1] >= _COVER_ART_CACHE_TTL_SECONDS:
+            del _cover_art_cache[key]
+            cached = None
+        if cached:
+            _cover_art_cache.move_to_end(key)
+            variants = cached[0]
+        elif _imagen_breaker_open():
+            logger.warning("⚠️ Imagen circuit open, using generated gradient for sector %s", sector)
+            variants = []
         else:
-            print(f"[{deal_id}] ⚠️ No image generated.")
-            return None
-            
-    except Exception as e:
-        print(f"[{deal_id}] ❌ Error generating cover art: {str(e)}")
-        # Return None so the frontend uses the default gradient
-        return None
+            try:
+                # Persistent tier: survives restarts, shared by every worker on the host
+                variants = await result_cache.get_or_compute(
+                    "cover_art", key,
+                    lambda: _generate_sector_variants(sector, min(COVER_ART_MAX_VARIANTS, len(indices))),
+                    ttl=_COVER_ART_CACHE_TTL_SECONDS,
+                    should_cache=bool
+                )
+            except Exception as e:
+                logger.error("❌ Error generating cover art for sector %s: %s", sector, e)
+                _imagen_failures.append(time.monotonic())
+                variants = []
+            if variants:
+                _cover_art_cache[key] = (variants, now)
+                _cover_art_cache.move_to_end(key)
+                if len(_cover_art_cache) > _COVER_ART_CACHE_SIZE:
+                    _cover_art_cache.popitem(last=False)
+        if not variants:
+            # Local fallback: memoized per sector, never persisted so Imagen art replaces it later
+            variants = [await asyncio.to_thread(_synth_gradient, key)]
+        for idx in indices:
+            # Stable per-deal pick so a deal keeps the same variant
+            deal_id = requests[idx][0]
+            results[idx] = variants[int(hashlib.sha256(deal_id.encode()).hexdigest(), 16) % len(variants)]
+    
+    await asyncio.gather(*[fill(key, indices) for key, indices in groups.items()])
+    return results
 
-        return None
+async def generate_deal_cover_art(deal_id: str, company_name: str, sector: str, description: str) -> str:
+    """
+    Generate a professional cover art image for a deal using Gemini Image Generation.
+    Art is sector-themed and cached per sector (see generate_cover_art_batch); company_name
+    and description are only used for logging.
+    Returns the base64 encoded image string (data URI); falls back to a generated gradient.
+    """
+    logger.info("[%s] 🎨 Generating cover art for %s (%s)...", deal_id, company_name, sector)
+    image = (await generate_cover_art_batch([(deal_id, sector)]))[0]
+    logger.info("[%s] ✅ Cover art ready", deal_id)
+    return image
@@ -1,365 +1,3 @@
-# from typing import Dict, Any, List
-# from google import genai
-# from google.genai.types import GenerateContentConfig
-# from config.settings import settings
-# import json
-
-# client = genai.Client(
-#     vertexai=True,
-#     project=settings.GCP_PROJECT_ID,
-#     location=settings.GCP_LOCATION
-# )
-
-# async def chat_with_founder(
-#     interview_data: Dict[str, Any],
-#     user_message: str,
-#     chat_history: List[Dict[str, str]]
-# ) -> Dict[str, Any]:
-#     """
-#     Natural conversational AI that adapts to founder's responses
-#     """
-    
-#     company_name = interview_data.get('company_name', 'your startup')
-#     sector = interview_data.get('sector', 'your industry')
-#     founder_name = interview_data.get('founder_name', 'Founder')
-#     issues = interview_data.get('issues', [])
-#     gathered_info = interview_data.get('gathered_info', {})
-#     cannot_answer_fields = interview_data.get('cannot_answer_fields', [])
-    
-#     # ✅ Get all original issue field names
-#     all_issue_fields = [issue['field'] for issue in issues]
-    
-#     # ✅ Only count gathered_info that matches actual issue fields
-#     gathered_issue_fields = [f for f in gathered_info.keys() if f in all_issue_fields]
-
-#     # Build what we still need - EXCLUDE fields they can't answer
-#     still_needed = [
-#         {
-#             'field': issue['field'],
-#             'question': issue['question'],
-#             'category': issue['category'],
-#             'importance': issue['importance'],
-#             'status': issue['status']
-#         }
-#         for issue in issues
-#         if issue['field'] not in gathered_issue_fields and issue['field'] not in cannot_answer_fields
-#     ]
-    
-#     # Get recent context
-#     recent_context = chat_history[-10:] if len(chat_history) > 10 else chat_history
-    
-#     # Get next 3 questions to ask
-#     next_questions = [q['question'] for q in still_needed[:3]]
-    
-#     # ✅ Check if this should be closing message
-#     # print("still_needed: ", still_needed)
-#     # print("gathered_info: ", gathered_info)
-#     # print("cannot_answer_fields: ", len(cannot_answer_fields))
-#     # print("Still Need Count: ", len(still_needed))
-#     print(f"📋 Total issues: {len(all_issue_fields)}")
-#     print(f"✅ Gathered (matching issues): {len(gathered_issue_fields)}")
-#     print(f"📊 Progress: {len(gathered_issue_fields) + len(cannot_answer_fields)}/{len(all_issue_fields)}")
-    
-
-#     will_be_closing = len(still_needed) <= 0
-    
-#     # Build conversation prompt
-#     if will_be_closing:
-#         # ✅ CLOSING MESSAGE
-#         prompt = f"""
-# You are Sarah, a friendly investment analyst. You just finished interviewing {founder_name} about {company_name}.
-
-# ## CONTEXT:
-# - We've gathered all the important information we need
-# - Total topics: {len(all_issue_fields)}
-# - Answered: {len(gathered_issue_fields)}
-# - Couldn't answer: {len(cannot_answer_fields)}
-# - Founder's last message: "{user_message}"
-
-# ## YOUR TASK:
-# Write a warm, professional CLOSING message that:
-# 1. Thanks them for their time and openness
-# 2. Summarizes what you'll do next (update investment memo, share feedback)
-# 3. Encourages them about their company
-# 4. Mentions when they might expect to hear back (within 2-3 weeks)
-# 5. Leaves them feeling positive
-
-# Keep it 60-100 words. Be warm and genuine, not robotic.
-
-# Closing message:
-# """
-#     else:
-#         # ✅ NORMAL CONTINUATION
-#         prompt = f"""
-# You are Sarah, a friendly investment analyst talking with {founder_name} about {company_name} ({sector}).
-
-# ## CONTEXT:
-# - Progress: {len(gathered_issue_fields) + len(cannot_answer_fields)}/{len(all_issue_fields)} topics covered
-# - Founder's latest message: "{user_message}"
-# - Fields they already said they don't know: {json.dumps(cannot_answer_fields[:5])}
-
-# ## NEXT 3 QUESTIONS TO ASK (in priority order):
-# 1. {next_questions[0] if len(next_questions) > 0 else 'Tell me about your financials?'}
-# 2. {next_questions[1] if len(next_questions) > 1 else 'Tell me about your team?'}
-# 3. {next_questions[2] if len(next_questions) > 2 else 'Tell me about your market?'}
-
-# ## RECENT CONVERSATION:
-# {json.dumps(recent_context, indent=2)}
-
-# ## YOUR RULES:
-# 1. Be warm, conversational, human-like
-# 2. Acknowledge their answer briefly (1-2 sentences)
-# 3. THEN ASK THE NEXT QUESTION (required!)
-# 4. If they say "don't know":
-#    - First time → Try ONE different angle OR ask for rough estimate
-#    - After that → Move to DIFFERENT question, don't repeat
-# 5. One question at a time, 40-80 words total
-# 6. Make it feel like coffee chat, not interrogation
-# 7. MUST END WITH A QUESTION MARK
-# 8. DO NOT ask questions about topics in "Fields they already said they don't know"
-
-# ## CRITICAL: YOUR RESPONSE MUST:
-# ✓ Acknowledge their answer
-# ✓ Ask ONE of the next 3 questions above
-# ✓ End with "?"
-# ✓ NOT ask questions they already said they don't know to
-
-# Based on all this, respond with acknowledgment + next question:
-# """
-    
-#     try:
-#         response = client.models.generate_content(
-#             model='gemini-2.5-flash',
-#             contents=prompt,
-#             config=GenerateContentConfig(
-#                 temperature=0.85,
-#                 max_output_tokens=5000,
-#                 top_p=0.95
-#             )
-#         )
-        
-#         if response is None or not hasattr(response, 'text'):
-#             raise ValueError("Invalid API response")
-        
-#         ai_message = response.text.strip()
-        
-#         if not ai_message:
-#             raise ValueError("Empty response from AI")
-        
-#         # ✅ Only add question mark if NOT closing message
-#         if not will_be_closing:
-#             if not ai_message.endswith('?'):
-#                 if not any(ai_message.endswith(p) for p in ['?', '!', '.']):
-#                     ai_message += '?'
-#                 elif ai_message.endswith('.'):
-#                     if '?' not in ai_message:
-#                         ai_message = ai_message[:-1] + '?'
-        
-#     except Exception as e:
-#         print(f"❌ Chat Error: {str(e)}")
-#         if will_be_closing:
-#             ai_message = f"Thank you so much for your time, {founder_name}! We've gathered excellent insights about {company_name}. I'll update our investment memo and get back to you within 2-3 weeks with our feedback. Best of luck with everything!"
-#         else:
-#             next_q = still_needed[0]['question'] if still_needed else "What else can you tell me?"
-#             ai_message = f"Thanks for sharing! {next_q}"
-    
-#     # Extract what was gathered from this turn
-#     completion_check = await analyze_and_extract(
-#         issues,
-#         gathered_info,
-#         cannot_answer_fields,
-#         chat_history + [
-#             {"role": "user", "message": user_message},
-#             {"role": "assistant", "message": ai_message}
-#         ]
-#     )
-    
-#     return {
-#         "message": ai_message,
-#         "is_complete": completion_check['is_complete'],
-#         "gathered_info": completion_check['gathered_info'],
-#         "cannot_answer_fields": completion_check.get('cannot_answer_fields', [])
-#     }
-
-# async def analyze_and_extract(
-#     issues: List[Dict[str, str]],
-#     gathered_info: Dict[str, Any],
-#     existing_cannot_answer: List[str],
-#     chat_history: List[Dict[str, str]]
-# ) -> Dict[str, Any]:
-#     """
-#     Let AI analyze conversation and decide what to extract and if complete
-#     """
-    
-#     user_messages = [msg for msg in chat_history if msg['role'] == 'user']
-    
-#     if len(user_messages) < 2:
-#         return {
-#             "is_complete": False,
-#             "gathered_info": gathered_info,
-#             "still_pending": [i['field'] for i in issues],
-#             "cannot_answer_fields": []
-#         }
-    
-#     # ✅ Get all issue field names
-#     all_issue_fields = [issue['field'] for issue in issues]
-
-#     # Build conversation
-#     conversation = []
-#     for msg in chat_history[-20:]:
-#         role = "Analyst" if msg['role'] == 'assistant' else "Founder"
-#         conversation.append(f"{role}: {msg['message']}")
-    
-#     # What we're looking for
-#     fields_needed = [
-#         {
-#             'field': issue['field'],
-#             'question': issue['question'],
-#             'category': issue['category']
-#         }
-#         for issue in issues
-#         if issue['field'] not in gathered_info
-#     ]
-    
-#     # Ask AI to analyze
-#     analysis_prompt = f"""
-# Analyze this founder interview and decide:
-
-# ## INFORMATION NEEDED:
-# {json.dumps(fields_needed[:15], indent=2)}
-
-# ## ALREADY HAVE:
-# {json.dumps([f for f in gathered_info.keys() if f in all_issue_fields])}
-
-# ## CONVERSATION:
-# {json.dumps(conversation, indent=2)}
-
-# ## YOUR TASK:
-# 1. Extract ANY specific information founder mentioned (numbers, facts, names)
-# 2. Track which topics they said "don't know" or couldn't answer
-# 3. Decide if interview should continue or wrap up
-# 4. Match extracted info to the field names in "field_name"
-
-# Return JSON:
-# {{
-#     "extracted": {{
-#         "field_name": {{
-#             "value": "what they said",
-#             "confidence": "high/medium/low"
-#         }}
-#     }},
-#     "cannot_answer": ["field1", "field2"],
-#     "is_complete": true/false,
-#     "completion_reason": "why"
-# }}
-
-# RULES:
-# - Extract ONLY specific data (numbers, names, facts)
-# - Ignore: "I don't know", "not sure", vague answers
-# - Confidence high = clear specific answer
-# - Confidence medium = partial/rough answer
-# - cannot_answer = topics they explicitly said they don't know
-# - is_complete = true ONLY if:
-#   * All the issues attempted 
-#   * NOT just because we've talked a lot
-# """
-    
-#     try:
-#         response = client.models.generate_content(
-#             model='gemini-2.5-flash',
-#             contents=analysis_prompt,
-#             config=GenerateContentConfig(
-#                 temperature=0.2,
-#                 response_mime_type="application/json",
-#                 max_output_tokens=5000
-#             )
-#         )
-        
-#         if response is None or not hasattr(response, 'text') or response.text is None:
-#             raise ValueError("Invalid API response")
-        
-#         response_text = response.text.strip()
-        
-#         if not response_text:
-#             raise ValueError("Empty response")
-        
-#         result = json.loads(response_text)
-        
-#         # Merge extracted info
-#         merged = {**gathered_info}
-#         for field, data in result.get('extracted', {}).items():
-#             # if data.get('confidence') in ['high', 'medium']:
-#             if field in all_issue_fields and data.get('confidence') in ['high', 'medium']:
-#                 merged[field] = data
-        
-#         # # Calculate coverage - STRICTER now
-#         # total_issues = len(issues)
-#         # gathered = len(merged)
-#         # cannot_answer = len(result.get('cannot_answer', []))
-
-#         # # Calculate how many issues have been attempted (either answered or marked as "don't know")
-#         # total_attempted = gathered + cannot_answer
-
-#         # ✅ Get NEW cannot_answer fields from this response
-#         new_cannot_answer = [f for f in result.get('cannot_answer', []) if f in all_issue_fields]
-        
-#         # ✅ Calculate progress based on ACTUAL issue fields only
-#         gathered_count = len([f for f in merged.keys() if f in all_issue_fields])
-#         total_cannot_answer = len(set(existing_cannot_answer + new_cannot_answer))
-#         total_attempted = gathered_count + total_cannot_answer
-#         total_issues = len(all_issue_fields)
-        
-#         # # Completion criteria (much stricter)
-#         # gathered_pct = gathered / total if total > 0 else 0
-#         # cannot_answer_pct = cannot_answer / total if total > 0 else 0
-#         # total_coverage_pct = (gathered + cannot_answer) / total if total > 0 else 0
-        
-#         # # ✅ FIXED: More strict completion check
-#         # is_complete = (
-#         #     (result.get('is_complete') == True and gathered >= total * 0.8) or  # AI says complete AND 80% gathered
-#         #     (gathered >= total * 0.85) or  # 85% gathered
-#         #     (total_coverage_pct >= 0.95 and cannot_answer > 0)  # 95% covered (including don't knows)
-#         # )
-        
-#         # print(f"📊 {gathered}/{total} gathered ({gathered_pct*100:.0f}%), {cannot_answer} can't answer ({cannot_answer_pct*100:.0f}%), total coverage: {total_coverage_pct*100:.0f}%")
-#         # print(f"   is_complete: {is_complete}")
-
-
-#         # Simple rule: Interview is complete when ALL issues are attempted
-#         is_complete = (total_attempted >= total_issues)
-
-#         print(f"📊 Extraction result:")
-#         print(f"   - Gathered: {gathered_count}/{total_issues}")
-#         print(f"   - Cannot answer: {total_cannot_answer}")
-#         print(f"   - Total attempted: {total_attempted}/{total_issues}")
-#         print(f"   - Complete: {is_complete}")
-        
-#         return {
-#             "is_complete": is_complete,
-#             "gathered_info": merged,
-#             "still_pending": [f for f in all_issue_fields if f not in merged.keys() and f not in existing_cannot_answer],
-#             # "cannot_answer_fields": result.get('cannot_answer', [])
-#             "cannot_answer_fields": new_cannot_answer  # Only NEW ones from this turn
-#         }
-        
-#     except json.JSONDecodeError as e:
-#         print(f"❌ JSON Parse Error: {str(e)}")
-#         return {
-#             "is_complete": False,
-#             "gathered_info": gathered_info,
-#             "still_pending": [f['field'] for f in fields_needed],
-#             "cannot_answer_fields": []
-#         }
-#     except Exception as e:
-#         print(f"❌ Analysis Error: {str(e)}")
-#         return {
-#             "is_complete": False,
-#             "gathered_info": gathered_info,
-#             "still_pending": [f['field'] for f in fields_needed],
-#             "cannot_answer_fields": []
-#         }
-
-
 """
 Reliable Interview System with Answer Validation
 - No repeated questions
@@ -368,17 +6,87 @@ Reliable Interview System with Answer Validation
 - Re-asks up to 2 times for irrelevant answers
 """
 
-from typing import Dict, Any, List, Optional
-from google import genai
-from google.genai.types import GenerateContentConfig
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, AsyncIterator, Tuple
+from google.genai.types import GenerateContentConfig, ThinkingConfig
 from config.settings import settings
-import json
+from services.gemini_service import client, _get_prompt_cache, _is_fallback_error
+from models.schemas import AnswerAnalysis, InterviewTurn
+import asyncio
+import hashlib
+import logging
+import random
 import re
+import time
+import zlib
 
+logger = logging.getLogger(__name__)
 
-client = genai.Client(
-    api_key=settings.GEMINI_API_KEY
-)
+INTERVIEW_MODEL = 'gemini-2.5-flash'
+
+# Shared limits for every interview call across all concurrent interviews: a bounded number
+# in flight, a token bucket under the project's request quota, and jittered retries on 429/5xx
+INTERVIEW_MAX_CONCURRENT_CALLS = 64
+INTERVIEW_RETRY_ATTEMPTS = 3
+INTERVIEW_RETRY_BASE_SECONDS = 0.5
+
+
+class _RateLimiter:
+    """Token bucket: at most rate calls per second on average, bursts of up to rate"""
+    
+    def __init__(self, rate: float):
+        self._rate = rate
+        self._tokens = rate
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()  # Waiters queue here in FIFO order
+    
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self._rate, self._tokens + (now - self._updated) * self._rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self._rate)
+
+
+_gemini_slots = asyncio.Semaphore(INTERVIEW_MAX_CONCURRENT_CALLS)
+_gemini_rate_limiter = _RateLimiter(settings.GEMINI_QPS)
+
+
+async def _call_gemini(model: str, contents, config: GenerateContentConfig):
+    """generate_content under the shared concurrency/QPS limits, retrying rate limits and 5xx with backoff"""
+    for attempt in range(INTERVIEW_RETRY_ATTEMPTS):
+        await _gemini_rate_limiter.acquire()
+        async with _gemini_slots:
+            try:
+                return await client.aio.models.generate_content(model=model, contents=contents, config=config)
+            except Exception as e:
+                if attempt == INTERVIEW_RETRY_ATTEMPTS - 1 or not _is_fallback_error(e):
+                    raise
+                logger.warning("⚠️ %s call failed (%s), retrying", model, e)
+        # Exponential backoff with jitter, outside the slot so others can proceed meanwhile
+        await asyncio.sleep(INTERVIEW_RETRY_BASE_SECONDS * 2 ** attempt * random.uniform(0.5, 1.5))
+# Thinking tokens count against max_output_tokens; these short tasks don't need them, and
+# leaving thinking on would eat the tight output budgets below
+_NO_THINKING = ThinkingConfig(thinking_budget=0)
+
+
+async def _task_config(
+    name: str,
+    instructions: str,
+    params: Dict[str, Any],
+    model_name: str = INTERVIEW_MODEL
+) -> GenerateContentConfig:
+    """
+    Request config for one interview task: the static instructions are referenced from an
+    explicit context cache shared by all interviews when one is available, sent inline otherwise.
+    Only the per-turn deltas (question, answer, history) go in the prompt itself.
+    """
+    cached_config = await _get_prompt_cache(name, model_name, instructions, params=params)
+    return cached_config or GenerateContentConfig(system_instruction=instructions, **params)
 
 
 # ===== STATE MANAGEMENT =====
@@ -386,15 +94,33 @@ client = genai.Client(
 class InterviewState:
     """Clear state tracking for interview progress"""
     
+    # One instance per turn per interview; slots keep them small and fail loudly on stray attributes
+    __slots__ = (
+        'all_issues', 'gathered_info', 'cannot_answer', 'asked_questions', 'ask_count',
+        'running_summary', 'summarized_upto', 'last_asked_field', 'all_fields', 'all_fields_set',
+        '_epoch', '_progress_cache', '_remaining_cache'
+    )
+    
     def __init__(self, interview_data: Dict[str, Any]):
         self.all_issues = interview_data.get('issues', [])
         self.gathered_info = interview_data.get('gathered_info', {})
         self.cannot_answer = set(interview_data.get('cannot_answer_fields', []))
         self.asked_questions = set(interview_data.get('asked_questions', []))
         self.ask_count = interview_data.get('ask_count', {})
+        # Rolling summary of chat_history[:summarized_upto]; only the tail is sent verbatim
+        self.running_summary = interview_data.get('running_summary', '')
+        self.summarized_upto = interview_data.get('summarized_upto', 0)
+        # Field the last assistant message asked about, so the next answer needs no text matching
+        self.last_asked_field = interview_data.get('last_asked_field')
         
-        # Get all field names
+        # Get all field names (list keeps issue order, frozenset is for membership tests)
         self.all_fields = [issue['field'] for issue in self.all_issues]
+        self.all_fields_set = frozenset(self.all_fields)
+        
+        # Bumped on every mutation; derived views are cached as (epoch, value)
+        self._epoch = 0
+        self._progress_cache = None
+        self._remaining_cache = None
         
     def get_ask_count(self, field: str) -> int:
         """Get how many times we've asked this question"""
@@ -403,21 +129,23 @@ class InterviewState:
     def increment_ask_count(self, field: str):
         """Increment ask count for a field"""
         self.ask_count[field] = self.ask_count.get(field, 0) + 1
+        self._epoch += 1
         
-    def get_next_question(self) -> Optional[Dict[str, Any]]:
-        """Get next unanswered question that hasn't been asked too many times"""
+    def peek_next_question(self, skip: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Get next unanswered question that hasn't been asked too many times (optionally treating
+        skip as resolved). Read-only: exhausted fields are skipped here and retired separately.
+        """
         for issue in self.all_issues:
             field = issue['field']
             
             # Skip if already gathered or cannot answer
-            if field in self.gathered_info or field in self.cannot_answer:
+            if field in self.gathered_info or field in self.cannot_answer or field == skip:
                 continue
             
             # Allow re-asking up to 2 times if user gave irrelevant answers
             ask_count = self.get_ask_count(field)
             if ask_count >= 2:  # Asked twice already, skip
-                # Mark as cannot answer if asked twice and still no good answer
-                self.cannot_answer.add(field)
                 continue
             
             return {
@@ -430,30 +158,59 @@ class InterviewState:
         
         return None
     
+    def retire_exhausted_fields(self):
+        """Mark fields asked twice without a good answer as cannot answer"""
+        for field in self.all_fields:
+            if (
+                field not in self.gathered_info
+                and field not in self.cannot_answer
+                and self.get_ask_count(field) >= 2
+            ):
+                self.cannot_answer.add(field)
+                self._epoch += 1
+    
     def mark_question_asked(self, field: str):
         """Mark question as asked"""
         self.asked_questions.add(field)
         self.increment_ask_count(field)
     
+    def field_for_question(self, last_assistant_message: Optional[str]) -> Optional[str]:
+        """Which field the last assistant message was asking about"""
+        if self.last_asked_field in self.all_fields_set:
+            return self.last_asked_field
+        # Interviews saved before last_asked_field existed: match the question text
+        if not last_assistant_message:
+            return None
+        message_lower = last_assistant_message.lower()
+        for issue in self.all_issues:
+            if issue['question'].lower() in message_lower:
+                return issue['field']
+        return None
+    
     def add_answer(self, field: str, value: Any, confidence: str = 'high'):
         """Record an answer"""
         self.gathered_info[field] = {
             'value': value,
             'confidence': confidence
         }
+        self._epoch += 1
     
     def mark_cannot_answer(self, field: str):
         """Mark field as cannot answer"""
         self.cannot_answer.add(field)
+        self._epoch += 1
     
     def get_progress(self) -> Dict[str, Any]:
-        """Get current progress - PURE MATH, NO LLM"""
+        """Get current progress - PURE MATH, NO LLM (cached until the state changes; don't mutate)"""
+        if self._progress_cache and self._progress_cache[0] == self._epoch:
+            return self._progress_cache[1]
+        
         total = len(self.all_fields)
-        answered = len([f for f in self.gathered_info.keys() if f in self.all_fields])
+        answered = len(self.gathered_info.keys() & self.all_fields_set)
         cannot = len(self.cannot_answer)
         attempted = answered + cannot
         
-        return {
+        progress = {
             'total': total,
             'answered': answered,
             'cannot_answer': cannot,
@@ -461,19 +218,29 @@ class InterviewState:
             'remaining': total - attempted,
             'is_complete': attempted >= total  # ✅ DETERMINISTIC COMPLETION
         }
+        self._progress_cache = (self._epoch, progress)
+        return progress
     
     def get_remaining_questions(self) -> List[str]:
         """Get list of questions still to ask"""
-        remaining = []
-        for issue in self.all_issues:
-            field = issue['field']
-            if field not in self.gathered_info and field not in self.cannot_answer:
-                remaining.append(field)
-        return remaining
+        if not (self._remaining_cache and self._remaining_cache[0] == self._epoch):
+            remaining = tuple(
+                field for field in self.all_fields
+                if field not in self.gathered_info and field not in self.cannot_answer
+            )
+            self._remaining_cache = (self._epoch, remaining)
+        return list(self._remaining_cache[1])
 
 
 # ===== RESPONSE ANALYSIS =====
 
+# All "don't know" phrasings as one alternation, so detection is a single scan
+_DONT_KNOW_RE = re.compile(
+    r"\b(?:don'?t know|not sure|no idea|can'?t say|don'?t have|havent|haven'?t|unclear|no clue)\b"
+)
+_NUMBER_RE = re.compile(r'\d+[,.]?\d*')
+_WHITESPACE_RE = re.compile(r'\s+')
+
 def analyze_user_response(user_message: str) -> Dict[str, Any]:
     """
     Simple pattern matching to detect:
@@ -484,77 +251,77 @@ def analyze_user_response(user_message: str) -> Dict[str, Any]:
     message_lower = user_message.lower().strip()
     
     # Detect "don't know" patterns
-    dont_know_patterns = [
-        r"\bdon'?t know\b",
-        r"\bnot sure\b",
-        r"\bno idea\b",
-        r"\bcan'?t say\b",
-        r"\bdon'?t have\b",
-        r"\bhavent\b",
-        r"\bhaven'?t\b",
-        r"\bunclear\b",
-        r"\bno clue\b"
-    ]
-    
-    is_dont_know = any(re.search(pattern, message_lower) for pattern in dont_know_patterns)
+    is_dont_know = bool(_DONT_KNOW_RE.search(message_lower))
     
     # Detect if response has substance (numbers, facts)
-    has_numbers = bool(re.search(r'\d+', user_message))
-    has_substance = len(user_message.split()) > 3  # More than 3 words
-    
-    # Extract numbers if present
-    numbers = re.findall(r'\d+[,.]?\d*', user_message)
+    numbers = _NUMBER_RE.findall(user_message)
+    has_numbers = bool(numbers)
+    word_count = len(user_message.split())
+    has_substance = word_count > 3  # More than 3 words
     
     return {
         'is_dont_know': is_dont_know,
         'has_substance': has_substance,
         'has_numbers': has_numbers,
+        # One word and no figures ("ok", "sure") - nothing for the LLM to validate or extract
+        'is_trivial': word_count < 2 and not has_numbers,
         'numbers': numbers,
-        'word_count': len(user_message.split())
+        'word_count': word_count
     }
 
 
-async def validate_answer_relevance(
-    user_message: str,
-    question: str,
-    field_name: str
-) -> Dict[str, Any]:
-    """
-    Validate if user's answer is actually relevant to the question asked
-    Catches random/irrelevant/joke answers
-    """
-    
-    prompt = f"""
-You are validating if a founder's answer is relevant to the question asked.
+# Validation/extraction results for repeated (field, answer) pairs - "I don't know", "around 50k"
+# and friends recur across founders, and these low-temperature calls answer them the same way.
+# The question is left out of the key on purpose: it is the last (generated) assistant message,
+# which is worded differently every time, while the field pins down what was asked.
+_ANSWER_CACHE_SIZE = 4096
+_ANSWER_CACHE_TTL_SECONDS = 3600
+_ANSWER_CACHE_MAX_TEMPERATURE = 0.2  # Above this the call isn't deterministic enough to reuse
+_answer_cache: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (result, stored_at)
 
-QUESTION ASKED: "{question}"
-FIELD: {field_name}
-FOUNDER'S ANSWER: "{user_message}"
+def _answer_cache_key(task: str, field: str, user_message: str) -> str:
+    normalized = _WHITESPACE_RE.sub(' ', user_message.lower().strip())
+    return hashlib.sha256(f"{task}|{field}|{normalized}".encode()).hexdigest()
+
+def _answer_cache_get(key: str) -> Optional[Dict[str, Any]]:
+    cached = _answer_cache.get(key)
+    if cached is None:
+        return None
+    if time.monotonic() - cached[1] >= _ANSWER_CACHE_TTL_SECONDS:
+        del _answer_cache[key]
+        return None
+    _answer_cache.move_to_end(key)
+    return dict(cached[0])
+
+def _answer_cache_put(key: str, result: Dict[str, Any], params: Dict[str, Any]):
+    if params.get('temperature', 1.0) > _ANSWER_CACHE_MAX_TEMPERATURE:
+        return
+    _answer_cache[key] = (result, time.monotonic())
+    if len(_answer_cache) > _ANSWER_CACHE_SIZE:
+        _answer_cache.popitem(last=False)
+
+
+_VALIDATION_INSTRUCTIONS = """
+You are validating if a founder's answer is relevant to the question asked.
 
 Determine if the answer is:
 1. ON-TOPIC and relevant to the question
 2. OFF-TOPIC, random, joke, or irrelevant
 
-Return JSON:
-{{
-    "is_relevant": true/false,
-    "reason": "brief explanation",
-    "is_joke": true/false,
-    "is_offtopic": true/false
-}}
+Give a brief explanation in "reason".
 
 Examples:
 Q: "What is your monthly revenue?"
-A: "Around $50k per month" → {{"is_relevant": true, "reason": "Direct answer with numbers", "is_joke": false, "is_offtopic": false}}
+A: "Around $50k per month" → {"is_relevant": true, "reason": "Direct answer with numbers", "is_joke": false, "is_offtopic": false}
 
-Q: "What is your monthly revenue?"  
-A: "The sky is blue and cats are cool" → {{"is_relevant": false, "reason": "Completely unrelated", "is_joke": false, "is_offtopic": true}}
+Q: "What is your monthly revenue?"
+A: "The sky is blue and cats are cool" → {"is_relevant": false, "reason": "Completely unrelated", "is_joke": false, "is_offtopic": true}
 
 Q: "How many employees do you have?"
-A: "lol idk probably like a million" → {{"is_relevant": false, "reason": "Joke/sarcastic answer", "is_joke": true, "is_offtopic": false}}
+A: "lol idk probably like a million" → {"is_relevant": false, "reason": "Joke/sarcastic answer", "is_joke": true, "is_offtopic": false}
 
 Q: "What is your customer acquisition cost?"
-A: "I'm hungry, let's talk about pizza" → {{"is_relevant": false, "reason": "Off-topic, avoiding question", "is_joke": false, "is_offtopic": true}}
+A: "I'm hungry, let's talk about pizza" → {"is_relevant": false, "reason": "Off-topic, avoiding question", "is_joke": false, "is_offtopic": true}
 
 Be strict. Mark as irrelevant if:
 - Joke/sarcastic
@@ -562,97 +329,182 @@ Be strict. Mark as irrelevant if:
 - Deliberately avoiding the question
 - Nonsense/gibberish
 """
+
+_EXTRACTION_INSTRUCTIONS = """
+You are analyzing a founder's response to extract specific information.
+
+Extract ONLY if the answer contains specific, concrete information.
+
+Rules:
+- has_answer = true ONLY if specific data provided (numbers, names, facts)
+- has_answer = false if vague, uncertain, or no clear answer
+- value = null if has_answer is false
+- confidence high = very specific answer
+- confidence medium = somewhat specific
+- confidence low = vague but something mentioned
+
+Examples:
+"We have 5 engineers" → {"has_answer": true, "value": "5 engineers", "confidence": "high"}
+"Maybe around 10-15 people" → {"has_answer": true, "value": "10-15 people", "confidence": "medium"}
+"We're still figuring it out" → {"has_answer": false, "value": null, "confidence": "low"}
+"I don't know" → {"has_answer": false, "value": null, "confidence": "low"}
+"""
+# One call answers both questions: the extraction is simply ignored if the answer is irrelevant
+_ANALYSIS_INSTRUCTIONS = (
+    "You are checking a founder's answer and return two results together.\n\n"
+    "=== \"relevance\" ===" + _VALIDATION_INSTRUCTIONS
+    + "\n=== \"extracted\" ===" + _EXTRACTION_INSTRUCTIONS
+)
+_ANALYSIS_PARAMS = dict(
+    temperature=0.1,
+    response_mime_type="application/json",
+    response_schema=AnswerAnalysis,
+    max_output_tokens=384,
+    thinking_config=_NO_THINKING
+)
+
+
+async def analyze_answer(
+    user_message: str,
+    question: str,
+    field_name: str
+) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+    """
+    Check whether the answer is relevant to the question (catches random/joke answers) and
+    extract the concrete information it contains, in a single structured call.
+    Returns (validation, extracted); extracted is None if the call failed.
+    """
+    
+    prompt = f"""
+QUESTION ASKED: "{question}"
+FIELD: {field_name}
+FOUNDER'S ANSWER: "{user_message}"
+"""
+    
+    cache_key = _answer_cache_key("analyze", field_name, user_message)
+    cached = _answer_cache_get(cache_key)
+    if cached is not None:
+        return cached['relevance'], cached['extracted']
     
     try:
-        response = client.models.generate_content(
-            model='gemini-2.5-flash',
+        response = await _call_gemini(
+            model=INTERVIEW_MODEL,
             contents=prompt,
-            config=GenerateContentConfig(
-                temperature=0.1,
-                response_mime_type="application/json",
-                max_output_tokens=5000
-            )
+            config=await _task_config("interview-analysis", _ANALYSIS_INSTRUCTIONS, _ANALYSIS_PARAMS)
         )
         
-        if response and hasattr(response, 'text') and response.text:
-            result = json.loads(response.text.strip())
-            return result
+        # response_schema: the SDK hands back a validated AnswerAnalysis, or None if the output didn't conform
+        if response is not None and response.parsed is not None:
+            result = response.parsed.model_dump()
+            _answer_cache_put(cache_key, result, _ANALYSIS_PARAMS)
+            return result['relevance'], result['extracted']
+        logger.error("❌ Answer analysis error: response did not match schema")
     except Exception as e:
-        print(f"❌ Validation error: {e}")
+        logger.error("❌ Answer analysis error: %s", e)
     
-    # Default to relevant if validation fails (benefit of doubt)
+    # Default to relevant if analysis fails (benefit of doubt); nothing extracted
     return {
         "is_relevant": True,
         "reason": "validation_failed",
         "is_joke": False,
         "is_offtopic": False
-    }
+    }, None
 
 
-async def extract_info_from_response(
-    user_message: str,
-    current_field: str,
-    question: str
-) -> Optional[Dict[str, Any]]:
-    """
-    Use LLM to extract specific info from user response
-    Only called if response seems to have substance
-    """
-    
-    prompt = f"""
-You are analyzing a founder's response to extract specific information.
+# ===== CONVERSATIONAL AI =====
 
-QUESTION ASKED: "{question}"
-FIELD NAME: {current_field}
-FOUNDER'S ANSWER: "{user_message}"
+_CONVERSATION_INSTRUCTIONS = """
+You are Sarah, a friendly investment analyst having a natural conversation with a founder about their company.
+Each turn gives you the founder, the company, progress so far, their latest message, the next question to ask
+and the recent conversation.
 
-Extract ONLY if the answer contains specific, concrete information.
+YOUR TASK:
+1. Briefly acknowledge their answer (1 sentence, be natural)
+2. Smoothly transition to the next question
+3. Ask the NEXT QUESTION TO ASK
 
-Return JSON:
-{{
-    "has_answer": true/false,
-    "value": "extracted specific value or null",
-    "confidence": "high/medium/low"
-}}
+RULES:
+1. Be warm, conversational, human-like
+2. Acknowledge their answer briefly (1 sentence, be natural)
+3. THEN ASK THE NEXT QUESTION (required!)
+4. If they said "don't know", acknowledge kindly and move on
+5. If their answer was off-topic or irrelevant:
+   - Gently redirect: "That's interesting, but let me ask about [topic]..."
+   - Don't be rude, stay friendly
+6. One question at a time, 40-80 words total
+7. Make it feel like coffee chat, not interrogation
+8. MUST end with asking the next question
+"""
+_CONVERSATION_PARAMS = dict(temperature=0.8, max_output_tokens=200, thinking_config=_NO_THINKING)  # 80 words ≈ 120 tokens
+# Closing is a single paragraph; a blank line means the model has started rambling
+_CLOSING_PARAMS = dict(_CONVERSATION_PARAMS, stop_sequences=["\n\n"])
+
+INTERVIEW_RECENT_MESSAGES = 4   # Last 2 exchanges always go in verbatim
+INTERVIEW_SUMMARY_EVERY = 10    # Fold older messages into the summary once 5 turns have piled up
+SUMMARY_MODEL = 'gemini-2.5-flash-lite'
+
+def _transcript(messages: List[Dict[str, str]]) -> str:
+    lines = []
+    previous = None
+    for m in messages:
+        # Drop verbatim repeats (double-submitted messages) - they add tokens, not context
+        if (m['role'], m['message']) == previous:
+            continue
+        previous = (m['role'], m['message'])
+        lines.append(f"{'Analyst' if m['role'] == 'assistant' else 'Founder'}: {m['message']}")
+    return "\n".join(lines)
+
+def _format_recent_history(chat_history: List[Dict[str, str]], running_summary: str = "") -> str:
+    """Running summary of the older interview plus the last few messages as an Analyst/Founder transcript"""
+    recent = _transcript(chat_history[-INTERVIEW_RECENT_MESSAGES:])
+    if not running_summary:
+        return recent
+    return f"EARLIER (summary): {running_summary}\n\nRECENT:\n{recent}"
+
+async def _summarize_history(running_summary: str, messages: List[Dict[str, str]]) -> Optional[str]:
+    """Fold messages into the running summary with a small flash-lite call"""
+    prompt = f"""
+Update the running summary of an investor interview with a founder.
+Keep every concrete fact or figure the founder gave and anything they could not answer.
+At most 120 words, plain prose.
 
-Rules:
-- has_answer = true ONLY if specific data provided (numbers, names, facts)
-- has_answer = false if vague, uncertain, or no clear answer
-- value = null if has_answer is false
-- confidence high = very specific answer
-- confidence medium = somewhat specific
-- confidence low = vague but something mentioned
+CURRENT SUMMARY: {running_summary or "(none yet)"}
 
-Examples:
-"We have 5 engineers" → {{"has_answer": true, "value": "5 engineers", "confidence": "high"}}
-"Maybe around 10-15 people" → {{"has_answer": true, "value": "10-15 people", "confidence": "medium"}}
-"We're still figuring it out" → {{"has_answer": false, "value": null, "confidence": "low"}}
-"I don't know" → {{"has_answer": false, "value": null, "confidence": "low"}}
+NEW MESSAGES:
+{_transcript(messages)}
+
+Updated summary:
 """
-    
     try:
-        response = client.models.generate_content(
-            model='gemini-2.5-flash',
+        response = await _call_gemini(
+            model=SUMMARY_MODEL,
             contents=prompt,
-            config=GenerateContentConfig(
-                temperature=0.1,
-                response_mime_type="application/json",
-                max_output_tokens=5000
-            )
+            config=GenerateContentConfig(temperature=0.1, max_output_tokens=256)
         )
-        
-        if response and hasattr(response, 'text') and response.text:
-            result = json.loads(response.text.strip())
-            return result
+        if response and response.text:
+            return response.text.strip()
     except Exception as e:
-        print(f"❌ Extraction error: {e}")
-    
+        logger.error("❌ Summary error: %s", e)
     return None
 
+CLOSING_TEMPLATES = [
+    "Thank you so much for your time, {founder}! We've gathered excellent insights about {company}. "
+    "I'll update our investment memo and get back to you within 2-3 weeks. Best of luck!",
+    "That's everything we needed, {founder} - thank you for walking us through {company} so openly. "
+    "We'll fold your answers into our investment memo and be in touch within 2-3 weeks. Best of luck!",
+    "Thanks, {founder}! This has given us a much clearer picture of {company}. "
+    "Our team will update the investment memo and get back to you within 2-3 weeks. Wishing you all the best!",
+]
 
-# ===== CONVERSATIONAL AI =====
+def closing_message(founder_name: str, company_name: str) -> str:
+    # crc32 rather than hash(): str hashes are salted per process, so the closing would change across restarts
+    template = CLOSING_TEMPLATES[zlib.crc32(company_name.encode()) % len(CLOSING_TEMPLATES)]
+    return template.format(founder=founder_name, company=company_name)
 
-async def generate_conversational_response(
+REPLY_FLUSH_CHARS = 320  # ~80 tokens: flush a partial sentence rather than hold it back any longer
+_SENTENCE_END_RE = re.compile(r'[.?!]\s*$')
+
+async def stream_conversational_response(
     state: InterviewState,
     user_message: str,
     next_question: Optional[Dict[str, Any]],
@@ -661,11 +513,16 @@ async def generate_conversational_response(
     founder_name: str,
     chat_history: List[Dict[str, str]],
     was_irrelevant: bool = False
-) -> str:
+) -> AsyncIterator[str]:
     """
-    Generate natural conversational response
+    Generate natural conversational response, yielded a sentence at a time as Gemini streams it
     """
     
+    if is_closing and settings.USE_TEMPLATE_CLOSING:
+        # The closing carries no information the model adds value to - skip the round trip
+        yield closing_message(founder_name, company_name)
+        return
+    
     progress = state.get_progress()
     
     if is_closing:
@@ -691,11 +548,7 @@ Closing message:
         category = next_question.get('category', 'General') if next_question else 'General'
         ask_count = next_question.get('ask_count', 0) if next_question else 0
         
-        recent_history = chat_history[-6:] if len(chat_history) > 6 else chat_history
-        conversation_context = "\n".join([
-            f"{'Analyst' if m['role'] == 'assistant' else 'Founder'}: {m['message']}"
-            for m in recent_history
-        ])
+        conversation_context = _format_recent_history(chat_history, state.running_summary)
         
         # Add context if this is a re-ask
         reask_context = ""
@@ -705,8 +558,8 @@ Closing message:
             reask_context = f"\nNOTE: This is attempt #{ask_count + 1} for this question. Be patient but direct."
         
         prompt = f"""
-You are Sarah, a friendly investment analyst having a natural conversation with {founder_name} about {company_name}.
-
+FOUNDER: {founder_name}
+COMPANY: {company_name}
 PROGRESS: {progress['answered']} answered, {progress['remaining']} remaining
 FOUNDER'S LATEST: "{user_message}"
 NEXT QUESTION TO ASK: "{next_q_text}"
@@ -715,75 +568,231 @@ CATEGORY: {category}{reask_context}
 RECENT CONVERSATION:
 {conversation_context}
 
-YOUR TASK:
-1. Briefly acknowledge their answer (1 sentence, be natural)
-2. Smoothly transition to the next question
-3. Ask: "{next_q_text}"
-
-RULES:
-1. Be warm, conversational, human-like
-2. Acknowledge their answer briefly (1 sentence, be natural)
-3. THEN ASK THE NEXT QUESTION (required!)
-4. If they said "don't know", acknowledge kindly and move on
-5. If their answer was off-topic or irrelevant:
-   - Gently redirect: "That's interesting, but let me ask about [topic]..."
-   - Don't be rude, stay friendly
-6. One question at a time, 40-80 words total
-7. Make it feel like coffee chat, not interrogation
-8. MUST end with asking the next question
-
 Response (acknowledgment + next question):
 """
     
+    emitted = ""
     try:
-        response = client.models.generate_content(
-            model='gemini-2.5-flash',
-            contents=prompt,
-            config=GenerateContentConfig(
-                temperature=0.8,
-                max_output_tokens=5000
+        if is_closing:
+            config = GenerateContentConfig(**_CLOSING_PARAMS)
+        else:
+            config = await _task_config("interview-conversation", _CONVERSATION_INSTRUCTIONS, _CONVERSATION_PARAMS)
+        # The slot is held for the whole stream - it is one in-flight request until the last chunk
+        await _gemini_rate_limiter.acquire()
+        async with _gemini_slots:
+            stream = await client.aio.models.generate_content_stream(
+                model=INTERVIEW_MODEL,
+                contents=prompt,
+                config=config
             )
-        )
-        
-        if response and hasattr(response, 'text') and response.text:
-            ai_message = response.text.strip()
             
-            # Ensure question mark if not closing
-            if not is_closing and not ai_message.endswith('?'):
-                ai_message += '?'
-            
-            return ai_message
+            # Buffer to sentence boundaries so the client never renders half a word
+            buffer = ""
+            async for chunk in stream:
+                if not chunk.text:
+                    continue
+                buffer += chunk.text
+                if _SENTENCE_END_RE.search(buffer) or len(buffer) >= REPLY_FLUSH_CHARS:
+                    text = buffer if emitted else buffer.lstrip()
+                    buffer = ""
+                    if not is_closing:
+                        # Hold back trailing '.'/'!' - if this is the last sentence they become '?'
+                        body = text.rstrip(' .!')
+                        buffer, text = text[len(body):], body
+                    if text:
+                        emitted += text
+                        yield text
+        if not is_closing:
+            buffer = buffer.rstrip(' .!')
+        if buffer.strip():
+            text = buffer if emitted else buffer.lstrip()
+            emitted += text
+            yield text
     except Exception as e:
-        print(f"❌ Conversation error: {e}")
+        logger.error("❌ Conversation error: %s", e)
+    
+    if emitted.strip():
+        # Ensure question mark if not closing
+        if not is_closing and not emitted.endswith('?'):
+            yield '?'
+        return
     
     # Fallback
     if is_closing:
-        return f"Thank you so much for your time, {founder_name}! I'll update our investment memo and get back to you within 2-3 weeks. Best of luck with {company_name}!"
+        yield closing_message(founder_name, company_name)
     else:
         next_q = next_question['question'] if next_question else "What else can you tell me?"
-        return f"Thanks for sharing! {next_q}"
+        yield f"Thanks for sharing! {next_q}"
+
+
+# ===== FUSED TURN (validate + extract + reply in one call) =====
+
+_TURN_INSTRUCTIONS = """
+You are Sarah, a friendly investment analyst interviewing a founder about their company.
+Each turn you get the question that was asked, the founder's answer, and two candidate follow-up
+questions. Do three things in one JSON response:
+
+1. relevance - is the answer ON-TOPIC for the question asked, or OFF-TOPIC/random/joke/evasive?
+   Be strict. Mark as irrelevant if it is a joke or sarcastic, random and unrelated, deliberately
+   avoiding the question, or nonsense/gibberish.
+   Examples:
+   Q: "What is your monthly revenue?" A: "Around $50k per month" -> relevant
+   Q: "What is your monthly revenue?" A: "The sky is blue and cats are cool" -> off-topic
+   Q: "How many employees do you have?" A: "lol idk probably like a million" -> joke
+
+2. extracted - ONLY if the answer is relevant and contains specific, concrete information:
+   - has_answer = true ONLY if specific data provided (numbers, names, facts)
+   - has_answer = false if vague, uncertain, irrelevant or no clear answer; value = null then
+   - confidence high = very specific, medium = somewhat specific, low = vague
+   Examples:
+   "We have 5 engineers" -> has_answer true, value "5 engineers", confidence high
+   "Maybe around 10-15 people" -> has_answer true, value "10-15 people", confidence medium
+   "We're still figuring it out" -> has_answer false, value null, confidence low
+
+3. reply - your next message to the founder (40-80 words):
+   - If the answer was relevant: briefly acknowledge it (1 sentence, be natural), then ask
+     IF RELEVANT, ASK NEXT word for word.
+   - If it was not relevant: gently redirect ("That's interesting, but let me ask about...")
+     without being rude, then ask IF NOT RELEVANT, ASK NEXT word for word.
+   - Warm, conversational, human-like - a coffee chat, not an interrogation.
+   - One question at a time, and the reply MUST end with that question.
+"""
+_TURN_PARAMS = dict(
+    temperature=0.4,
+    response_mime_type="application/json",
+    response_schema=InterviewTurn,
+    max_output_tokens=512,
+    thinking_config=_NO_THINKING
+)
+
+def _question_line(question: Dict[str, Any]) -> str:
+    line = f"\"{question['question']}\" (category: {question.get('category', 'General')})"
+    if question.get('ask_count', 0) > 0:
+        line += f" - attempt #{question['ask_count'] + 1}, be patient but direct"
+    return line
+
+async def analyze_and_reply(
+    state: InterviewState,
+    user_message: str,
+    current_field: str,
+    last_question: str,
+    next_question: Dict[str, Any],
+    retry_question: Dict[str, Any],
+    company_name: str,
+    founder_name: str,
+    chat_history: List[Dict[str, str]]
+) -> Optional[InterviewTurn]:
+    """
+    One Gemini call that does the work of validate_answer_relevance, extract_info_from_response
+    and stream_conversational_response. The reply depends on the relevance verdict, so the
+    caller passes the follow-up question for both outcomes and the model picks accordingly.
+    Returns None on failure so the caller can fall back to the separate calls.
+    """
+    progress = state.get_progress()
+    
+    prompt = f"""
+FOUNDER: {founder_name}
+COMPANY: {company_name}
+PROGRESS: {progress['answered']} answered, {progress['remaining']} remaining
+
+QUESTION ASKED: "{last_question}"
+FIELD: {current_field}
+FOUNDER'S ANSWER: "{user_message}"
+
+IF RELEVANT, ASK NEXT: {_question_line(next_question)}
+IF NOT RELEVANT, ASK NEXT: {_question_line(retry_question)}
+
+RECENT CONVERSATION:
+{_format_recent_history(chat_history, state.running_summary)}
+"""
+    
+    try:
+        response = await _call_gemini(
+            model=INTERVIEW_MODEL,
+            contents=prompt,
+            config=await _task_config("interview-turn", _TURN_INSTRUCTIONS, _TURN_PARAMS)
+        )
+        
+        if response and hasattr(response, 'text') and response.text:
+            return InterviewTurn.model_validate_json(response.text.strip())
+    except Exception as e:
+        logger.error("❌ Fused turn error: %s", e)
+    
+    return None
 
 
 # ===== MAIN CHAT FUNCTION =====
 
-async def chat_with_founder(
+def _turn_result(state: InterviewState, message: str, progress: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "message": message,
+        "is_complete": progress['is_complete'],
+        "progress": progress,
+        "gathered_info": state.gathered_info,
+        "cannot_answer_fields": list(state.cannot_answer),
+        "asked_questions": list(state.asked_questions),
+        "ask_count": state.ask_count,
+        "running_summary": state.running_summary,
+        "summarized_upto": state.summarized_upto,
+        "last_asked_field": state.last_asked_field
+    }
+
+
+def _start_summary_refresh(state: InterviewState, chat_history: List[Dict[str, str]]) -> Optional[asyncio.Task]:
+    """Summarize older messages in the background while the turn runs (None if not due yet)"""
+    cutoff = len(chat_history) - INTERVIEW_RECENT_MESSAGES
+    if cutoff - state.summarized_upto < INTERVIEW_SUMMARY_EVERY:
+        return None
+    
+    async def refresh():
+        summary = await _summarize_history(state.running_summary, chat_history[state.summarized_upto:cutoff])
+        if summary:
+            state.running_summary = summary
+            state.summarized_upto = cutoff
+    
+    return asyncio.create_task(refresh())
+
+
+async def stream_chat_with_founder(
     interview_data: Dict[str, Any],
     user_message: str,
     chat_history: List[Dict[str, str]]
-) -> Dict[str, Any]:
+) -> AsyncIterator[Dict[str, Any]]:
     """
     Main interview chat function - RELIABLE & PREDICTABLE
     
+    Yields {"type": "delta", "text": ...} events as the reply is generated, then a single
+    {"type": "result", "result": ...} event with the full message and updated interview state.
+    
     Features:
     - Never repeats questions
     - Deterministic completion (pure math)
     - Validates answer relevance
     - Re-asks up to 2 times for irrelevant answers
     - No LLM control over completion
+    - Prompt history stays O(1): running summary + last 2 exchanges
     """
     
     # Initialize state
     state = InterviewState(interview_data)
+    summary_refresh = _start_summary_refresh(state, chat_history)
+    
+    async for event in _run_turn(state, interview_data, user_message, chat_history):
+        if event["type"] == "result" and summary_refresh:
+            # Usually finished long before the reply; persist whatever it produced
+            await summary_refresh
+            event["result"]["running_summary"] = state.running_summary
+            event["result"]["summarized_upto"] = state.summarized_upto
+        yield event
+
+
+async def _run_turn(
+    state: InterviewState,
+    interview_data: Dict[str, Any],
+    user_message: str,
+    chat_history: List[Dict[str, str]]
+) -> AsyncIterator[Dict[str, Any]]:
+    """One interview turn for stream_chat_with_founder (same events)"""
     
     company_name = interview_data.get('company_name', 'your startup')
     founder_name = interview_data.get('founder_name', 'Founder')
@@ -791,21 +800,24 @@ async def chat_with_founder(
     # Get progress
     progress = state.get_progress()
     
-    print(f"\n{'='*60}")
-    print(f"📊 INTERVIEW STATE")
-    print(f"{'='*60}")
-    print(f"Total questions: {progress['total']}")
-    print(f"Answered: {progress['answered']}")
-    print(f"Cannot answer: {progress['cannot_answer']}")
-    print(f"Attempted: {progress['attempted']}/{progress['total']}")
-    print(f"Remaining: {progress['remaining']}")
-    print(f"Complete: {progress['is_complete']}")
+    logger.debug(
+        "📊 Interview state: answered=%s cannot_answer=%s attempted=%s/%s remaining=%s complete=%s",
+        progress['answered'], progress['cannot_answer'], progress['attempted'], progress['total'],
+        progress['remaining'], progress['is_complete']
+    )
     
     # If complete, send closing message
     if progress['is_complete']:
-        print("✅ Interview complete - sending closing message")
+        logger.info("✅ Interview complete - sending closing message")
         
-        closing_message = await generate_conversational_response(
+        if settings.USE_TEMPLATE_CLOSING:
+            ai_message = closing_message(founder_name, company_name)
+            yield {"type": "delta", "text": ai_message}
+            yield {"type": "result", "result": _turn_result(state, ai_message, progress)}
+            return
+        
+        chunks = []
+        async for chunk in stream_conversational_response(
             state=state,
             user_message=user_message,
             next_question=None,
@@ -813,25 +825,20 @@ async def chat_with_founder(
             company_name=company_name,
             founder_name=founder_name,
             chat_history=chat_history
-        )
+        ):
+            chunks.append(chunk)
+            yield {"type": "delta", "text": chunk}
         
-        return {
-            "message": closing_message,
-            "is_complete": True,
-            "progress": progress,
-            "gathered_info": state.gathered_info,
-            "cannot_answer_fields": list(state.cannot_answer),
-            "asked_questions": list(state.asked_questions),
-            "ask_count": state.ask_count
-        }
+        yield {"type": "result", "result": _turn_result(state, "".join(chunks).strip(), progress)}
+        return
     
     # Analyze user's latest response
     response_analysis = analyze_user_response(user_message)
     
-    print(f"\n📝 USER RESPONSE ANALYSIS")
-    print(f"Don't know: {response_analysis['is_dont_know']}")
-    print(f"Has substance: {response_analysis['has_substance']}")
-    print(f"Has numbers: {response_analysis['has_numbers']}")
+    logger.debug(
+        "📝 User response: dont_know=%s substance=%s numbers=%s",
+        response_analysis['is_dont_know'], response_analysis['has_substance'], response_analysis['has_numbers']
+    )
     
     # Get the LAST question we asked (from chat history)
     last_assistant_message = None
@@ -840,45 +847,115 @@ async def chat_with_founder(
             last_assistant_message = msg['message']
             break
     
-    # Try to find which field we were asking about
-    current_field = None
-    for issue in state.all_issues:
-        # Simple heuristic: if question text is in last assistant message
-        if last_assistant_message and issue['question'].lower() in last_assistant_message.lower():
-            current_field = issue['field']
-            break
+    # Which field we were asking about
+    current_field = state.field_for_question(last_assistant_message)
     
     # Track if answer was irrelevant (for conversational response)
     was_irrelevant = False
+    # "Don't know" / one-word answers get a templated reply instead of a Gemini call
+    use_template = False
+    
+    # Fused path: when the answer needs checking, validate + extract + reply in one call
+    if current_field and not response_analysis['is_dont_know'] and not response_analysis['is_trivial']:
+        # Follow-up if the field gets resolved (answered, too vague, or irrelevant a 2nd time)...
+        resolved_next = state.peek_next_question(skip=current_field)
+        # ...and if an irrelevant first attempt leaves it open for a re-ask
+        retry_next = state.peek_next_question() if state.get_ask_count(current_field) == 0 else resolved_next
+        
+        # Closing needs its own message, so only fuse when both outcomes lead to another question
+        turn = None
+        if resolved_next:
+            turn = await analyze_and_reply(
+                state=state,
+                user_message=user_message,
+                current_field=current_field,
+                last_question=last_assistant_message or "",
+                next_question=resolved_next,
+                retry_question=retry_next,
+                company_name=company_name,
+                founder_name=founder_name,
+                chat_history=chat_history
+            )
+        
+        if turn:
+            logger.debug("🎯 Processing answer for %s (fused): relevant=%s (%s)",
+                         current_field, turn.relevance.is_relevant, turn.relevance.reason)
+            
+            if not turn.relevance.is_relevant:
+                was_irrelevant = True
+                ask_count = state.get_ask_count(current_field)
+                state.mark_question_asked(current_field)
+                if ask_count >= 1:  # This was the 2nd attempt
+                    state.mark_cannot_answer(current_field)
+                    logger.debug("   → Asked twice, marking as 'cannot answer'")
+            elif turn.extracted.has_answer:
+                state.add_answer(
+                    field=current_field,
+                    value=turn.extracted.value,
+                    confidence=turn.extracted.confidence or 'medium'
+                )
+                logger.debug("   ✅ Extracted: %s (confidence: %s)", turn.extracted.value, turn.extracted.confidence)
+            else:
+                state.mark_cannot_answer(current_field)
+                logger.debug("   → Too vague, marked as 'cannot answer'")
+            
+            state.retire_exhausted_fields()
+            next_question = state.peek_next_question()
+            state.last_asked_field = next_question['field'] if next_question else None
+            if next_question and not was_irrelevant:
+                state.mark_question_asked(next_question['field'])
+            
+            progress = state.get_progress()
+            ai_message = turn.reply.strip().rstrip(' .!')
+            if not ai_message.endswith('?'):
+                ai_message += '?'
+            
+            logger.debug("💬 AI response: %.100s", ai_message)
+            
+            # The fused reply arrives as one JSON field, so it goes out as a single delta
+            yield {"type": "delta", "text": ai_message}
+            yield {"type": "result", "result": _turn_result(state, ai_message, progress)}
+            return
     
     # Process response
     if current_field:
-        print(f"🎯 Processing answer for: {current_field}")
+        logger.debug("🎯 Processing answer for %s", current_field)
         
         if response_analysis['is_dont_know']:
             # Mark as cannot answer
             state.mark_cannot_answer(current_field)
-            print(f"   → Marked as 'cannot answer'")
+            use_template = True
+            logger.debug("   → Marked as 'cannot answer'")
         
-        elif response_analysis['has_substance']:
-            # Validate if answer is relevant
-            validation = await validate_answer_relevance(
+        elif response_analysis['is_trivial']:
+            # One-word answer: treat like an irrelevant one and re-ask (once)
+            was_irrelevant = True
+            use_template = True
+            ask_count = state.get_ask_count(current_field)
+            state.mark_question_asked(current_field)
+            if ask_count >= 1:  # This was the 2nd attempt
+                state.mark_cannot_answer(current_field)
+                logger.debug("   → Too short twice, marking as 'cannot answer'")
+        
+        else:
+            # Validate relevance and extract info in one call; the extraction is ignored if irrelevant
+            validation, extracted = await analyze_answer(
                 user_message=user_message,
                 question=last_assistant_message or "",
                 field_name=current_field
             )
             
-            print(f"   🔍 Relevance check:")
-            print(f"      - Relevant: {validation['is_relevant']}")
-            print(f"      - Reason: {validation.get('reason', 'N/A')}")
-            print(f"      - Is joke: {validation.get('is_joke', False)}")
-            print(f"      - Off-topic: {validation.get('is_offtopic', False)}")
+            logger.debug(
+                "   🔍 Relevance: relevant=%s joke=%s off_topic=%s (%s)",
+                validation['is_relevant'], validation.get('is_joke', False),
+                validation.get('is_offtopic', False), validation.get('reason', 'N/A')
+            )
             
             if not validation['is_relevant']:
                 # Answer is irrelevant/joke/off-topic
                 was_irrelevant = True
                 ask_count = state.get_ask_count(current_field)
-                print(f"   ⚠️ Irrelevant answer (asked {ask_count} times)")
+                logger.debug("   ⚠️ Irrelevant answer (asked %d times)", ask_count)
                 
                 # Mark as asked to increment count
                 state.mark_question_asked(current_field)
@@ -886,57 +963,60 @@ async def chat_with_founder(
                 # If asked twice already, mark as cannot answer
                 if ask_count >= 1:  # This was the 2nd attempt
                     state.mark_cannot_answer(current_field)
-                    print(f"   → Asked twice, marking as 'cannot answer'")
+                    logger.debug("   → Asked twice, marking as 'cannot answer'")
                 
             else:
-                # Answer is relevant - try to extract info
-                extracted = await extract_info_from_response(
-                    user_message=user_message,
-                    current_field=current_field,
-                    question=last_assistant_message or ""
-                )
-                
+                # Answer is relevant - use the extracted info
                 if extracted and extracted.get('has_answer'):
                     state.add_answer(
                         field=current_field,
                         value=extracted.get('value'),
                         confidence=extracted.get('confidence', 'medium')
                     )
-                    print(f"   ✅ Extracted: {extracted.get('value')} (confidence: {extracted.get('confidence')})")
+                    logger.debug("   ✅ Extracted: %s (confidence: %s)", extracted.get('value'), extracted.get('confidence'))
                 else:
                     # Relevant but vague answer - mark as cannot answer
                     state.mark_cannot_answer(current_field)
-                    print(f"   → Too vague, marked as 'cannot answer'")
-        
-        else:
-            # Very short answer with no substance
-            print(f"   → Too short, no substance")
-            state.mark_question_asked(current_field)
+                    logger.debug("   → Too vague, marked as 'cannot answer'")
     
     # Get next question to ask
-    next_question = state.get_next_question()
+    state.retire_exhausted_fields()
+    next_question = state.peek_next_question()
+    # The reply asks this field (a re-ask after an irrelevant answer is not marked as a new ask)
+    state.last_asked_field = next_question['field'] if next_question else None
     
     if next_question:
-        print(f"\n🔜 NEXT QUESTION: {next_question['field']}")
-        print(f"   → {next_question['question']}")
-        print(f"   → Ask count: {next_question.get('ask_count', 0)}")
+        logger.debug("🔜 Next question: %s (ask count %d)", next_question['field'], next_question.get('ask_count', 0))
         
         # Mark as asked
         if not was_irrelevant:  # Don't double-increment if already marked
             state.mark_question_asked(next_question['field'])
     else:
-        print(f"\n✅ No more questions to ask")
+        logger.debug("✅ No more questions to ask")
     
     # Check if we're done now
     progress = state.get_progress()
     is_closing = progress['is_complete']
     
-    print(f"\n📊 UPDATED PROGRESS:")
-    print(f"   Attempted: {progress['attempted']}/{progress['total']}")
-    print(f"   Closing: {is_closing}")
+    logger.debug("📊 Updated progress: attempted=%s/%s closing=%s", progress['attempted'], progress['total'], is_closing)
+    
+    # Deterministic reply: the question text is echoed verbatim (or the closing is fixed), so no LLM is needed
+    if is_closing and settings.USE_TEMPLATE_CLOSING:
+        ai_message = closing_message(founder_name, company_name)
+    elif use_template and next_question and not is_closing:
+        prefix = "Could you say a bit more?" if next_question['field'] == current_field else "No worries —"
+        ai_message = f"{prefix} {next_question['question']}"
+    else:
+        ai_message = None
+    if ai_message:
+        logger.debug("💬 Templated response: %.100s", ai_message)
+        yield {"type": "delta", "text": ai_message}
+        yield {"type": "result", "result": _turn_result(state, ai_message, progress)}
+        return
     
     # Generate response
-    ai_message = await generate_conversational_response(
+    chunks = []
+    async for chunk in stream_conversational_response(
         state=state,
         user_message=user_message,
         next_question=next_question,
@@ -945,17 +1025,24 @@ async def chat_with_founder(
         founder_name=founder_name,
         chat_history=chat_history,
         was_irrelevant=was_irrelevant
-    )
+    ):
+        chunks.append(chunk)
+        yield {"type": "delta", "text": chunk}
+    ai_message = "".join(chunks).strip()
     
-    print(f"\n💬 AI RESPONSE: {ai_message[:100]}...")
-    print(f"{'='*60}\n")
+    logger.debug("💬 AI response: %.100s", ai_message)
     
-    return {
-        "message": ai_message,
-        "is_complete": is_closing,
-        "progress": progress,
-        "gathered_info": state.gathered_info,
-        "cannot_answer_fields": list(state.cannot_answer),
-        "asked_questions": list(state.asked_questions),
-        "ask_count": state.ask_count
-    }
+    yield {"type": "result", "result": _turn_result(state, ai_message, progress)}
+
+
+async def chat_with_founder(
+    interview_data: Dict[str, Any],
+    user_message: str,
+    chat_history: List[Dict[str, str]]
+) -> Dict[str, Any]:
+    """Non-streaming wrapper around stream_chat_with_founder: returns the final turn result"""
+    result = None
+    async for event in stream_chat_with_founder(interview_data, user_message, chat_history):
+        if event["type"] == "result":
+            result = event["result"]
+    return result
@@ -3,16 +3,17 @@ from google.cloud import firestore
 from datetime import datetime, timedelta
 import secrets
 import json
+import orjson
+import re
 from config.settings import settings
-from google import genai
 from google.genai.types import GenerateContentConfig
-
-client = genai.Client(
-    api_key=settings.GEMINI_API_KEY
-)
+from services.gemini_service import client
 
 db = firestore.Client(project=settings.GCP_PROJECT_ID)
 
+# Markdown code fence around a model's JSON reply (closing fence required, so unfenced text passes through)
+_FENCE_RE = re.compile(r'^\s*```(?:json)?\s*\n?(.*?)\n?```\s*$', re.DOTALL)
+
 def generate_interview_token() -> str:
     """Generate secure unique token for interview"""
     return secrets.token_urlsafe(32)
@@ -91,8 +92,8 @@ def identify_missing_and_shallow_fields(deal_data: Dict[str, Any]) -> Dict[str,
     sector = metadata.get('sector', 'Unknown')
     stage = metadata.get('stage', 'Unknown')
     
-    # Build memo JSON safely
-    memo_json = json.dumps(memo, indent=2)
+    # Build memo JSON safely (compact: indentation only costs prompt tokens)
+    memo_json = orjson.dumps(memo, default=str).decode()
     
     # Build prompt without raw newlines in f-string
     analysis_prompt = f"""You are an experienced VC analyst reviewing an investment memo for completeness and depth.
@@ -184,12 +185,9 @@ Only return valid JSON, nothing else:"""
         response_text = response.text.strip()
         
         # Clean up response if it has markdown code blocks
-        if response_text.startswith('```json'):
-            response_text = response_text[7:]  # Remove ```json
-        if response_text.startswith('```'):
-            response_text = response_text[3:]  # Remove ```
-        if response_text.endswith('```'):
-            response_text = response_text[:-3]  # Remove trailing ```
+        fenced = _FENCE_RE.match(response_text)
+        if fenced:
+            response_text = fenced.group(1)
         
         # response_text = response_text.strip()
         print("Final Text: ",response_text)
@@ -342,6 +340,9 @@ def create_interview(deal_id: str, founder_email: str, founder_name: str = None,
                 'interview.gathered_info': {},
                 'interview.cannot_answer_fields': [],
                 'interview.asked_questions': [],
+                'interview.last_asked_field': None,
+                'interview.running_summary': '',
+                'interview.summarized_upto': 0,
                 'interview.ask_count': {},
                 'interview.chat_history': [],  # Reset chat
                 'interview.progress': {
@@ -429,6 +430,9 @@ def create_interview(deal_id: str, founder_email: str, founder_name: str = None,
         'interview.gathered_info': {},
         'interview.cannot_answer_fields': [],
         'interview.asked_questions': [],
+        'interview.last_asked_field': None,
+        'interview.running_summary': '',
+        'interview.summarized_upto': 0,
         'interview.ask_count': {},
         'interview.progress': {
             'total': len(filtered_issues),
@@ -1,57 +1,26 @@
-import json
-from typing import Dict, Any
-from datetime import datetime
+import asyncio
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Dict, Any, List, AsyncIterator
+from datetime import datetime, timezone
 from fastapi import HTTPException
-from google import genai
-from google.genai.types import GenerateContentConfig, Tool, GoogleSearch
-from config.settings import settings
+import orjson
+from google.genai.types import GenerateContentConfig, HttpOptions, Tool, GoogleSearch
+from services.gemini_service import client, _dump_capped, _to_json
+from models.schemas import InvestmentDecisionDraft, BulkInvestmentDecisions
 
-# Initialize Google Gen AI client
-client = genai.Client(api_key=settings.GEMINI_API_KEY)
+logger = logging.getLogger(__name__)
 
-async def generate_investment_decision(
-    deal_id: str,
-    memo: Dict[str, Any],
-    extracted_text: str,
-    user_id: str
-) -> Dict[str, Any]:
-    """
-    Generate comprehensive investment decision and funding plan using Gemini AI.
-    
-    Args:
-        deal_id: Unique deal identifier
-        memo: Complete investment memo with analysis
-        extracted_text: Original pitch deck text
-        user_id: ID of the user generating the decision
-    
-    Returns:
-        Complete investment decision structure
-    """
-    try:
-        # Extract key information from memo
-        company_name = memo.get('company_overview', {}).get('name', 'Unknown')
-        sector = memo.get('company_overview', {}).get('sector', 'Unknown')
-        risk_score = memo.get('risk_metrics', {}).get('composite_risk_score', 50)
-        
-        # Get financial data
-        financials = memo.get('financials', {})
-        funding_ask = financials.get('burn_and_runway', {}).get('funding_ask', 'Not specified')
-        current_arr = financials.get('arr_mrr', {}).get('current_booked_arr', 'Not available')
-        burn_rate = financials.get('burn_and_runway', {}).get('implied_net_burn', 'Not available')
-        runway = financials.get('burn_and_runway', {}).get('stated_runway', 'Not available')
-        
-        # Get market and team data
-        market_size = memo.get('market_analysis', {}).get('industry_size_and_growth', {}).get('total_addressable_market', {}).get('value', 'Not available')
-        founders = memo.get('company_overview', {}).get('founders', [])
-        
-        prompt = f"""
+_DECISION_PERSONA = """
 You are a SENIOR INVESTOR with 15+ years backing early-stage companies. You've invested in over 50 startups with multiple successful exits. You're known for asking tough questions, spotting patterns others miss, and making clear, decisive recommendations.
 
 YOUR INVESTMENT PHILOSOPHY: Back exceptional founders solving real problems in large markets. Look for businesses that can grow 10x in value within 5-7 years.
 
-==================== COMPANY UNDER REVIEW ====================
+"""
 
-**Company:** {company_name}
+# One deal's memo/pitch context; a bulk prompt repeats this block per deal
+_DEAL_CONTEXT_TEMPLATE = """**Company:** {company_name}
 **Industry:** {sector}
 **Risk Assessment Score:** {risk_score}/100 (lower = less risky)
 **They're Asking For:** {funding_ask}
@@ -63,21 +32,26 @@ YOUR INVESTMENT PHILOSOPHY: Back exceptional founders solving real problems in l
 - Market Size: {market_size}
 
 **Our Analysis Summary:**
-{json.dumps(memo.get('conclusion', {}), indent=2)}
+{conclusion_json}
 
 **Financial Details:**
-{json.dumps(financials, indent=2)[:1500]}
+{financials_json}
 
 **Market Understanding:**
-{json.dumps(memo.get('market_analysis', {}), indent=2)[:2000]}
+{market_json}
+
+**Comparable Companies (from our research):**
+{comparables_json}
 
 **The Team:**
-{json.dumps(founders, indent=2)[:1000]}
+{founders_json}
 
 **From Their Pitch:**
-{extracted_text[:5000]}
+{pitch_excerpt}
 
-==================== HOW TO MAKE THIS DECISION ====================
+"""
+
+_DECISION_GUIDANCE_TEMPLATE = """==================== HOW TO MAKE THIS DECISION ====================
 
 ### 1. THE THREE PATHS: PROCEED, CONDITIONAL, or PASS
 
@@ -207,155 +181,27 @@ YOUR INVESTMENT PHILOSOPHY: Back exceptional founders solving real problems in l
 
 ==================== YOUR INVESTMENT DECISION ====================
 
-Write your complete decision as JSON. Make your RATIONALE read like you're explaining this to a fellow investor in plain business language - no jargon, just clear thinking:
-
-{{
-    "recommendation": "PROCEED|CONDITIONAL|PASS",
-    
-    "funding_amount_recommended": "$X.XM - [explain in one sentence: based on runway needs, milestone funding, or market standards]",
-    
-    "funding_amount_requested": "{funding_ask}",
-    
-    "rationale": "Write 3-4 clear, well-structured paragraphs explaining your investment thinking in plain business language:
-    
-    First, explain THE OPPORTUNITY - why this company, why this market, why invest now. Use specific numbers from their traction data. Compare to similar successful companies if relevant. What's their unfair advantage or unique insight that makes this compelling?
-    
-    Second, assess THE TEAM honestly - do the founders have real domain expertise? What's their track record? What concerns you about the team? What gives you confidence they can execute? Be specific about their backgrounds and any gaps that worry you.
-    
-    Third, break down THE BUSINESS CASE simply - can they make significantly more money from customers than it costs to acquire them? What's the realistic path to profitability? What could this company be worth in 5-7 years and why is that realistic?
-    
-    Finally, explain YOUR DECISION clearly - why PROCEED, CONDITIONAL, or PASS? If CONDITIONAL, which specific milestones matter most and why? If PASS, what would need to change for you to reconsider? If PROCEED, why is this opportunity better than alternatives?
-    
-    Write these as natural paragraphs without labels or section headers - just clear, flowing business reasoning.",
-    
-    "disbursement_schedule": [
-        {{
-            "tranche_number": 1,
-            "amount": "$XXXk (calculation: X months of burn at $Y/month gives them runway to [milestone])",
-            "percentage": 45.0,
-            "timing": "When deal closes and paperwork is complete",
-            "conditions": ["Legal documents finalized", "Key employment contracts signed", "Standard due diligence complete"]
-        }},
-        {{
-            "tranche_number": 2,
-            "amount": "$XXXk",
-            "percentage": 30.0,
-            "timing": "Month 6 OR when they hit revenue milestone (whichever first)",
-            "conditions": [
-                "Achieve $[X] monthly revenue from [Y] paying customers",
-                "Customer cancellation rate below 15% monthly",
-                "Making more from customers than spending to acquire them (3x ratio minimum)"
-            ]
-        }},
-        {{
-            "tranche_number": 3,
-            "amount": "$XXXk",
-            "percentage": 25.0,
-            "timing": "Month 12-15 OR ready for Series A",
-            "conditions": [
-                "$[X] in annual revenue growing 30%+ year-over-year",
-                "Product-market fit proven (customer satisfaction high, retention above 85%)",
-                "Key leadership hired (sales leader, engineering leader)"
-            ]
-        }}
-    ],
-    
-    "milestone_roadmap": [
-        {{
-            "category": "Revenue & Customer Growth",
-            "overall_timeline": "0-18 months",
-            "milestones": [
-                {{
-                    "title": "First $100k Annual Revenue",
-                    "description": "Prove the business model works - focus on REPEATABLE sales, not one-off custom deals",
-                    "timeline": "Month 4-6",
-                    "success_criteria": "$100k annual revenue from 15+ customers, average deal size $7k, customer cancellation under 10%, typical 3-month sales cycle",
-                    "priority": "High"
-                }},
-                {{
-                    "title": "Reach $500k Annual Revenue",
-                    "description": "Prove they can SCALE - this shows it's not just pilot projects anymore",
-                    "timeline": "Month 10-12",
-                    "success_criteria": "$500k annual revenue, 50+ customers, customer acquisition cost under $5k, customer value 4x+ acquisition cost, healthy 40%+ margins",
-                    "priority": "High"
-                }}
-            ]
-        }},
-        {{
-            "category": "Product & Technology",
-            "overall_timeline": "0-12 months",
-            "milestones": [
-                {{
-                    "title": "Production-Ready Platform",
-                    "description": "NOT an MVP - this means enterprise-grade quality that customers will actually pay for",
-                    "timeline": "Month 6",
-                    "success_criteria": "99.9% uptime, security certification started, documented APIs, handles 1000+ users smoothly",
-                    "priority": "High"
-                }}
-            ]
-        }},
-        {{
-            "category": "Team Building",
-            "overall_timeline": "0-12 months",
-            "milestones": [
-                {{
-                    "title": "Hire Sales Leader",
-                    "description": "CRITICAL - founders alone can't scale sales. Need proven enterprise seller.",
-                    "timeline": "Month 3-6",
-                    "success_criteria": "10+ years experience selling B2B software, has previously scaled a company from $0 to $10M revenue, strong references",
-                    "priority": "High"
-                }}
-            ]
-        }},
-        {{
-            "category": "Market Position",
-            "overall_timeline": "0-18 months",
-            "milestones": [
-                {{
-                    "title": "Strategic Partnership",
-                    "description": "De-risk customer acquisition - partner with established player for easier market access",
-                    "timeline": "Month 8-12",
-                    "success_criteria": "Signed partnership with recognized brand in their industry, generated 10+ qualified customer leads through partner",
-                    "priority": "Medium"
-                }}
-            ]
-        }}
-    ],
-    
-    "next_round_criteria": [
-        "REVENUE: $3M+ annual revenue growing 40%+ yearly (quarter-over-quarter acceleration)",
-        "BUSINESS MODEL: Customers worth 5x+ what they cost to acquire, get money back within 6 months, margins above 70%",
-        "CUSTOMERS: Keep more than 95% of customers annually, actually expanding revenue from existing customers (110%+ retention in dollars)",
-        "MARKET PROOF: 100+ customers spread across 5 different verticals (proves it's not just one niche)",
-        "TEAM: Sales leader, engineering leader, 2 account executives, 3 engineers minimum - proven they can scale the organization",
-        "MOMENTUM: Adding $100k+ in monthly revenue consistently for 6 straight months (proves it's repeatable)"
-    ],
-    
-    "red_flags": [
-        "BURN WARNING: Monthly burn up 20%+ without revenue up proportionally (burning money inefficiently)",
-        "CUSTOMER LOSS: Losing more than 3% of customers monthly OR any single customer over 15% of revenue leaves",
-        "HIRING FAIL: Can't hire sales leader within 6 months (shows wrong priorities or can't recruit)",
-        "PRODUCT DELAYS: Major features delayed 2+ months OR considering major business pivot (questions product-market fit)",
-        "FOUNDER ISSUES: Co-founder leaves OR ongoing conflicts in board meetings (team falling apart)",
-        "COMPETITION: Competitor raises $20M+ round (makes our next funding round harder)"
-    ],
-    
-    "success_metrics": {{
-        "Annual Revenue": "Target path: $100k at Month 6, $500k at Month 12, $1.5M at Month 18 (tripling yearly)",
-        "Monthly Revenue Growth": "Consistent 15%+ monthly growth compounds to huge annual numbers",
-        "Customer Acquisition Cost": "Target under $5k per customer, trending down as we optimize our approach",
-        "Customer Lifetime Value": "Target $25k+ per customer (5x what it costs), growing through upsells",
-        "Gross Profit Margin": "Target 70%+ consistently (standard for scalable software businesses)",
-        "Burn Efficiency": "For every dollar of new annual revenue, spend less than $1.50 (shows capital efficiency)",
-        "Sales Productivity": "Each dollar spent on sales & marketing should return $0.75+ in revenue quarterly (payback under 18 months)"
-    }}
-}}
+Write your complete decision as JSON; the output must conform to the provided response schema. Field guidance:
+
+- recommendation: PROCEED, CONDITIONAL or PASS.
+- funding_amount_recommended: "$X.XM - " plus one sentence on the basis (runway needs, milestone funding, or market standards).
+- funding_amount_requested: {funding_ask}
+- rationale: 3-4 natural paragraphs in plain business language, no labels or headers, like you're explaining this to a fellow investor:
+  THE OPPORTUNITY (why this company, market and timing; their traction numbers; comparable companies; their unfair advantage),
+  THE TEAM (real domain expertise, track record, gaps that worry you, what gives you confidence),
+  THE BUSINESS CASE (unit economics, realistic path to profitability, what it could be worth in 5-7 years and why),
+  YOUR DECISION (why this path; for CONDITIONAL the milestones that matter most, for PASS what would change your mind, for PROCEED why it beats the alternatives).
+- disbursement_schedule: the tranches from section 3. Each amount shows its calculation (e.g. "$XXXk: X months of burn at $Y/month to reach [milestone]"); percentages add to 100; conditions are measurable numbers.
+- milestone_roadmap: the four categories from section 4 (Revenue & Customer Growth, Product & Technology, Team Building, Market Position), each with an overall_timeline and milestones whose success_criteria are specific numbers and whose priority is High, Medium or Low.
+- next_round_criteria: Series A bars from section 5, each starting with a label (REVENUE:, BUSINESS MODEL:, CUSTOMERS:, MARKET PROOF:, TEAM:, MOMENTUM:) and stating hard numbers.
+- red_flags: warning triggers from section 6, each starting with a label (BURN WARNING:, CUSTOMER LOSS:, HIRING FAIL:, ...) and a measurable threshold.
+- success_metrics: the 5-7 monthly dashboard metrics from section 7, each with its target path (e.g. "$100k at Month 6, $500k at Month 12").
 
 ==================== CRITICAL INSTRUCTIONS ====================
 
 1. **BE SPECIFIC WITH NUMBERS**: Use actual values ($100k revenue, not "good traction")
 2. **THINK ABOUT THE EXIT**: This investment needs to return 10x+ in 5-7 years - is that realistic?
-3. **USE COMPARISONS**: Google Search comparable companies - what did they achieve at this stage?
+3. **USE COMPARISONS**: Compare with similar companies (our researched comparables, or Google Search when available) - what did they achieve at this stage?
 4. **RATIONALE = BUSINESS CONVERSATION**: Write like you're explaining to a smart friend, not writing a finance textbook
 5. **MILESTONES = PROOF POINTS**: Each milestone should PROVE something critical about whether this business works
 6. **BE HONEST**: If it's PASS, explain why respectfully. If CONDITIONAL, be clear what concerns you.
@@ -366,61 +212,251 @@ Write your complete decision as JSON. Make your RATIONALE read like you're expla
 Return ONLY valid JSON. No markdown formatting.
 """
 
+DECISION_PROMPT_TEMPLATE = (
+    _DECISION_PERSONA + "==================== COMPANY UNDER REVIEW ====================\n\n"
+    + _DEAL_CONTEXT_TEMPLATE + _DECISION_GUIDANCE_TEMPLATE
+)
+
+DECISION_MODEL = 'gemini-3-pro-preview'
+DECISION_MAX_OUTPUT_TOKENS = 8192
+DECISION_TIMEOUT_MS = 300_000  # Grounded 8K-token generations outlast the shared client's 120s default
+DECISION_MODEL_OUTPUT_LIMIT = 65536
+DECISION_BULK_SIZE = 8
+
+# Deals with at least this many researched comparables and a risk score at or under the
+# threshold are decided from the memo alone, without live Google Search
+MIN_COMPARABLES_FOR_UNGROUNDED = 3
+GROUNDING_RISK_THRESHOLD = 60
+MAX_COMPARABLES = 5
+COMPARABLE_FIELDS = ('name', 'total_funding_raised', 'funding_rounds', 'business_model', 'current_arr', 'arr_growth_rate')
+
+PROMPT_CACHE_SIZE = 128
+
+# (deal_id, memo/pitch hash) -> rendered prompt. Re-runs and "regenerate" clicks for an unchanged
+# memo skip re-serializing it, and send a byte-identical prompt (so Gemini's prefix cache can hit)
+_prompt_cache: "OrderedDict[tuple, str]" = OrderedDict()
+
+
+def _build_prompt(deal_id: str, memo: Dict[str, Any], extracted_text: str) -> str:
+    """Render DECISION_PROMPT_TEMPLATE for this memo, reusing the last rendering of an identical memo"""
+    pitch_excerpt = extracted_text[:5000]
+    digest = hashlib.sha256(
+        orjson.dumps(memo, default=str, option=orjson.OPT_SORT_KEYS) + pitch_excerpt.encode()
+    ).hexdigest()
+    key = (deal_id, digest)
+    cached = _prompt_cache.get(key)
+    if cached is not None:
+        _prompt_cache.move_to_end(key)
+        return cached
+    
+    prompt = DECISION_PROMPT_TEMPLATE.format(**_deal_fields(memo, pitch_excerpt))
+    
+    _prompt_cache[key] = prompt
+    if len(_prompt_cache) > PROMPT_CACHE_SIZE:
+        _prompt_cache.popitem(last=False)
+    return prompt
+
+
+def _comparables(memo: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """The memo's researched competitors, reduced to the fields a funding comparison uses"""
+    competitors = memo.get('market_analysis', {}).get('competitor_details') or []
+    return [
+        {k: c[k] for k in COMPARABLE_FIELDS if c.get(k)}
+        for c in competitors[:MAX_COMPARABLES] if isinstance(c, dict) and c.get('name')
+    ]
+
+
+def _needs_grounding(memo: Dict[str, Any]) -> bool:
+    """Live Google Search only for thinly researched or risky deals; it adds search round trips to every call"""
+    if len(_comparables(memo)) < MIN_COMPARABLES_FOR_UNGROUNDED:
+        return True
+    try:
+        return float(memo.get('risk_metrics', {}).get('composite_risk_score', 50)) > GROUNDING_RISK_THRESHOLD
+    except (TypeError, ValueError):
+        return True
+
+
+def _deal_fields(memo: Dict[str, Any], pitch_excerpt: str) -> Dict[str, Any]:
+    """Format fields for _DEAL_CONTEXT_TEMPLATE / _DECISION_GUIDANCE_TEMPLATE from one memo"""
+    overview = memo.get('company_overview', {})
+    financials = memo.get('financials', {})
+    burn_and_runway = financials.get('burn_and_runway', {})
+    comparables = _comparables(memo)
+    return dict(
+        company_name=overview.get('name', 'Unknown'),
+        sector=overview.get('sector', 'Unknown'),
+        risk_score=memo.get('risk_metrics', {}).get('composite_risk_score', 50),
+        funding_ask=burn_and_runway.get('funding_ask', 'Not specified'),
+        current_arr=financials.get('arr_mrr', {}).get('current_booked_arr', 'Not available'),
+        burn_rate=burn_and_runway.get('implied_net_burn', 'Not available'),
+        runway=burn_and_runway.get('stated_runway', 'Not available'),
+        market_size=memo.get('market_analysis', {}).get('industry_size_and_growth', {}).get('total_addressable_market', {}).get('value', 'Not available'),
+        conclusion_json=_to_json(memo.get('conclusion', {})),
+        financials_json=_dump_capped(financials, 1500),
+        market_json=_dump_capped(memo.get('market_analysis', {}), 2000),
+        comparables_json=_dump_capped(comparables, 1500) if comparables else "None in our research",
+        founders_json=_dump_capped(overview.get('founders', []), 1000),
+        pitch_excerpt=pitch_excerpt
+    )
+
+
+_BULK_OUTPUT_INSTRUCTIONS = """
+==================== BULK OUTPUT FORMAT ====================
+
+You are deciding on {deal_count} separate companies (the DEAL blocks above), each on its own merits.
+Return ONE JSON object of the form {{"decisions": [...]}} with exactly one decision per deal, in the
+order given. Each decision follows the field guidance above plus "deal_id" copied verbatim from its
+DEAL block, and its "funding_amount_requested" is that deal's own funding ask.
+"""
+
 
-        # Call Gemini with Google Search grounding
-        response = client.models.generate_content(
-            # model='gemini-3-pro-preview',
-            model='gemini-3-pro-preview',
-            contents=prompt,
-            config=GenerateContentConfig(
-                tools=[Tool(google_search=GoogleSearch())],
-                temperature=0.3,
-                top_p=0.9,
-                # max_output_tokens=8192,
-                max_output_tokens=8192
-                # response_mime_type="application/json" - Unsupported with tools
-            )
+def _build_bulk_prompt(deals: List[Dict[str, Any]]) -> str:
+    """One prompt deciding several deals: persona and guidance once, a context block per deal"""
+    blocks = []
+    for i, deal in enumerate(deals, 1):
+        fields = _deal_fields(deal['memo'], deal['extracted_text'][:5000])
+        blocks.append(
+            f"==================== DEAL {i} (deal_id: {deal['deal_id']}) ====================\n\n"
+            + _DEAL_CONTEXT_TEMPLATE.format(**fields)
         )
-        
-        # Parse response
-        response_text = response.text.strip()
-        
-        # Remove markdown if present
-        if response_text.startswith("```json"):
-            response_text = response_text[7:-3].strip()
-        elif response_text.startswith("```"):
-            response_text = response_text[3:-3].strip()
-        
-        decision = json.loads(response_text)
-        
-        # Add metadata
-        decision['deal_id'] = deal_id
-        decision['generated_at'] = datetime.utcnow().isoformat() + "Z"
-        decision['generated_by'] = user_id
-        
-        # Validate required fields
-        required_fields = [
-            'recommendation', 'funding_amount_recommended', 'funding_amount_requested',
-            'rationale', 'disbursement_schedule', 'milestone_roadmap',
-            'next_round_criteria', 'red_flags', 'success_metrics'
-        ]
-        
-        for field in required_fields:
-            if field not in decision:
-                raise ValueError(f"Missing required field: {field}")
-        
+    return (
+        _DECISION_PERSONA
+        + "".join(blocks)
+        + _DECISION_GUIDANCE_TEMPLATE.format(funding_ask="<that deal's own funding ask>")
+        + _BULK_OUTPUT_INSTRUCTIONS.format(deal_count=len(deals))
+    )
+
+
+def _finalize_decision(draft: InvestmentDecisionDraft, deal_id: str, user_id: str) -> Dict[str, Any]:
+    """Decision dict from the parsed model output, with deal metadata stamped on"""
+    decision = draft.model_dump(exclude={'deal_id'})
+    decision['success_metrics'] = {m['metric']: m['target'] for m in decision['success_metrics']}
+    decision['deal_id'] = deal_id
+    # Same shape as the rest of the tree's stamps ("...T12:00:00.123456Z"), from an aware datetime
+    decision['generated_at'] = datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z')
+    decision['generated_by'] = user_id
+    return decision
+
+
+def _decision_config(max_output_tokens: int, schema: type, grounded: bool) -> GenerateContentConfig:
+    # Optional Google Search grounding; Gemini 3 accepts a response schema alongside tools
+    return GenerateContentConfig(
+        tools=[Tool(google_search=GoogleSearch())] if grounded else None,
+        temperature=0.3,
+        top_p=0.9,
+        max_output_tokens=max_output_tokens,
+        response_mime_type="application/json",
+        response_schema=schema,
+        http_options=HttpOptions(timeout=DECISION_TIMEOUT_MS)
+    )
+
+
+async def _generate_decision(prompt: str, max_output_tokens: int, schema: type, grounded: bool) -> Any:
+    response = await client.aio.models.generate_content(
+        model=DECISION_MODEL,
+        contents=prompt,
+        config=_decision_config(max_output_tokens, schema, grounded)
+    )
+    if response.parsed is None:
+        raise ValueError(f"Response did not match the {schema.__name__} schema: {(response.text or '')[:500]}")
+    return response.parsed
+
+
+async def stream_investment_decision(
+    deal_id: str,
+    memo: Dict[str, Any],
+    extracted_text: str,
+    user_id: str
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Generate an investment decision, streaming the raw JSON as it is produced.
+    Yields {"type": "delta", "text": ...} events, then one {"type": "result", "result": decision}
+    once the complete response has been validated against the schema.
+    """
+    stream = await client.aio.models.generate_content_stream(
+        model=DECISION_MODEL,
+        contents=_build_prompt(deal_id, memo, extracted_text),
+        config=_decision_config(DECISION_MAX_OUTPUT_TOKENS, InvestmentDecisionDraft, _needs_grounding(memo))
+    )
+    
+    chunks = []
+    async for chunk in stream:
+        if chunk.text:
+            chunks.append(chunk.text)
+            yield {"type": "delta", "text": chunk.text}
+    
+    # Parsed once at end of stream (pydantic validates straight from the JSON text)
+    draft = InvestmentDecisionDraft.model_validate_json("".join(chunks))
+    yield {"type": "result", "result": _finalize_decision(draft, deal_id, user_id)}
+
+
+async def generate_investment_decision(
+    deal_id: str,
+    memo: Dict[str, Any],
+    extracted_text: str,
+    user_id: str
+) -> Dict[str, Any]:
+    """
+    Generate comprehensive investment decision and funding plan using Gemini AI.
+    
+    Args:
+        deal_id: Unique deal identifier
+        memo: Complete investment memo with analysis
+        extracted_text: Original pitch deck text
+        user_id: ID of the user generating the decision
+    
+    Returns:
+        Complete investment decision structure
+    """
+    try:
+        decision = None
+        async for event in stream_investment_decision(deal_id, memo, extracted_text, user_id):
+            if event["type"] == "result":
+                decision = event["result"]
         return decision
         
-    except json.JSONDecodeError as e:
-        print(f"Error parsing investment decision JSON: {str(e)}")
-        print(f"Response text: {response_text[:500]}")
-        raise HTTPException(
-            status_code=500,
-            detail="Failed to parse investment decision response"
-        )
     except Exception as e:
-        print(f"Error generating investment decision: {str(e)}")
+        logger.error("Error generating investment decision: %s", e)
         raise HTTPException(
             status_code=500,
             detail=f"Failed to generate investment decision: {str(e)}"
         )
+
+
+async def _decide_bulk_chunk(deals: List[Dict[str, Any]]) -> List[Any]:
+    try:
+        batch = await _generate_decision(
+            _build_bulk_prompt(deals),
+            min(DECISION_MAX_OUTPUT_TOKENS * len(deals), DECISION_MODEL_OUTPUT_LIMIT),
+            BulkInvestmentDecisions,
+            any(_needs_grounding(deal['memo']) for deal in deals)
+        )
+    except Exception as e:
+        logger.error("Error generating bulk investment decisions: %s", e)
+        return [e] * len(deals)
+    
+    by_deal_id = {d.deal_id: d for d in batch.decisions}
+    results = []
+    for deal in deals:
+        draft = by_deal_id.get(deal['deal_id'])
+        if draft is None:
+            results.append(ValueError(f"No decision returned for deal {deal['deal_id']}"))
+        else:
+            results.append(_finalize_decision(draft, deal['deal_id'], deal['user_id']))
+    return results
+
+
+async def generate_investment_decisions_bulk(
+    deals: List[Dict[str, Any]],
+    batch_size: int = DECISION_BULK_SIZE
+) -> List[Any]:
+    """
+    Generate investment decisions for several deals, packing up to batch_size deals per Gemini call
+    so the persona/guidance prompt and per-call overhead are paid once per batch.
+    deals: list of kwargs dicts for generate_investment_decision (deal_id, memo, extracted_text, user_id).
+    Returns decisions in input order; a failed deal is returned as its exception.
+    """
+    chunks = [deals[i:i + batch_size] for i in range(0, len(deals), batch_size)]
+    chunk_results = await asyncio.gather(*[_decide_bulk_chunk(chunk) for chunk in chunks])
+    return [result for chunk in chunk_results for result in chunk]
+
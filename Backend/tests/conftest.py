@@ -0,0 +1,9 @@
+import os
+import sys
+
+# Tests import the backend's top-level packages (config, services, utils) the way main.py does
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Required settings with no defaults; real values come from .env in deployment
+for name in ("GCP_PROJECT_ID", "DOCUMENT_AI_PROCESSOR_ID", "BREVO_API_KEY", "GEMINI_API_KEY"):
+    os.environ.setdefault(name, "test")
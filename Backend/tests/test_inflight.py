@@ -0,0 +1,64 @@
+import asyncio
+
+import pytest
+
+from utils.inflight import _inflight, coalesce_inflight
+
+
+def _counting(delay: float = 0.05):
+    calls = []
+
+    @coalesce_inflight
+    async def fetch(deal_id: str):
+        calls.append(deal_id)
+        await asyncio.sleep(delay)
+        return {"deal_id": deal_id, "items": [1, 2]}
+
+    return fetch, calls
+
+
+def test_concurrent_identical_calls_share_one_run():
+    fetch, calls = _counting()
+
+    async def main():
+        return await asyncio.gather(fetch("d1"), fetch("d1"), fetch("d2"))
+
+    first, second, other = asyncio.run(main())
+    assert calls == ["d1", "d2"]
+    assert first == second == {"deal_id": "d1", "items": [1, 2]}
+    assert first is not second  # Followers get their own copy
+    assert other["deal_id"] == "d2"
+    assert not _inflight
+
+
+def test_follower_takes_over_when_leader_is_cancelled():
+    fetch, calls = _counting()
+
+    async def main():
+        leader = asyncio.create_task(fetch("d1"))
+        await asyncio.sleep(0.01)
+        followers = [asyncio.create_task(fetch("d1")) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await asyncio.gather(*followers)
+
+    results = asyncio.run(main())
+    assert results == [{"deal_id": "d1", "items": [1, 2]}] * 3
+    assert calls == ["d1", "d1"]  # The cancelled run plus exactly one takeover
+    assert not _inflight
+
+
+def test_leader_failure_reaches_followers():
+    @coalesce_inflight
+    async def fail(deal_id: str):
+        await asyncio.sleep(0.01)
+        raise RuntimeError("boom")
+
+    async def main():
+        return await asyncio.gather(fail("d1"), fail("d1"), return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert [str(r) for r in results] == ["boom", "boom"]
+    assert not _inflight
@@ -0,0 +1,38 @@
+import json
+
+from utils.json_stream import ArrayItemScanner
+
+
+def _scan(chunks):
+    scanner = ArrayItemScanner()
+    items = []
+    for chunk in chunks:
+        items.extend(json.loads(raw) for raw in scanner.feed(chunk))
+    return scanner, items
+
+
+def test_elements_split_across_chunks():
+    text = '[{"year": "FY23", "pat": 1.5}, {"year": "FY24", "nested": {"a": [1, 2]}}]'
+    for size in (1, 3, 7, len(text)):
+        scanner, items = _scan([text[i:i + size] for i in range(0, len(text), size)])
+        assert items == [{"year": "FY23", "pat": 1.5}, {"year": "FY24", "nested": {"a": [1, 2]}}]
+        assert scanner.complete
+
+
+def test_brackets_and_escaped_quotes_inside_strings():
+    text = '[{"note": "ratio ]} of [{ \\"x\\" }", "year": "FY23"}]'
+    scanner, items = _scan([text[:12], text[12:30], text[30:]])
+    assert items == [{"note": 'ratio ]} of [{ "x" }', "year": "FY23"}]
+    assert scanner.complete
+
+
+def test_truncated_tail_is_not_complete():
+    scanner, items = _scan(['[{"year": "FY23"}, {"year": "FY2'])
+    assert items == [{"year": "FY23"}]
+    assert not scanner.complete
+
+
+def test_unclosed_array_is_not_complete():
+    scanner, items = _scan(['[{"year": "FY23"}'])
+    assert items == [{"year": "FY23"}]
+    assert not scanner.complete
@@ -0,0 +1,86 @@
+import asyncio
+import os
+import time
+
+import pytest
+
+from utils import result_cache
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(result_cache.settings, "RESULT_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(result_cache.settings, "RESULT_CACHE_MAX_MB", 512)
+    monkeypatch.setattr(result_cache, "_last_sweep", 0.0)
+    return tmp_path
+
+
+def _get(calls, ttl=60, **kwargs):
+    async def compute():
+        calls.append(1)
+        return {"value": len(calls)}
+    return asyncio.run(result_cache.get_or_compute("facts", "abc", compute, ttl, **kwargs))
+
+
+def test_miss_computes_and_stores(cache_dir):
+    calls = []
+    assert _get(calls) == {"value": 1}
+    assert (cache_dir / "facts" / "abc.json").exists()
+
+
+def test_hit_skips_compute(cache_dir):
+    calls = []
+    _get(calls)
+    assert _get(calls) == {"value": 1}
+    assert len(calls) == 1
+
+
+def test_force_refresh_recomputes(cache_dir):
+    calls = []
+    _get(calls)
+    assert _get(calls, force_refresh=True) == {"value": 2}
+
+
+def test_expired_entry_is_recomputed(cache_dir):
+    calls = []
+    _get(calls)
+    path = cache_dir / "facts" / "abc.json"
+    stale = time.time() - 120
+    os.utime(path, (stale, stale))
+    assert _get(calls) == {"value": 2}
+
+
+def test_corrupt_entry_is_discarded(cache_dir):
+    path = cache_dir / "facts" / "abc.json"
+    path.parent.mkdir(parents=True)
+    path.write_bytes(b'{"value": ')
+    calls = []
+    assert _get(calls) == {"value": 1}
+    assert _get(calls) == {"value": 1}  # The recomputed result replaced the corrupt file
+
+
+def test_should_cache_rejects_result(cache_dir):
+    calls = []
+    _get(calls, should_cache=lambda result: False)
+    assert not (cache_dir / "facts" / "abc.json").exists()
+
+
+def test_sweep_removes_oldest_files(cache_dir, monkeypatch):
+    monkeypatch.setattr(result_cache.settings, "RESULT_CACHE_MAX_MB", 1)
+    half_mb = b"0" * (512 * 1024)
+    asyncio.run(result_cache.put_raw("facts", "old", half_mb))
+    old = cache_dir / "facts" / "old.json"
+    os.utime(old, (time.time() - 60, time.time() - 60))
+    asyncio.run(result_cache.put_raw("facts", "mid", half_mb))
+    monkeypatch.setattr(result_cache, "_last_sweep", 0.0)
+    asyncio.run(result_cache.put_raw("facts", "new", half_mb))
+    assert sorted(p.name for p in (cache_dir / "facts").iterdir()) == ["mid.json", "new.json"]
+
+
+def test_on_cached_receives_stored_and_hit_bytes(cache_dir):
+    seen = []
+    calls = []
+    _get(calls, on_cached=seen.append)
+    _get(calls, on_cached=seen.append)
+    assert seen == [b'{"value":1}', b'{"value":1}']
+    assert len(calls) == 1
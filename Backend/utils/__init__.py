@@ -0,0 +1,4 @@
+from .inflight import coalesce_inflight
+from .json_stream import ArrayItemScanner, TruncatedStreamError
+
+__all__ = ['coalesce_inflight', 'ArrayItemScanner', 'TruncatedStreamError']
@@ -0,0 +1,70 @@
+"""
+In-flight request coalescing for async service calls.
+
+Kept free of the Gemini/GCP dependencies so it can be unit-tested on its own.
+"""
+import asyncio
+import functools
+import hashlib
+import inspect
+import logging
+from typing import Dict
+
+import orjson
+
+logger = logging.getLogger(__name__)
+
+# In-flight coalescing: concurrent identical requests (double-submits, retries during a burst)
+# share one Gemini call instead of each paying a full analysis round-trip
+_inflight: Dict[str, asyncio.Future] = {}
+
+
+class _LeaderCancelled(Exception):
+    """Set on a shared in-flight future when the call running it was cancelled"""
+
+
+def coalesce_inflight(fn):
+    """
+    Await the already-running call with the same arguments instead of starting a duplicate.
+    If the caller running the shared call is cancelled, one waiting follower takes it over.
+    """
+    signature = inspect.signature(fn)
+
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        digest = hashlib.blake2b(fn.__name__.encode(), digest_size=16)
+        for name, value in bound.arguments.items():
+            digest.update(name.encode())
+            digest.update(value if isinstance(value, bytes) else orjson.dumps(value, default=str, option=orjson.OPT_SORT_KEYS))
+        key = digest.hexdigest()
+
+        pending = _inflight.get(key)
+        while pending is not None:
+            logger.info("🔗 Joining in-flight %s call", fn.__name__)
+            try:
+                # Followers get their own copy so callers can't mutate each other's result
+                return orjson.loads(orjson.dumps(await asyncio.shield(pending), default=str))
+            except _LeaderCancelled:
+                # The first follower to wake finds no entry and runs the call itself
+                pending = _inflight.get(key)
+
+        future = asyncio.get_running_loop().create_future()
+        _inflight[key] = future
+        try:
+            result = await fn(*args, **kwargs)
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            # Don't cancel the shared future: that would cancel every follower along with us
+            future.set_exception(_LeaderCancelled())
+            future.exception()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Mark retrieved so an unjoined failure isn't logged as unhandled
+            raise
+        finally:
+            del _inflight[key]
+    return wrapper
@@ -0,0 +1,64 @@
+"""
+Incremental parsing helpers for streamed JSON model output.
+
+Kept free of the Gemini/GCP dependencies so they can be unit-tested on their own.
+"""
+from typing import List
+
+
+class TruncatedStreamError(ValueError):
+    """A streamed JSON array ended before its closing bracket"""
+
+
+class ArrayItemScanner:
+    """
+    Incrementally split a streamed top-level JSON array into its object elements.
+    Same depth/string/escape tracking as gemini_service._extract_json_object, carried across chunks,
+    so each element can be parsed as soon as its closing brace arrives.
+    """
+    
+    def __init__(self):
+        self._pending: List[str] = []  # Pieces of the element currently being decoded
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._closed = False  # Saw the top-level array's closing ']'
+    
+    @property
+    def complete(self) -> bool:
+        """True once the array has closed with no element left half-decoded"""
+        return self._closed and self._depth == 0
+    
+    def feed(self, chunk: str) -> List[str]:
+        """Consume a chunk and return the raw JSON of every element it completed"""
+        items = []
+        start = 0 if self._depth else None
+        for i, char in enumerate(chunk):
+            if self._depth == 0:
+                if char == '{':
+                    self._depth = 1
+                    start = i
+                elif char == ']':
+                    self._closed = True
+                continue  # '[', ',' and whitespace between elements
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == '\\':
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in '{[':
+                self._depth += 1
+            elif char in '}]':
+                self._depth -= 1
+                if self._depth == 0:
+                    self._pending.append(chunk[start:i + 1])
+                    items.append("".join(self._pending))
+                    self._pending = []
+                    start = None
+        if self._depth and start is not None:
+            self._pending.append(chunk[start:])
+        return items
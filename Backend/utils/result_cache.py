@@ -0,0 +1,139 @@
+"""
+Persistent content-addressed result cache.
+
+Second tier behind the in-process caches in gemini_service and image_generation_service:
+completed fact checks, CMA extractions and cover art are written as orjson files under
+RESULT_CACHE_DIR, so identical inputs skip the Gemini/Imagen call across restarts too.
+The directory is kept under RESULT_CACHE_MAX_MB by sweeping the oldest files after writes.
+"""
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Awaitable, Callable, Optional
+
+import orjson
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Walking the cache directory is cheap but not free; sweep at most this often
+_SWEEP_INTERVAL_SECONDS = 600
+_last_sweep = 0.0
+
+
+def _path(namespace: str, key: str) -> str:
+    return os.path.join(settings.RESULT_CACHE_DIR, namespace, f"{key}.json")
+
+
+def _read(path: str, ttl: int) -> Optional[bytes]:
+    try:
+        if time.time() - os.path.getmtime(path) >= ttl:
+            return None
+        with open(path, "rb") as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def _write(path: str, data: bytes):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Write-then-rename so a concurrent reader never sees a half-written file
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def _unlink(path: str):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _sweep(max_bytes: int):
+    """Delete the oldest-written files until the cache directory fits in max_bytes"""
+    entries = []
+    for root, _, files in os.walk(settings.RESULT_CACHE_DIR):
+        for name in files:
+            path = os.path.join(root, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+    total = sum(size for _, size, _ in entries)
+    if total <= max_bytes:
+        return
+    entries.sort()
+    removed = 0
+    for _, size, path in entries:
+        if total <= max_bytes:
+            break
+        _unlink(path)
+        total -= size
+        removed += 1
+    logger.info("🧹 Swept %d result cache files to stay under %d MB", removed, max_bytes // (1024 * 1024))
+
+
+async def get_raw(namespace: str, key: str, ttl: int) -> Optional[bytes]:
+    """Stored orjson bytes for key, or None if missing/expired"""
+    return await asyncio.to_thread(_read, _path(namespace, key), ttl)
+
+
+async def discard(namespace: str, key: str):
+    """Remove a stored entry, e.g. one that no longer decodes"""
+    await asyncio.to_thread(_unlink, _path(namespace, key))
+
+
+async def put_raw(namespace: str, key: str, data: bytes):
+    """Store already-serialized orjson bytes; a failed write only costs a future cache miss"""
+    global _last_sweep
+    try:
+        await asyncio.to_thread(_write, _path(namespace, key), data)
+    except OSError as e:
+        logger.warning("⚠️ Could not persist %s result %s: %s", namespace, key, e)
+        return
+    
+    now = time.monotonic()
+    if now - _last_sweep >= _SWEEP_INTERVAL_SECONDS:
+        _last_sweep = now
+        await asyncio.to_thread(_sweep, settings.RESULT_CACHE_MAX_MB * 1024 * 1024)
+
+
+async def get_or_compute(
+    namespace: str,
+    key: str,
+    coro_factory: Callable[[], Awaitable[Any]],
+    ttl: int,
+    force_refresh: bool = False,
+    should_cache: Optional[Callable[[Any], bool]] = None,
+    on_cached: Optional[Callable[[bytes], None]] = None
+) -> Any:
+    """
+    Return the cached result for (namespace, key), computing and storing it on a miss.
+    on_cached receives the serialized bytes of every disk hit and every stored result,
+    so an in-process tier in front of this one can keep them without re-serializing.
+    """
+    if not force_refresh:
+        data = await get_raw(namespace, key, ttl)
+        if data is not None:
+            try:
+                result = orjson.loads(data)
+                logger.info("♻️ Persistent cache hit for %s", namespace)
+                if on_cached is not None:
+                    on_cached(data)
+                return result
+            except orjson.JSONDecodeError as e:
+                logger.warning("⚠️ Discarding corrupt %s cache entry %s: %s", namespace, key, e)
+                await discard(namespace, key)
+
+    result = await coro_factory()
+    if should_cache is None or should_cache(result):
+        data = orjson.dumps(result, default=str)
+        if on_cached is not None:
+            on_cached(data)
+        await put_raw(namespace, key, data)
+    return result